@@ -1,4 +1,3 @@
-
 """
 API Functions Package
 
@@ -6,64 +5,131 @@ This package contains modular API functions for the college assistant applicatio
 Each module handles a specific type of functionality:
 
 - weather: Weather data from OpenWeatherMap
+- forecast: Hourly/daily forecasts stored per grid cell
 - deals: Local deals and discounts
 - sports: College football data from ESPN
 - events: Event information from Ticketmaster
 - calendar: Google Calendar event creation
 - rentals: Rental property search via Zillow
+- composite: Tools that chain geocoding, events, schedules and forecasts
 - ai_handler: AI response handling with OpenRouter
+- config: Settings loaded once from the environment
+
+Tool modules are imported lazily: attribute access on the package and
+lookups in FUNCTION_MAP import the owning module on first use, so cold
+start only pays for the modules a request actually touches.
 """
 
-from .weather import get_weather
-from .deals import get_deals
-from .sports import get_college_team_data, TEAM_REFERENCE
-from .events import get_events, get_events_by_city, get_music_events, get_sports_events
-from .calendar import make_event, create_recurring_event, create_class_schedule
-from .rentals import get_rentals, get_filtered_rentals, parse_rental_data
-from .ai_handler import get_ai_response, get_default_tools
+from collections.abc import Mapping
+from importlib import import_module
 
-# Export all main functions
-__all__ = [
+# Public name -> module that defines it
+_EXPORTS = {
     # Weather
-    'get_weather',
+    'get_weather': 'weather',
+    'get_weather_batch': 'weather',
+    'get_weather_multi': 'weather',
+    'get_weather_forecast': 'forecast',
 
     # Deals
-    'get_deals',
+    'get_deals': 'deals',
 
     # Sports
-    'get_college_team_data',
-    'TEAM_REFERENCE',
+    'get_college_team_data': 'sports',
+    'get_team_season_info': 'sports',
+    'TEAM_REFERENCE': 'teams',
 
     # Events
-    'get_events',
-    'get_events_by_city',
-    'get_music_events',
-    'get_sports_events',
+    'get_events': 'events',
+    'get_events_by_city': 'events',
+    'get_music_events': 'events',
+    'get_sports_events': 'events',
 
     # Calendar
-    'make_event',
-    'create_recurring_event',
-    'create_class_schedule',
+    'make_event': 'calendar',
+    'create_recurring_event': 'calendar',
+    'create_class_schedule': 'calendar',
 
     # Rentals
-    'get_rentals',
-    'get_filtered_rentals',
-    'parse_rental_data',
+    'get_rentals': 'rentals',
+    'get_filtered_rentals': 'rentals',
+    'get_rental_summary': 'rentals',
+    'parse_rental_data': 'rentals',
+
+    # Composite tools
+    'get_events_near': 'composite',
+    'get_weather_for_game': 'composite',
 
     # AI Handler
-    'get_ai_response',
-    'get_default_tools'
-]
+    'get_ai_response': 'ai_handler',
+    'get_default_tools': 'ai_handler',
+}
+
+# Export all main functions
+__all__ = list(_EXPORTS) + ['FUNCTION_MAP']
+
+
+def _load(name):
+    """Import the module that defines ``name`` and return the attribute."""
+    module = import_module(f".{_EXPORTS[name]}", __name__)
+    return getattr(module, name)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = _load(name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
+
+
+class LazyFunctionMap(Mapping):
+    """
+    Read-only tool name -> function mapping that imports each tool module
+    the first time one of its functions is looked up.
+    """
+
+    def __init__(self, names):
+        self._names = tuple(names)
+        self._resolved = {}
+
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        func = self._resolved.get(name)
+        if func is None:
+            func = self._resolved[name] = _load(name)
+        return func
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
 
 # Function mapping for easy AI integration
-FUNCTION_MAP = {
-    "get_weather": get_weather,
-    "get_deals": get_deals,
-    "get_college_team_data": get_college_team_data,
-    "make_event": make_event,
-    "get_rentals": get_rentals,
-    "get_events": get_events
-}
+FUNCTION_MAP = LazyFunctionMap([
+    "get_weather",
+    "get_weather_multi",
+    "get_weather_forecast",
+    "get_deals",
+    "get_college_team_data",
+    "get_team_season_info",
+    "make_event",
+    "get_rentals",
+    "get_rental_summary",
+    "get_events",
+    "get_events_near",
+    "get_weather_for_game",
+])
 
 # Package metadata
 __version__ = "1.0.0"
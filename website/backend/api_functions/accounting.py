@@ -0,0 +1,157 @@
+"""
+Token Accounting
+
+Per-request record of what each OpenRouter call cost: prompt, completion
+and cached tokens, split by stage ("tool_selection" for the call that picks
+a tool, "final" for the answer after it), tagged with the model and the
+tool used, plus the tool result's size before and after compaction.
+
+OpenRouter reports the charged cost when asked (``usage: {include: true}``);
+when it does not, cost is estimated from MODEL_PRICES. Recent requests are
+kept in a rolling window and aggregated by model, tool and stage.
+"""
+
+import threading
+import time
+from collections import deque
+
+from .config import config
+
+# USD per million (prompt, completion) tokens, used when OpenRouter reports no cost
+MODEL_PRICES = {
+    "anthropic/claude-3.5-haiku": (0.80, 4.00),
+    "anthropic/claude-3.5-sonnet": (3.00, 15.00),
+    "anthropic/claude-3-haiku": (0.25, 1.25),
+}
+
+
+def call_usage(stage: str, result: dict) -> dict:
+    """
+    Token counts and cost of one completion.
+
+    Args:
+        stage (str): "tool_selection" or "final"
+        result (dict): OpenRouter completion response
+
+    Returns:
+        dict: {"stage", "model", "prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd", "cost_estimated"}
+    """
+    usage = result.get("usage") or {}
+    model = result.get("model", "unknown")
+    prompt = usage.get("prompt_tokens") or 0
+    completion = usage.get("completion_tokens") or 0
+    cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+
+    cost = usage.get("cost")
+    estimated = cost is None
+    if estimated:
+        # Match the router's model id even when OpenRouter reports a dated variant
+        prices = next((p for name, p in MODEL_PRICES.items() if model.startswith(name)), None)
+        cost = (prompt * prices[0] + completion * prices[1]) / 1e6 if prices else 0.0
+
+    return {
+        "stage": stage,
+        "model": model,
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "cached_tokens": cached,
+        "cost_usd": round(float(cost), 6),
+        "cost_estimated": estimated,
+    }
+
+
+def request_usage(calls: list, tool: str = None, raw_chars: int = None, sent_chars: int = None) -> dict:
+    """
+    Accounting for one chat request.
+
+    Args:
+        calls (list): call_usage() entries in call order
+        tool (str, optional): Tool the model called
+        raw_chars (int, optional): Tool result size as returned by the tool
+        sent_chars (int, optional): Tool result size sent back to the model
+
+    Returns:
+        dict: Per-call entries plus request totals
+    """
+    return {
+        "calls": calls,
+        "tool": tool,
+        "tool_result_chars": raw_chars,
+        "tool_result_sent_chars": sent_chars,
+        "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+        "completion_tokens": sum(c["completion_tokens"] for c in calls),
+        "cached_tokens": sum(c["cached_tokens"] for c in calls),
+        "cost_usd": round(sum(c["cost_usd"] for c in calls), 6),
+    }
+
+
+def _add(bucket: dict, call: dict):
+    bucket["calls"] += 1
+    for key in ("prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd"):
+        bucket[key] += call[key]
+
+
+def _empty() -> dict:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "cost_usd": 0.0}
+
+
+class UsageLedger:
+    """
+    Rolling window of request accounting with aggregates.
+
+    Args:
+        window (int, optional): Requests kept for the rolling aggregates
+    """
+
+    def __init__(self, window: int = 1000):
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.lifetime = dict(_empty(), requests=0)
+
+    def record(self, usage: dict):
+        entry = dict(usage, at=time.time())
+        with self._lock:
+            self._recent.append(entry)
+            self.lifetime["requests"] += 1
+            for call in usage["calls"]:
+                _add(self.lifetime, call)
+
+    def stats(self) -> dict:
+        """Rolling aggregates by model, stage and tool, plus lifetime totals."""
+        with self._lock:
+            recent = list(self._recent)
+            lifetime = dict(self.lifetime)
+
+        by_model, by_stage, by_tool = {}, {}, {}
+        for usage in recent:
+            tool = by_tool.setdefault(usage["tool"] or "none", dict(
+                _empty(), requests=0, tool_result_chars=0, tool_result_sent_chars=0))
+            tool["requests"] += 1
+            tool["tool_result_chars"] += usage["tool_result_chars"] or 0
+            tool["tool_result_sent_chars"] += usage["tool_result_sent_chars"] or 0
+            for call in usage["calls"]:
+                _add(by_model.setdefault(call["model"], _empty()), call)
+                _add(by_stage.setdefault(call["stage"], _empty()), call)
+                _add(tool, call)
+
+        for tool in by_tool.values():
+            requests = tool["requests"]
+            tool["avg_cost_usd"] = round(tool["cost_usd"] / requests, 6)
+            tool["avg_prompt_tokens"] = round(tool["prompt_tokens"] / requests)
+            tool["avg_tool_result_chars"] = round(tool.pop("tool_result_chars") / requests)
+            tool["avg_tool_result_sent_chars"] = round(tool.pop("tool_result_sent_chars") / requests)
+        for bucket in (*by_model.values(), *by_stage.values(), *by_tool.values(), lifetime):
+            bucket["cost_usd"] = round(bucket["cost_usd"], 6)
+
+        return {
+            "window_requests": len(recent),
+            "window_started": recent[0]["at"] if recent else None,
+            "by_model": by_model,
+            "by_stage": by_stage,
+            "by_tool": by_tool,
+            "lifetime": lifetime,
+            "recent": recent[-20:],
+        }
+
+
+usage_ledger = UsageLedger(window=config.usage_window)
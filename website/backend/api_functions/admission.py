@@ -0,0 +1,161 @@
+"""
+Admission Control
+
+Decides, before any model or tool work starts, whether a /api/chat request
+runs now, waits briefly, or is shed:
+
+- Each client has a token bucket (CHAT_RATE per second, CHAT_BURST deep),
+  stored like the upstream quotas so the limit holds across workers.
+- Each worker runs at most CHAT_MAX_INFLIGHT chats at once. Up to
+  CHAT_QUEUE_SIZE more wait CHAT_QUEUE_TIMEOUT seconds for a slot.
+- Anything beyond that is shed immediately, so a spike degrades a few
+  answers instead of the latency of every answer.
+
+Queue depth and shed counts are reported for autoscaling.
+"""
+
+import math
+import threading
+import time
+from typing import NamedTuple
+
+from .config import config
+from .quota import build_buckets
+
+
+class Rejection(NamedTuple):
+    """Why a request was not admitted and when the client may retry."""
+    reason: str           # "rate_limited" or "overloaded"
+    retry_after: int      # seconds
+
+
+class AdmissionController:
+    """
+    Per-client rate limits plus a bounded in-flight limit with a short queue.
+
+    Args:
+        max_inflight (int): Concurrent chats per process
+        queue_size (int): Requests allowed to wait for a slot
+        queue_timeout (float): Seconds a queued request waits before being shed
+        rate (float): Per-client requests per second
+        burst (int): Per-client burst
+        buckets: Bucket store from quota.build_buckets()
+    """
+
+    def __init__(self, max_inflight: int, queue_size: int, queue_timeout: float,
+                 rate: float, burst: int, buckets):
+        self.max_inflight = max_inflight
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.rate = rate
+        self.burst = burst
+        self.buckets = buckets
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.queued = 0
+        self._counts = {"admitted": 0, "queued": 0, "rate_limited": 0, "shed": 0}
+        self._queue_wait = 0.0
+
+    def admit(self, client: str):
+        """
+        Admit a request or explain why not. Admitted requests must call release().
+
+        Args:
+            client (str): Client identifier (e.g. IP address)
+
+        Returns:
+            Rejection: None if admitted
+        """
+        rejection = self.rate_limit(client)
+        if rejection:
+            return rejection
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self.queued >= self.queue_size:
+                    self._counts["shed"] += 1
+                    return Rejection("overloaded", max(1, math.ceil(self.queue_timeout)))
+                self.queued += 1
+                self._counts["queued"] += 1
+
+            started = time.monotonic()
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+            with self._lock:
+                self.queued -= 1
+                self._queue_wait += time.monotonic() - started
+                if not acquired:
+                    self._counts["shed"] += 1
+                    return Rejection("overloaded", max(1, math.ceil(self.queue_timeout)))
+
+        with self._lock:
+            self.in_flight += 1
+            self._counts["admitted"] += 1
+        return None
+
+    def rate_limit(self, client: str):
+        """
+        Apply only the per-client rate limit (for work that does not take a slot).
+
+        Args:
+            client (str): Client identifier (e.g. IP address)
+
+        Returns:
+            Rejection: None if within the limit
+        """
+        wait = self.buckets.take(f"chat-client:{client}", self.rate, self.burst)
+        if wait > 0:
+            with self._lock:
+                self._counts["rate_limited"] += 1
+            return Rejection("rate_limited", max(1, math.ceil(wait)))
+        return None
+
+    def release(self):
+        """Free the slot of an admitted request."""
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(
+                self._counts,
+                in_flight=self.in_flight,
+                queue_depth=self.queued,
+                max_inflight=self.max_inflight,
+                queue_size=self.queue_size,
+                utilization=round((self.in_flight + self.queued) / self.max_inflight, 2),
+                avg_queue_wait=round(self._queue_wait / self._counts["queued"], 3) if self._counts["queued"] else 0.0,
+            )
+
+
+def client_address(forwarded: str, peer: str, trusted_hops: int = None) -> str:
+    """
+    Client address for per-client limits.
+
+    Clients can send any X-Forwarded-For they like; only the entries that
+    trusted proxies appended (the last ``trusted_hops``) are believed.
+
+    Args:
+        forwarded (str): X-Forwarded-For header value
+        peer (str): Address of the connecting socket
+        trusted_hops (int, optional): Proxies in front of the app (default: TRUSTED_PROXY_HOPS)
+
+    Returns:
+        str: Client address
+    """
+    hops = config.trusted_proxy_hops if trusted_hops is None else trusted_hops
+    entries = [entry.strip() for entry in (forwarded or "").split(",") if entry.strip()]
+    if hops > 0 and len(entries) >= hops:
+        return entries[-hops]
+    return peer or "unknown"
+
+
+admission = AdmissionController(
+    max_inflight=config.chat_max_inflight,
+    queue_size=config.chat_queue_size,
+    queue_timeout=config.chat_queue_timeout,
+    rate=config.chat_rate,
+    burst=config.chat_burst,
+    buckets=build_buckets(),
+)
@@ -1,101 +1,226 @@
-import os
 import requests
 import json
-from dotenv import load_dotenv
+import time
+from .accounting import call_usage, request_usage, usage_ledger
+from .config import config
+from .model_router import router
+from .speculation import speculator
+from .tool_cache import tool_cache
+from .direct_answers import render_direct_answer
+from .teams import TEAM_REFERENCE
+from .tracing import span
+from .upstream import fetch
 
-load_dotenv()
+# Built once at import; the team table makes this the largest string we send
+SYSTEM_PROMPT = (
+    "You are a helpful college assistant with access to weather data, deals, college football information, "
+    "calendar event creation, rental property search, and local events via Ticketmaster. When users ask about "
+    "college football teams, use the get_college_team_data function with the ESPN_ID from this reference:\n"
+    f"{TEAM_REFERENCE}\n\n"
+    "When creating calendar events, use ISO datetime format (YYYY-MM-DDTHH:MM:SS). Current date is 2025-11-08. "
+    "For event searches by place name, use get_events_near; for weather at a team's next game, use "
+    "get_weather_for_game. "
+    "Always provide helpful, student-focused responses."
+)
 
-OPENROUTERKEY = os.environ.get("key")
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 
-def get_ai_response(user_message: str, tools: list = None, function_map: dict = None) -> dict:
+def _read_stream(response, on_token) -> dict:
     """
-    Get AI response from OpenRouter using Claude model with optional function calling.
+    Collect a streamed (server-sent events) completion, passing text deltas on.
+
+    Args:
+        response (requests.Response): Streaming OpenRouter response
+        on_token (callable): Called with each piece of answer text
+
+    Returns:
+        dict: Completion in the non-streaming shape
+    """
+    parts = []
+    result = {}
+    try:
+        for line in response.iter_lines(decode_unicode=True):
+            # Lines starting with ":" are keep-alive comments
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if chunk.get("error"):
+                raise requests.exceptions.RequestException(f"Stream error: {chunk['error']}")
+            for key in ("id", "model", "usage"):
+                if chunk.get(key):
+                    result[key] = chunk[key]
+            for choice in chunk.get("choices") or []:
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    parts.append(text)
+                    on_token(text)
+    except (AttributeError, OSError) as e:
+        # A response without a readable body (closed socket, replayed or mocked response):
+        # fail this model like any other request error so the next candidate is tried
+        raise requests.exceptions.RequestException(f"Stream read failed: {e}") from e
+    result["choices"] = [{"message": {"role": "assistant", "content": "".join(parts)}}]
+    return result
+
+def _chat_completion(payload: dict, headers: dict, tier: str, on_token=None) -> dict:
+    """
+    POST a completion to OpenRouter using the best model for a tier.
+
+    The router's ordering is tried in turn: a failed or timed-out call is
+    recorded against that model and the next candidate is used, so one
+    degraded provider does not fail the whole chat turn.
+
+    Args:
+        payload (dict): Request body without the "model" field
+        headers (dict): Request headers including authorization
+        tier (str): Router tier ("fast" or "strong")
+        on_token (callable, optional): Stream the answer, calling this with each text delta
+
+    Returns:
+        dict: Parsed completion response; "model" holds the model that answered
+    """
+    if on_token is not None:
+        payload = dict(payload, stream=True)
+    last_error = None
+    for model in router.candidates(tier)[:2]:
+        started = time.monotonic()
+        with span("llm.completion", model=model, tier=tier, messages=len(payload["messages"])) as llm_span:
+            try:
+                response = fetch(
+                    "openrouter",
+                    OPENROUTER_URL,
+                    method="POST",
+                    headers=headers,
+                    json=dict(payload, model=model),
+                    timeout=config.llm_timeout,
+                    stream=on_token is not None
+                )
+                response.raise_for_status()
+                result = response.json() if on_token is None else _read_stream(response, on_token)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                router.record(model, time.monotonic() - started, ok=False)
+                llm_span.set(error=str(e))
+                print(f"Model {model} failed: {e}")
+                last_error = e
+                continue
+            router.record(model, time.monotonic() - started, ok=True)
+            usage = result.get("usage") or {}
+            llm_span.set(
+                prompt_tokens=usage.get("prompt_tokens"),
+                completion_tokens=usage.get("completion_tokens"),
+                total_tokens=usage.get("total_tokens"),
+                cached_tokens=(usage.get("prompt_tokens_details") or {}).get("cached_tokens"),
+                cost=usage.get("cost"),
+            )
+        result.setdefault("model", model)
+        return result
+    raise last_error
+
+def _final_tier(function_response) -> str:
+    """Short tool results are simple follow-ups the fast tier can phrase."""
+    if len(str(function_response)) <= config.simple_followup_chars:
+        return "fast"
+    return "strong"
+
+def compact_tool_result(value) -> str:
+    """
+    Tool result as sent back to the model.
+
+    Dicts and lists become compact JSON instead of their repr, and results
+    longer than TOOL_RESULT_MAX_CHARS are cut with a note, so one large
+    tool response cannot dominate the prompt of the final call.
+
+    Args:
+        value: Tool result
+
+    Returns:
+        str: Message content for the tool turn
+    """
+    if isinstance(value, (dict, list)):
+        try:
+            text = json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            text = str(value)
+    else:
+        text = str(value)
+    limit = config.tool_result_max_chars
+    if limit and len(text) > limit:
+        text = text[:limit] + f"... [truncated {len(text) - limit} characters]"
+    return text
+
+def _emit(on_event, event_type: str, **data):
+    """Report pipeline progress to an on_event callback, if any."""
+    if on_event is not None:
+        on_event(dict(data, type=event_type))
+
+def _run_tool(function_map, function_name: str, function_args: dict, speculation=None):
+    """
+    Execute a tool call, reusing a speculative or cached result when possible.
+
+    Args:
+        function_map (Mapping): Tool name -> function
+        function_name (str): Tool chosen by the model
+        function_args (dict): Arguments chosen by the model
+        speculation (SpeculationHandle, optional): Prefetches for this request
+
+    Returns:
+        Tool result
+    """
+    with span("tool", tool=function_name, args=json.dumps(function_args, sort_keys=True)) as tool_span:
+        if speculation is not None:
+            hit, value = speculator.claim(speculation, function_name, function_args, timeout=config.llm_timeout)
+            if hit:
+                print(f"Using prefetched {function_name} for args: {function_args}")
+                tool_cache.put(function_name, function_args, value)
+                tool_span.set(source="prefetch", result_chars=len(str(value)))
+                return value
+
+        print(f"Calling {function_name} with args: {function_args}")
+        value = tool_cache.call(function_name, function_map[function_name], function_args)
+        tool_span.set(source="call", result_chars=len(str(value)))
+        return value
+
+def get_ai_response(user_message: str, tools: list = None, function_map: dict = None,
+                    history: list = None, on_event=None) -> dict:
+    """
+    Get AI response from OpenRouter with optional function calling.
+
+    The tool-selection call goes to the router's fast tier; the answer after
+    a tool call goes to the fast tier for short tool results and to the
+    strong tier otherwise. Tools with a direct-answer template skip the
+    second call entirely.
+
+    With ``on_event`` the pipeline reports progress as it goes, and the
+    final answer is streamed:
+    {"type": "tool", "name", "args", "state": "running" | "done"},
+    {"type": "calendar_url", "url"} and {"type": "token", "text"}.
 
     Args:
         user_message (str): User's message/query
         tools (list, optional): List of available tools/functions
         function_map (dict, optional): Dictionary mapping function names to actual functions
+        history (list, optional): Earlier {"role", "content"} turns of the conversation
+        on_event (callable, optional): Called with each progress event (from this thread)
 
     Returns:
         dict: Response containing AI message and any function results
     """
-    if not OPENROUTERKEY:
+    if not config.openrouter_key:
         return {"error": "Missing OpenRouter API key"}
 
     headers = {
-        "Authorization": f"Bearer {OPENROUTERKEY}",
+        "Authorization": f"Bearer {config.openrouter_key}",
         "Content-Type": "application/json"
     }
 
-    # Team reference data for sports queries
-    team_reference = """Format: School | Nickname | ESPN_ID | Abbreviation
-Ohio State        | Buckeyes       | 194  | OSU
-Indiana           | Hoosiers       | 84   | IND
-Texas A&M         | Aggies         | 245  | TAMU
-Alabama           | Crimson Tide   | 333  | ALA
-Georgia           | Bulldogs       | 61   | UGA
-Ole Miss          | Rebels         | 145  | MISS
-BYU               | Cougars        | 252  | BYU
-Texas Tech        | Red Raiders    | 2641 | TTU
-Oregon            | Ducks          | 2483 | ORE
-Notre Dame        | Fighting Irish | 87   | ND
-Tennessee         | Volunteers     | 2633 | TENN
-Miami             | Hurricanes     | 2390 | MIA
-Texas             | Longhorns      | 251  | TEX
-Virginia          | Cavaliers      | 258  | UVA
-Penn State        | Nittany Lions  | 213  | PSU
-Clemson           | Tigers         | 228  | CLEM
-Boise State       | Broncos        | 68   | BSU
-LSU               | Tigers         | 99   | LSU
-SMU               | Mustangs       | 2567 | SMU
-Iowa              | Hawkeyes       | 2294 | IOWA
-South Carolina    | Gamecocks      | 2579 | SC
-Missouri          | Tigers         | 142  | MIZZOU
-Kansas State      | Wildcats       | 2306 | KSU
-Louisville        | Cardinals      | 97   | LOU
-Colorado          | Buffaloes      | 38   | COLO
-## OTHER MAJOR PROGRAMS
-Michigan          | Wolverines     | 130  | MICH
-USC               | Trojans        | 30   | USC
-Oklahoma          | Sooners        | 201  | OU
-Nebraska          | Cornhuskers    | 158  | NEB
-Florida           | Gators         | 57   | FLA
-Florida State     | Seminoles      | 52   | FSU
-Auburn            | Tigers         | 2    | AUB
-Wisconsin         | Badgers        | 275  | WISC
-UCLA              | Bruins         | 26   | UCLA
-Michigan State    | Spartans       | 127  | MSU
-Washington        | Huskies        | 264  | WASH
-Stanford          | Cardinal       | 24   | STAN
-Arkansas          | Razorbacks     | 8    | ARK
-Oklahoma State    | Cowboys        | 197  | OKST
-TCU               | Horned Frogs   | 2628 | TCU
-Baylor            | Bears          | 239  | BAY
-Utah              | Utes           | 254  | UTAH
-Oregon State      | Beavers        | 204  | ORST
-Arizona State     | Sun Devils     | 9    | ASU
-Arizona           | Wildcats       | 12   | ARIZ
-West Virginia     | Mountaineers   | 277  | WVU
-Iowa State        | Cyclones       | 66   | ISU
-Pittsburgh        | Panthers       | 221  | PITT
-NC State          | Wolfpack       | 152  | NCST
-North Carolina    | Tar Heels      | 153  | UNC
-Duke              | Blue Devils    | 150  | DUKE
-Virginia Tech     | Hokies         | 259  | VT
-Georgia Tech      | Yellow Jackets | 59   | GT
-Kentucky          | Wildcats       | 96   | UK
-Vanderbilt        | Commodores     | 238  | VANDY
-Mississippi State | Bulldogs       | 344  | MSST
-Texas State       | Bobcats        | 326  | TXST
-UCF               | Knights        | 2116 | UCF
-Houston           | Cougars        | 248  | HOU
-Cincinnati        | Bearcats       | 2132 | CIN"""
-
     messages = [
         {
             "role": "system",
-            "content": f"You are a helpful college assistant with access to weather data, deals, college football information, calendar event creation, rental property search, and local events via Ticketmaster. When users ask about college football teams, use the get_college_team_data function with the ESPN_ID from this reference:\n{team_reference}\n\nWhen creating calendar events, use ISO datetime format (YYYY-MM-DDTHH:MM:SS). Current date is 2025-11-08. For event searches, you may need to first get coordinates for a location. Always provide helpful, student-focused responses."
+            "content": SYSTEM_PROMPT
         },
+        *(history or []),
         {
             "role": "user",
             "content": user_message
@@ -103,7 +228,6 @@ Cincinnati        | Bearcats       | 2132 | CIN"""
     ]
 
     payload = {
-        "model": "anthropic/claude-3.5-sonnet",
         "messages": messages
     }
 
@@ -111,14 +235,20 @@ Cincinnati        | Bearcats       | 2132 | CIN"""
     if tools:
         payload["tools"] = tools
 
+    # Ask OpenRouter to report cached tokens and the charged cost
+    payload["usage"] = {"include": True}
+
+    # Start likely tool calls now so they overlap the tool-selection call
+    speculation = None
+    if function_map and config.speculation_enabled:
+        speculation = speculator.start(user_message, function_map)
+
+    calls = []
+    accounting = {}
+
     try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=payload
-        )
-        response.raise_for_status()
-        result = response.json()
+        result = _chat_completion(payload, headers, tier="fast")
+        calls.append(call_usage("tool_selection", result))
 
         message = result["choices"][0]["message"]
         calendar_url = None
@@ -130,31 +260,46 @@ Cincinnati        | Bearcats       | 2132 | CIN"""
             function_args = json.loads(tool_call["function"]["arguments"])
 
             if function_name in function_map:
-                print(f"Calling {function_name} with args: {function_args}")
-                function_response = function_map[function_name](**function_args)
+                accounting["tool"] = function_name
+                _emit(on_event, "tool", name=function_name, args=function_args, state="running")
+                function_response = _run_tool(function_map, function_name, function_args, speculation)
+                accounting["raw_chars"] = len(str(function_response))
+                _emit(on_event, "tool", name=function_name, args=function_args, state="done")
+                direct_answer = render_direct_answer(function_name, function_args, function_response, user_message)
 
                 # Special handling for calendar events
                 if function_name == "make_event" and function_response.startswith("https://"):
                     calendar_url = function_response
                     function_response = "Calendar event created successfully!"
+                    _emit(on_event, "calendar_url", url=calendar_url)
+
+                # The template already answers the question; skip the second completion
+                if direct_answer is not None:
+                    accounting["sent_chars"] = 0
+                    return {
+                        "response": direct_answer,
+                        "calendar_url": calendar_url,
+                        "function_called": function_name,
+                        "function_args": function_args,
+                        "direct_answer": True,
+                        "usage": request_usage(calls, **accounting)
+                    }
 
                 # Add function call and response to conversation
+                content = compact_tool_result(function_response)
+                accounting["sent_chars"] = len(content)
                 messages.append(message)
                 messages.append({
                     "role": "tool",
                     "tool_call_id": tool_call["id"],
-                    "content": str(function_response)
+                    "content": content
                 })
 
                 # Get final AI response
                 payload["messages"] = messages
-                response = requests.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                result = response.json()
+                on_token = (lambda text: _emit(on_event, "token", text=text)) if on_event else None
+                result = _chat_completion(payload, headers, tier=_final_tier(content), on_token=on_token)
+                calls.append(call_usage("final", result))
 
                 ai_response = result["choices"][0]["message"]["content"]
 
@@ -162,12 +307,13 @@ Cincinnati        | Bearcats       | 2132 | CIN"""
                     "response": ai_response,
                     "calendar_url": calendar_url,
                     "function_called": function_name,
-                    "function_args": function_args
+                    "function_args": function_args,
+                    "usage": request_usage(calls, **accounting)
                 }
 
         # Return direct AI response if no function calls
         ai_response = message.get("content", "No response")
-        return {"response": ai_response}
+        return {"response": ai_response, "usage": request_usage(calls)}
 
     except requests.exceptions.RequestException as e:
         return {"error": f"API request failed: {str(e)}"}
@@ -175,6 +321,11 @@ Cincinnati        | Bearcats       | 2132 | CIN"""
         return {"error": f"Failed to parse API response: {str(e)}"}
     except Exception as e:
         return {"error": f"Unexpected error: {str(e)}"}
+    finally:
+        if speculation is not None:
+            speculator.finish(speculation)
+        if calls:
+            usage_ledger.record(request_usage(calls, **accounting))
 
 def get_default_tools():
     """
@@ -183,151 +334,381 @@ def get_default_tools():
     Returns:
         list: List of tool definitions for the AI model
     """
-    return [
-        {
-            "type": "function",
-            "function": {
-                "name": "get_weather",
-                "description": "Get current weather for a location by name (e.g., 'New York', 'London', 'Tokyo')",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "location": {
-                            "type": "string",
-                            "description": "Name of the location (city, address, or place name)"
-                        }
-                    },
-                    "required": ["location"]
-                }
+    return DEFAULT_TOOLS
+
+# Tool definitions sent with every completion request
+DEFAULT_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_weather",
+            "description": "Get current weather for a location by name (e.g., 'New York', 'London', 'Tokyo')",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "Name of the location (city, address, or place name)"
+                    }
+                },
+                "required": ["location"]
             }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "get_deals",
-                "description": "Get deals and discounts for a specific location",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "location": {
-                            "type": "string",
-                            "description": "Location to search for deals"
-                        }
-                    },
-                    "required": ["location"]
-                }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_weather_multi",
+            "description": "Compare current weather across several locations in one call (e.g., ['Austin', 'Houston', 'College Station'])",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "locations": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Names of the locations to compare"
+                    }
+                },
+                "required": ["locations"]
             }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "get_college_team_data",
-                "description": "Get college football team schedule, scores, and game data. Use the ESPN_ID from the team reference table.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "team_id": {
-                            "type": "string",
-                            "description": "ESPN team ID (refer to the team reference table)"
-                        }
-                    },
-                    "required": ["team_id"]
-                }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_weather_forecast",
+            "description": "Get the forecast for a location at a specific local time, over a time window, or for a whole day (up to 7 days ahead). Use for questions like 'will it rain during my 3 pm class' or 'what should I wear to Saturday's game'",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "Name of the location"
+                    },
+                    "start": {
+                        "type": "string",
+                        "description": "Local date (YYYY-MM-DD) for a daily summary, or local datetime (YYYY-MM-DDTHH:MM) for a specific hour or window start"
+                    },
+                    "end": {
+                        "type": "string",
+                        "description": "Optional local end datetime (YYYY-MM-DDTHH:MM) to summarize a window"
+                    }
+                },
+                "required": ["location", "start"]
             }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "make_event",
-                "description": "Create a calendar event that can be added to Google Calendar. Dates should be in ISO format (YYYY-MM-DDTHH:MM:SS)",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "title": {
-                            "type": "string",
-                            "description": "Event title"
-                        },
-                        "start_datetime": {
-                            "type": "string",
-                            "description": "Start date and time in ISO format (e.g., '2025-11-15T14:00:00')"
-                        },
-                        "end_datetime": {
-                            "type": "string",
-                            "description": "End date and time in ISO format (e.g., '2025-11-15T16:00:00')"
-                        },
-                        "description": {
-                            "type": "string",
-                            "description": "Event description (optional)"
-                        },
-                        "location": {
-                            "type": "string",
-                            "description": "Event location (optional)"
-                        }
-                    },
-                    "required": ["title", "start_datetime", "end_datetime"]
-                }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_deals",
+            "description": "Get the best deals and discounts for a location, highest discount first, filtered by category, merchant, discount or price",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "Location to search for deals"
+                    },
+                    "category": {
+                        "type": "string",
+                        "description": "Optional category (e.g., 'food', 'drinks', 'fitness', 'beauty', 'entertainment', 'shopping')"
+                    },
+                    "merchant": {
+                        "type": "string",
+                        "description": "Optional part of a merchant name"
+                    },
+                    "keyword": {
+                        "type": "string",
+                        "description": "Optional words that must appear in the deal (e.g., 'pizza')"
+                    },
+                    "min_discount": {
+                        "type": "integer",
+                        "description": "Optional minimum discount percentage (e.g., 40)"
+                    },
+                    "max_price": {
+                        "type": "number",
+                        "description": "Optional highest deal price in dollars (for 'cheap' deals)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of deals to return (default: 10)"
+                    }
+                },
+                "required": ["location"]
             }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "get_rentals",
-                "description": "Search for rental properties in a specific location using Zillow data",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "location": {
-                            "type": "string",
-                            "description": "Location to search for rentals (e.g., 'college station, tx', 'new york, ny')"
-                        }
-                    },
-                    "required": ["location"]
-                }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_college_team_data",
+            "description": "Get college football team schedule, scores, and game data. Use the ESPN_ID from the team reference table.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "team_id": {
+                        "type": "string",
+                        "description": "ESPN team ID (refer to the team reference table)"
+                    }
+                },
+                "required": ["team_id"]
             }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "get_events",
-                "description": "Get nearby events from Ticketmaster based on latitude and longitude coordinates",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "lat": {
-                            "type": "number",
-                            "description": "Latitude coordinate"
-                        },
-                        "lon": {
-                            "type": "number",
-                            "description": "Longitude coordinate"
-                        },
-                        "radius": {
-                            "type": "integer",
-                            "description": "Search radius (default: 10)"
-                        },
-                        "unit": {
-                            "type": "string",
-                            "description": "Distance unit: 'miles' or 'km' (default: 'miles')"
-                        },
-                        "keyword": {
-                            "type": "string",
-                            "description": "Optional keyword to filter events"
-                        },
-                        "start_date": {
-                            "type": "string",
-                            "description": "Optional start date in ISO format"
-                        },
-                        "end_date": {
-                            "type": "string",
-                            "description": "Optional end date in ISO format"
-                        },
-                        "size": {
-                            "type": "integer",
-                            "description": "Number of results to return (default: 20)"
-                        }
-                    },
-                    "required": ["lat", "lon"]
-                }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_team_season_info",
+            "description": "Get a college football team's record so far, last result and next game, plus head-to-head games against an opponent if given. Use the ESPN_ID from the team reference table.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "team_id": {
+                        "type": "string",
+                        "description": "ESPN team ID"
+                    },
+                    "opponent_id": {
+                        "type": "string",
+                        "description": "Optional ESPN team ID of an opponent for head-to-head results"
+                    }
+                },
+                "required": ["team_id"]
             }
         }
-    ]
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "make_event",
+            "description": "Create a calendar event that can be added to Google Calendar. Dates should be in ISO format (YYYY-MM-DDTHH:MM:SS)",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "title": {
+                        "type": "string",
+                        "description": "Event title"
+                    },
+                    "start_datetime": {
+                        "type": "string",
+                        "description": "Start date and time in ISO format (e.g., '2025-11-15T14:00:00')"
+                    },
+                    "end_datetime": {
+                        "type": "string",
+                        "description": "End date and time in ISO format (e.g., '2025-11-15T16:00:00')"
+                    },
+                    "description": {
+                        "type": "string",
+                        "description": "Event description (optional)"
+                    },
+                    "location": {
+                        "type": "string",
+                        "description": "Event location (optional)"
+                    }
+                },
+                "required": ["title", "start_datetime", "end_datetime"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_rentals",
+            "description": "Search for rental properties in a specific location using Zillow data, with optional price, bedroom, bathroom and distance-from-campus filters, sorting and paging. Results include each listing's distance to campus in miles",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "Location to search for rentals (e.g., 'college station, tx', 'new york, ny')"
+                    },
+                    "min_price": {
+                        "type": "integer",
+                        "description": "Optional minimum monthly rent"
+                    },
+                    "max_price": {
+                        "type": "integer",
+                        "description": "Optional maximum monthly rent"
+                    },
+                    "bedrooms": {
+                        "type": "integer",
+                        "description": "Optional exact number of bedrooms"
+                    },
+                    "bathrooms": {
+                        "type": "number",
+                        "description": "Optional minimum number of bathrooms"
+                    },
+                    "max_distance": {
+                        "type": "number",
+                        "description": "Optional maximum distance from campus in miles"
+                    },
+                    "sort": {
+                        "type": "string",
+                        "description": "Sort by 'price', 'bedrooms', 'bathrooms', 'square_feet' or 'distance' (from campus); prefix with '-' for descending (default: 'price')"
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Number of results to skip, for paging (default: 0)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of results to return (default: 20)"
+                    }
+                },
+                "required": ["location"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_rental_summary",
+            "description": "Summarize the rental market in a location (median and quartile rent, rent per square foot, counts and median rent by bedrooms and home type). Use this for questions about typical or average rent instead of listing properties",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "Location to summarize rentals for (e.g., 'college station, tx')"
+                    },
+                    "min_price": {
+                        "type": "integer",
+                        "description": "Optional minimum monthly rent"
+                    },
+                    "max_price": {
+                        "type": "integer",
+                        "description": "Optional maximum monthly rent"
+                    },
+                    "bedrooms": {
+                        "type": "integer",
+                        "description": "Optional exact number of bedrooms"
+                    },
+                    "bathrooms": {
+                        "type": "number",
+                        "description": "Optional minimum number of bathrooms"
+                    },
+                    "max_distance": {
+                        "type": "number",
+                        "description": "Optional maximum distance from campus in miles"
+                    }
+                },
+                "required": ["location"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_events",
+            "description": "Get nearby events from Ticketmaster based on latitude and longitude coordinates. Results include venue, price range, segment and genre; filter with segment/genre rather than keyword for categories like music or sports",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "lat": {
+                        "type": "number",
+                        "description": "Latitude coordinate"
+                    },
+                    "lon": {
+                        "type": "number",
+                        "description": "Longitude coordinate"
+                    },
+                    "radius": {
+                        "type": "integer",
+                        "description": "Search radius (default: 10)"
+                    },
+                    "unit": {
+                        "type": "string",
+                        "description": "Distance unit: 'miles' or 'km' (default: 'miles')"
+                    },
+                    "keyword": {
+                        "type": "string",
+                        "description": "Optional keyword to filter events"
+                    },
+                    "start_date": {
+                        "type": "string",
+                        "description": "Optional start date in ISO format"
+                    },
+                    "end_date": {
+                        "type": "string",
+                        "description": "Optional end date in ISO format"
+                    },
+                    "size": {
+                        "type": "integer",
+                        "description": "Number of results to return (default: 20)"
+                    },
+                    "segment": {
+                        "type": "string",
+                        "description": "Optional event segment(s), comma-separated: 'Music', 'Sports', 'Arts & Theatre', 'Film', 'Miscellaneous' (e.g., 'Music,Sports')"
+                    },
+                    "genre": {
+                        "type": "string",
+                        "description": "Optional genre(s), comma-separated (e.g., 'Rock', 'Football', 'Comedy')"
+                    }
+                },
+                "required": ["lat", "lon"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_events_near",
+            "description": "Find Ticketmaster events near a place name (no coordinates needed). With a start_date, also returns that day's forecast for the place",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "Place name (e.g., 'College Station, TX')"
+                    },
+                    "radius": {
+                        "type": "integer",
+                        "description": "Search radius in miles (default: 25)"
+                    },
+                    "keyword": {
+                        "type": "string",
+                        "description": "Optional keyword to filter events"
+                    },
+                    "start_date": {
+                        "type": "string",
+                        "description": "Optional start date in ISO format"
+                    },
+                    "end_date": {
+                        "type": "string",
+                        "description": "Optional end date in ISO format"
+                    },
+                    "size": {
+                        "type": "integer",
+                        "description": "Number of results to return (default: 20)"
+                    },
+                    "segment": {
+                        "type": "string",
+                        "description": "Optional event segment(s), comma-separated: 'Music', 'Sports', 'Arts & Theatre', 'Film', 'Miscellaneous'"
+                    },
+                    "genre": {
+                        "type": "string",
+                        "description": "Optional genre(s), comma-separated (e.g., 'Rock', 'Football', 'Comedy')"
+                    }
+                },
+                "required": ["location"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_weather_for_game",
+            "description": "Weather forecast at the stadium around kickoff of a college football team's next game, with the game details",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "team": {
+                        "type": "string",
+                        "description": "ESPN team ID from the reference table, or the team name"
+                    }
+                },
+                "required": ["team"]
+            }
+        }
+    }
+]
@@ -0,0 +1,673 @@
+"""
+Cache Backends
+
+Interchangeable key/value stores behind the tool cache and the other
+caches in this package:
+
+- MemoryBackend: per-process LRU (the default; fastest, not shared)
+- SQLiteBackend: one file shared by every gunicorn worker on a host
+- RedisBackend: any Redis-protocol server, shared across nodes
+
+All backends store JSON-serializable values with an optional TTL and use
+wall-clock expiry times, so entries stay valid across processes and can
+be snapshotted on shutdown and loaded again on boot. Backends fail open:
+a backend that cannot be reached behaves like an empty cache.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from .config import config
+from .tracing import span
+
+
+class CacheBackend:
+    """Interface shared by all cache backends. Keys are strings."""
+
+    def get(self, key: str):
+        """Return (hit, value)."""
+        raise NotImplementedError
+
+    def set(self, key: str, value, ttl: float = None):
+        """Store a value; ``ttl`` of None means no expiry."""
+        raise NotImplementedError
+
+    def add(self, key: str, value, ttl: float = None) -> bool:
+        """Store a value only if the key has no live entry; returns whether it was stored."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Remove a key if present."""
+        raise NotImplementedError
+
+    def items(self):
+        """Yield (key, value, expires_at) for live entries; expires_at is epoch seconds or None."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every entry."""
+        raise NotImplementedError
+
+    def size(self) -> int:
+        """Number of stored entries (may include expired ones not yet purged)."""
+        raise NotImplementedError
+
+    def count(self, prefix: str):
+        """Entries whose key starts with ``prefix``, or None if that needs a full scan."""
+        return sum(1 for key, _, _ in self.items() if key.startswith(prefix))
+
+    def close(self):
+        """Release connections."""
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In-process LRU store.
+
+    Args:
+        max_entries (int, optional): Entries kept before evicting the least recently used
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value, ttl: float = None):
+        expires_at = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def add(self, key: str, value, ttl: float = None) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.time()):
+                return False
+        self.set(key, value, ttl)
+        return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def items(self):
+        now = time.time()
+        with self._lock:
+            entries = list(self._entries.items())
+        for key, (expires_at, value) in entries:
+            if expires_at is None or expires_at > now:
+                yield key, value, expires_at
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def count(self, prefix: str) -> int:
+        with self._lock:
+            return sum(1 for key in self._entries if key.startswith(prefix))
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    SQLite file store shared by all processes on a host.
+
+    Uses WAL mode so readers in one worker never block writers in another.
+    Reads do not write: access times of hits are collected in memory and
+    written in one batch every TOUCH_BATCH hits or TOUCH_INTERVAL seconds
+    (and before trimming), and expired rows are left for the trim. Once the
+    table grows past ``max_entries`` the least recently used rows are deleted.
+
+    Args:
+        path (str): Database file path
+        max_entries (int, optional): Rows kept before LRU eviction
+    """
+
+    TOUCH_BATCH = 256
+    TOUCH_INTERVAL = 5.0
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._local = threading.local()
+        self._writes = 0
+        self._touched = {}          # key -> last access time not yet written
+        self._touch_lock = threading.Lock()
+        self._touch_flushed = time.time()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        try:
+            conn = self._conn()
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False, None
+            now = time.time()
+            if row[1] is not None and row[1] <= now:
+                return False, None
+            self._touch(key, now)
+            return True, json.loads(row[0])
+        except sqlite3.Error as e:
+            print(f"SQLite cache read failed: {e}")
+            return False, None
+
+    def _touch(self, key: str, now: float):
+        """Record a hit; write the collected access times once enough have piled up."""
+        with self._touch_lock:
+            self._touched[key] = now
+            if len(self._touched) < self.TOUCH_BATCH and now - self._touch_flushed < self.TOUCH_INTERVAL:
+                return
+            touched, self._touched = self._touched, {}
+            self._touch_flushed = now
+        self._write_touches(touched)
+
+    def _write_touches(self, touched: dict):
+        if not touched:
+            return
+        try:
+            self._conn().executemany(
+                "UPDATE cache SET accessed = MAX(accessed, ?) WHERE key = ?",
+                [(accessed, key) for key, accessed in touched.items()],
+            )
+        except sqlite3.Error as e:
+            print(f"SQLite cache access update failed: {e}")
+
+    def flush_touches(self):
+        """Write pending access times now."""
+        with self._touch_lock:
+            touched, self._touched = self._touched, {}
+            self._touch_flushed = time.time()
+        self._write_touches(touched)
+
+    def set(self, key: str, value, ttl: float = None):
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._trim(conn, now)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"SQLite cache write failed: {e}")
+
+    def add(self, key: str, value, ttl: float = None) -> bool:
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        try:
+            # Inserts, or replaces only a row that has already expired
+            cursor = self._conn().execute(
+                "INSERT INTO cache (key, value, expires_at, accessed) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, "
+                "accessed = excluded.accessed WHERE cache.expires_at IS NOT NULL AND cache.expires_at <= ?",
+                (key, json.dumps(value), expires_at, now, now),
+            )
+            return cursor.rowcount > 0
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"SQLite cache write failed: {e}")
+            return False
+
+    def _trim(self, conn: sqlite3.Connection, now: float):
+        self.flush_touches()
+        conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        excess = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+
+    def delete(self, key: str):
+        try:
+            self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"SQLite cache delete failed: {e}")
+
+    def items(self):
+        rows = self._conn().execute(
+            "SELECT key, value, expires_at FROM cache WHERE expires_at IS NULL OR expires_at > ?", (time.time(),)
+        ).fetchall()
+        for key, value, expires_at in rows:
+            yield key, json.loads(value), expires_at
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache")
+
+    def size(self) -> int:
+        try:
+            return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def count(self, prefix: str) -> int:
+        try:
+            # Range over the primary key instead of LIKE, so the index is used
+            return self._conn().execute(
+                "SELECT COUNT(*) FROM cache WHERE key >= ? AND key < ?", (prefix, prefix + "\U0010ffff")
+            ).fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def close(self):
+        self.flush_touches()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class RedisError(Exception):
+    """Error reply or protocol failure from a Redis-protocol server."""
+
+
+class RedisConnection:
+    """
+    Minimal RESP2 client: one socket, one command at a time.
+
+    Args:
+        url (str): redis://[:password@]host:port[/db]
+        timeout (float, optional): Socket timeout in seconds
+    """
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        try:
+            self._file = self._sock.makefile("rb")
+            if self.password:
+                self._send("AUTH", self.password)
+            if self.db:
+                self._send("SELECT", self.db)
+        except BaseException:
+            self._close()
+            raise
+
+    def _close(self):
+        for handle in (self._file, self._sock):
+            if handle is not None:
+                try:
+                    handle.close()
+                except OSError:
+                    pass
+        self._sock = self._file = None
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("connection closed")
+        prefix, rest = line[:1], line[1:-2]
+        if prefix == b"+":
+            return rest.decode()
+        if prefix == b"-":
+            raise RedisError(rest.decode())
+        if prefix == b":":
+            return int(rest)
+        if prefix == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read() for _ in range(count)]
+        raise RedisError(f"unexpected reply {line!r}")
+
+    def _send(self, *args):
+        self._sock.sendall(self._encode(args))
+        return self._read()
+
+    def execute(self, *args):
+        """
+        Send one command and return its reply, reconnecting once on a dropped socket.
+
+        Raises:
+            RedisError: Error reply from the server
+            OSError: Server unreachable
+        """
+        return self.pipeline([args])[0]
+
+    def pipeline(self, commands: list) -> list:
+        """
+        Send several commands in one write and read all their replies.
+
+        Args:
+            commands (list): Argument tuples, one per command
+
+        Returns:
+            list: Replies in order
+
+        Raises:
+            RedisError: Error reply from the server (after every reply is read)
+            OSError: Server unreachable
+        """
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._sock.sendall(b"".join(self._encode(args) for args in commands))
+                    replies, error = [], None
+                    for _ in commands:
+                        try:
+                            replies.append(self._read())
+                        except RedisError as e:
+                            replies.append(None)
+                            error = error or e
+                    if error is not None:
+                        raise error
+                    return replies
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+class RedisBackend(CacheBackend):
+    """
+    Store on a Redis-protocol server (Redis, Valkey, KeyDB, or the stand-in
+    in bench/redis_standin.py), shared by every worker on every node.
+
+    Args:
+        url (str): Server URL
+        prefix (str, optional): Prepended to every key
+    """
+
+    def __init__(self, url: str, prefix: str = "cc:"):
+        self.prefix = prefix
+        self.client = RedisConnection(url)
+
+    def get(self, key: str):
+        try:
+            data = self.client.execute("GET", self.prefix + key)
+        except (OSError, RedisError) as e:
+            print(f"Redis cache read failed: {e}")
+            return False, None
+        if data is None:
+            return False, None
+        return True, json.loads(data)
+
+    def set(self, key: str, value, ttl: float = None):
+        try:
+            args = ["SET", self.prefix + key, json.dumps(value)]
+            if ttl is not None:
+                args += ["PX", max(1, int(ttl * 1000))]
+            self.client.execute(*args)
+        except (OSError, RedisError, TypeError, ValueError) as e:
+            print(f"Redis cache write failed: {e}")
+
+    def add(self, key: str, value, ttl: float = None) -> bool:
+        try:
+            args = ["SET", self.prefix + key, json.dumps(value), "NX"]
+            if ttl is not None:
+                args += ["PX", max(1, int(ttl * 1000))]
+            return self.client.execute(*args) is not None
+        except (OSError, RedisError, TypeError, ValueError) as e:
+            print(f"Redis cache write failed: {e}")
+            return False
+
+    def delete(self, key: str):
+        try:
+            self.client.execute("DEL", self.prefix + key)
+        except (OSError, RedisError) as e:
+            print(f"Redis cache delete failed: {e}")
+
+    def _key_batches(self):
+        """Full keys under the prefix, one SCAN page at a time."""
+        cursor = "0"
+        while True:
+            cursor, keys = self.client.execute("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 500)
+            cursor = cursor.decode() if isinstance(cursor, bytes) else str(cursor)
+            if keys:
+                yield [key.decode() for key in keys]
+            if cursor == "0":
+                break
+
+    def items(self):
+        # One round trip per SCAN page for the values and TTLs, not two per key
+        for keys in self._key_batches():
+            now = time.time()
+            replies = self.client.pipeline([("GET", k) for k in keys] + [("PTTL", k) for k in keys])
+            for full_key, data, pttl in zip(keys, replies[:len(keys)], replies[len(keys):]):
+                if data is None or pttl == -2:
+                    continue
+                expires_at = None if pttl == -1 else now + pttl / 1000
+                yield full_key[len(self.prefix):], json.loads(data), expires_at
+
+    def clear(self):
+        for keys in self._key_batches():
+            self.client.execute("DEL", *keys)
+
+    def size(self) -> int:
+        """Keys in the database (DBSIZE; includes keys outside the prefix)."""
+        try:
+            return self.client.execute("DBSIZE")
+        except (OSError, RedisError):
+            return 0
+
+    def count(self, prefix: str):
+        # Redis cannot count keys by prefix without scanning the keyspace
+        return None
+
+    def close(self):
+        self.client.close()
+
+
+class NamespacedBackend(CacheBackend):
+    """View of a shared backend that prefixes every key with a namespace."""
+
+    def __init__(self, backend: CacheBackend, namespace: str):
+        self.backend = backend
+        self.prefix = namespace + "|"
+
+    def get(self, key: str):
+        with span("cache.get", namespace=self.prefix[:-1]) as lookup:
+            hit, value = self.backend.get(self.prefix + key)
+            lookup.set(hit=hit)
+            return hit, value
+
+    def set(self, key: str, value, ttl: float = None):
+        self.backend.set(self.prefix + key, value, ttl)
+
+    def add(self, key: str, value, ttl: float = None) -> bool:
+        return self.backend.add(self.prefix + key, value, ttl)
+
+    def delete(self, key: str):
+        self.backend.delete(self.prefix + key)
+
+    def items(self):
+        for key, value, expires_at in self.backend.items():
+            if key.startswith(self.prefix):
+                yield key[len(self.prefix):], value, expires_at
+
+    def clear(self):
+        for key, _, _ in list(self.items()):
+            self.delete(key)
+
+    def size(self):
+        """Entries in this namespace, or None when the backend cannot count them cheaply (Redis)."""
+        return self.backend.count(self.prefix)
+
+    @property
+    def evictions(self) -> int:
+        return getattr(self.backend, "evictions", 0)
+
+
+def snapshot(backend: CacheBackend, path: str) -> int:
+    """
+    Write every live entry to a JSON-lines file, atomically.
+
+    Args:
+        backend (CacheBackend): Backend to dump
+        path (str): Snapshot file path
+
+    Returns:
+        int: Number of entries written
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    count = 0
+    with open(tmp_path, "w") as f:
+        for key, value, expires_at in backend.items():
+            try:
+                f.write(json.dumps({"key": key, "value": value, "expires_at": expires_at}) + "\n")
+            except (TypeError, ValueError):
+                continue
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def restore(backend: CacheBackend, path: str) -> int:
+    """
+    Load a snapshot written by ``snapshot``, skipping entries that expired
+    meanwhile and keys the backend already holds (a shared backend may have
+    fresher values than the snapshot).
+
+    Args:
+        backend (CacheBackend): Backend to fill
+        path (str): Snapshot file path
+
+    Returns:
+        int: Number of entries loaded
+    """
+    if not path or not os.path.exists(path):
+        return 0
+    now = time.time()
+    count = 0
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            expires_at = entry.get("expires_at")
+            if expires_at is not None and expires_at <= now:
+                continue
+            if backend.add(entry["key"], entry["value"], None if expires_at is None else expires_at - now):
+                count += 1
+    return count
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def _build_backend() -> CacheBackend:
+    kind = config.cache_backend
+    if kind == "sqlite":
+        return SQLiteBackend(config.cache_path, max_entries=config.tool_cache_max_entries * 10)
+    if kind == "redis":
+        return RedisBackend(config.redis_url)
+    if kind != "memory":
+        print(f"Unknown CACHE_BACKEND {kind!r}; using memory")
+    return MemoryBackend(max_entries=config.tool_cache_max_entries)
+
+
+def get_backend(namespace: str) -> CacheBackend:
+    """
+    Backend view for one cache, selected by CACHE_BACKEND.
+
+    Every namespace shares the process-wide backend, so all caches in the
+    package live in the same SQLite file or Redis server.
+
+    Args:
+        namespace (str): Cache name, e.g. "tools" or "geocode"
+
+    Returns:
+        CacheBackend: Namespaced backend
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = _build_backend()
+    return NamespacedBackend(_shared, namespace)
+
+
+def snapshot_shared() -> int:
+    """Snapshot the shared backend to CACHE_SNAPSHOT_PATH (no-op when unset)."""
+    if _shared is None or not config.cache_snapshot_path:
+        return 0
+    try:
+        return snapshot(_shared, config.cache_snapshot_path)
+    except (OSError, RedisError) as e:
+        print(f"Cache snapshot failed: {e}")
+        return 0
+
+
+def restore_shared() -> int:
+    """Load CACHE_SNAPSHOT_PATH into the shared backend (no-op when unset)."""
+    if not config.cache_snapshot_path:
+        return 0
+    get_backend("")
+    try:
+        return restore(_shared, config.cache_snapshot_path)
+    except (OSError, RedisError) as e:
+        print(f"Cache restore failed: {e}")
+        return 0
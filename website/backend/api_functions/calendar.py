@@ -1,10 +1,6 @@
-import os
-from dotenv import load_dotenv
 from datetime import datetime
 from urllib.parse import quote_plus
 
-load_dotenv()
-
 def make_event(title: str, start_datetime: str, end_datetime: str, description: str = "", location: str = "") -> str:
     """
     Create a calendar event that can be added to Google Calendar.
@@ -0,0 +1,170 @@
+"""
+Cassettes
+
+Record-and-replay for every upstream request, OpenRouter included, at the
+upstream.fetch layer.
+
+- CASSETTE_MODE=record: requests go out as usual and each request/response
+  pair is appended to CASSETTE_PATH (JSON lines).
+- CASSETTE_MODE=replay: nothing leaves the process. Responses come from the
+  cassette, after the recorded latency multiplied by CASSETTE_TIME_SCALE
+  (0 replays instantly). A request missing from the cassette fails like a
+  connection error.
+
+Requests match on method, URL, query parameters and JSON body. API keys
+and authorization headers are stripped before matching and are never
+written. Identical requests recorded several times replay in order, and
+the last recording repeats after that.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Query parameters and headers that carry credentials
+SECRET_PARAMS = {"apikey", "api_key", "key", "token", "access_token"}
+KEPT_HEADERS = ("Content-Type", "Retry-After")
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Replay found no recording for a request."""
+
+
+def _clean_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ""))
+
+
+def request_key(method: str, url: str, params: dict = None, json_body=None) -> str:
+    """
+    Stable identity of a request, without credentials.
+
+    Args:
+        method (str): HTTP method
+        url (str): Request URL (its query string is included)
+        params (dict, optional): Query parameters
+        json_body (optional): JSON request body
+
+    Returns:
+        str: Hex digest
+    """
+    clean_params = sorted(
+        (str(k), str(v)) for k, v in (params or {}).items() if str(k).lower() not in SECRET_PARAMS and v is not None
+    )
+    body = json.dumps(json_body, sort_keys=True, default=str) if json_body is not None else ""
+    material = json.dumps([method.upper(), _clean_url(url), clean_params, body])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _encode_body(content: bytes) -> dict:
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode()}
+
+
+def _decode_body(entry: dict) -> bytes:
+    if "base64" in entry:
+        return base64.b64decode(entry["base64"])
+    return entry.get("text", "").encode("utf-8")
+
+
+class Cassette:
+    """
+    One cassette file.
+
+    Args:
+        path (str): JSON-lines file
+        mode (str): "record" or "replay"
+        time_scale (float, optional): Multiplier for recorded latency on replay
+    """
+
+    def __init__(self, path: str, mode: str, time_scale: float = 1.0):
+        self.path = path
+        self.mode = mode
+        self.time_scale = time_scale
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._cursor = {}
+        if mode == "replay":
+            self._load()
+
+    def _load(self):
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+        print(f"Cassette {self.path}: {sum(len(v) for v in self._entries.values())} recordings loaded")
+
+    def record(self, upstream: str, method: str, url: str, kwargs: dict, response, elapsed: float):
+        entry = {
+            "key": request_key(method, url, kwargs.get("params"), kwargs.get("json")),
+            "upstream": upstream,
+            "method": method.upper(),
+            "url": _clean_url(url),
+            "status": response.status_code,
+            "headers": {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+            "elapsed": round(elapsed, 4),
+            "body": _encode_body(response.content),
+        }
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+            self.recorded += 1
+
+    def replay(self, method: str, url: str, kwargs: dict):
+        """
+        Serve a recorded response.
+
+        Raises:
+            CassetteMiss: No recording matches the request
+        """
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("json"))
+        with self._lock:
+            recordings = self._entries.get(key)
+            if not recordings:
+                self.misses += 1
+                raise CassetteMiss(f"No cassette recording for {method.upper()} {_clean_url(url)}")
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            entry = recordings[min(index, len(recordings) - 1)]
+            self.replayed += 1
+
+        if self.time_scale > 0:
+            time.sleep(entry["elapsed"] * self.time_scale)
+
+        body = _decode_body(entry["body"])
+        response = requests.Response()
+        response.status_code = entry["status"]
+        # Marked consumed so iter_content/iter_lines (streamed completions) read the
+        # buffered body; raw is there for code that reads the socket stream directly
+        response._content = body
+        response._content_consumed = True
+        response.raw = io.BytesIO(body)
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response.url = entry["url"]
+        response.encoding = "utf-8"
+        response.reason = "Replayed"
+        return response
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "misses": self.misses,
+        }
@@ -0,0 +1,156 @@
+"""
+Composite Tools
+
+Tools that chain several lookups on the server so one model turn does the
+work of two or three: geocoding a place name before an event search, or
+finding a team's next game, locating its venue and reading the forecast for
+kickoff. Steps that do not depend on each other run concurrently, with the
+caller's trace and quota priority carried into the worker threads.
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import config
+from .event_catalog import event_catalog, filter_events
+from .forecast import forecast_store
+from .geocoding import geocode
+from .season import game_date, game_summary, season_store
+from .teams import TEAMS, find_team_id
+
+# Hours of forecast summarized for a game
+GAME_HOURS = 3.5
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="composite")
+
+
+def _submit(func, *args):
+    return _executor.submit(contextvars.copy_context().run, func, *args)
+
+
+def _day_forecast(lat: float, lon: float, date: str) -> dict:
+    try:
+        return forecast_store.get(lat, lon).day(date)
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+def get_events_near(location: str, radius: int = 25, keyword: str = None, start_date: str = None,
+                    end_date: str = None, size: int = 20, segment: str = None, genre: str = None) -> dict:
+    """
+    Events around a place name: geocodes it and searches Ticketmaster in one call.
+
+    When a start date is given, that day's forecast for the place is fetched
+    alongside the events.
+
+    Args:
+        location (str): Place name (e.g., 'College Station, TX')
+        radius (int, optional): Search radius in miles (default: 25)
+        keyword (str, optional): Optional keyword to filter events
+        start_date (str, optional): Optional start date in ISO format
+        end_date (str, optional): Optional end date in ISO format
+        size (int, optional): Number of results to return (default: 20)
+        segment (str, optional): Optional segment(s), comma-separated (e.g., 'Music,Sports')
+        genre (str, optional): Optional genre(s), comma-separated (e.g., 'Rock', 'Football')
+
+    Returns:
+        dict: {"location", "events"[, "forecast"]}, or an error; a failed
+            forecast leaves the events with "forecast": None and a "forecast_error"
+    """
+    if not config.ticketmaster_key:
+        return {"error": "Missing TICKETMASTER_API_KEY in environment variables"}
+
+    try:
+        place = geocode(location)
+        if place is None:
+            return {"error": "Location not found"}
+
+        forecast = None
+        if start_date:
+            forecast = _submit(_day_forecast, place["lat"], place["lon"], start_date[:10])
+        events = event_catalog.near(place["lat"], place["lon"], float(radius), start_date, end_date,
+                                    keyword=keyword, segment=segment, genre=genre)
+
+        result = {
+            "location": place["name"],
+            "events": filter_events(events, keyword=keyword, segment=segment, genre=genre, size=size),
+        }
+        if forecast is not None:
+            # A failed forecast must not cost the caller the events already found
+            try:
+                result["forecast"] = dict(forecast.result(), date=start_date[:10],
+                                          units={"temperature": "°C", "precipitation": "mm"})
+            except Exception as e:
+                print(f"Forecast for {place['name']} failed: {e}")
+                result["forecast"] = None
+                result["forecast_error"] = f"Could not fetch the forecast: {str(e)}"
+        return result
+
+    except Exception as e:
+        return {"error": f"Error fetching events near {location}: {str(e)}"}
+
+
+def _team_id(team) -> str:
+    team = str(team).strip()
+    return team if team.isdigit() else find_team_id(team)
+
+
+def _venue_place(venue: str, home_school: str):
+    """Coordinates of a stadium, falling back to the home school's campus."""
+    for query in (venue, f"{home_school} University" if home_school else None):
+        if query:
+            place = geocode(query)
+            if place is not None:
+                return place
+    return None
+
+
+def get_weather_for_game(team) -> dict:
+    """
+    Forecast at the stadium for a team's next game, around kickoff.
+
+    Each step needs the previous one (game, then venue, then forecast), so
+    they run in order; the win is doing them without model turns between.
+
+    Args:
+        team (str): ESPN team ID or team name (e.g., '245' or 'Texas A&M')
+
+    Returns:
+        dict: {"game", "forecast"}, or an error
+    """
+    team_id = _team_id(team)
+    if not team_id:
+        return {"error": f"Unknown team: {team}"}
+
+    try:
+        season_store.ensure_team(team_id)
+        season_store.refresh_if_stale()
+        game = season_store.next_game(team_id)
+        if game is None:
+            return {"error": "No upcoming game found for this team."}
+
+        team_name = season_store.names.get(team_id, "")
+        home_school = next((school for school, _, espn_id, _ in TEAMS
+                            if espn_id == (team_id if game.home else game.opponent_id)), None)
+        result = {
+            "game": dict(game_summary(game, team_name), kickoff_utc=game_date(game, "%Y-%m-%dT%H:%MZ")),
+            "record": season_store.record(team_id),
+        }
+
+        place = _venue_place(game.venue, home_school)
+        if place is None:
+            result["forecast"] = {"error": "Could not locate the venue"}
+            return result
+
+        kickoff = game_date(game, "%Y-%m-%dT%H:%M+00:00")
+        end = game_date(game._replace(start=game.start + GAME_HOURS * 3600), "%Y-%m-%dT%H:%M+00:00")
+        try:
+            forecast = forecast_store.get(place["lat"], place["lon"]).window(kickoff, end)
+            result["forecast"] = dict(forecast, units={"temperature": "°C", "precipitation": "mm", "windspeed": "km/h"})
+        except ValueError:
+            result["forecast"] = {"error": "The forecast covers the next 7 days; check again closer to kickoff"}
+        result["venue_location"] = place["name"]
+        return result
+
+    except Exception as e:
+        return {"error": f"Failed to get game weather: {str(e)}"}
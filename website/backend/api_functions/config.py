@@ -0,0 +1,210 @@
+"""
+Configuration
+
+Loads the .env file exactly once and exposes every setting the backend
+reads through the single ``config`` object below. Tool modules read keys
+from ``config`` at call time instead of parsing the environment on import.
+"""
+
+import os
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _split(value):
+    """Parse a comma-separated setting into a tuple, ignoring blanks."""
+    if not value:
+        return ()
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+def _flag(value, default: bool) -> bool:
+    """Parse a boolean setting ("1", "true", "yes", "on")."""
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass(frozen=True)
+class Config:
+    """Settings read from the environment (and .env) at startup."""
+
+    # API keys
+    openrouter_key: str = None
+    ticketmaster_key: str = None
+    rental_key: str = None
+    deals_key: str = None
+    # Unlocks /api/admin/* and the X-Profile header (admin features are off when unset)
+    admin_token: str = None
+
+    # OpenRouter model routing
+    fast_models: tuple = ("anthropic/claude-3.5-haiku",)
+    strong_models: tuple = ("anthropic/claude-3.5-sonnet",)
+    router_window: int = 50
+    router_max_error_rate: float = 0.3
+    router_cooldown: float = 60.0
+    simple_followup_chars: int = 1500
+    llm_timeout: float = 60.0
+    tool_result_max_chars: int = 12000
+    usage_window: int = 1000
+
+    # Speculative tool prefetch
+    speculation_enabled: bool = True
+    speculation_workers: int = 4
+    speculation_max_waste: float = 0.7
+
+    # Tool result cache
+    tool_cache_max_entries: int = 1024
+    cache_backend: str = "memory"
+    cache_path: str = "/tmp/campus-compass-cache.sqlite3"
+    redis_url: str = "redis://localhost:6379/0"
+    cache_snapshot_path: str = None
+
+    # Upstream APIs
+    upstream_timeout: float = 15.0
+    # Record/replay of upstream traffic: "off", "record" or "replay"
+    cassette_mode: str = "off"
+    cassette_path: str = "/tmp/campus-compass-cassette.jsonl"
+    cassette_time_scale: float = 1.0
+    weather_grid_step: float = 0.05
+    season_preload: bool = True
+    rental_index_ttl: float = 3600.0
+    rental_max_pages: int = 1
+    quota_max_wait: float = 5.0
+    quota_limits: tuple = ()
+    events_ttl: float = 900.0
+    deals_ttl: float = 1800.0
+    events_area_radius: float = 50.0
+    events_max_pages: int = 1
+    # Point rental distances are measured from (default: Texas A&M, College Station)
+    campus_lat: float = 30.6187
+    campus_lon: float = -96.3365
+    # Time zone game times are shown in (IANA name)
+    campus_timezone: str = "America/Chicago"
+
+    # Admission control for /api/chat
+    chat_rate: float = 0.5
+    chat_burst: int = 5
+    chat_max_inflight: int = 8
+    chat_queue_size: int = 16
+    chat_queue_timeout: float = 2.0
+    chat_shed_mode: str = "simple"
+    # Reverse proxies in front of the app; the client address is the
+    # X-Forwarded-For entry the outermost trusted proxy appended
+    trusted_proxy_hops: int = 1
+    # Seconds before /api/chat answers with a degraded reply (0 disables)
+    chat_slo: float = 8.0
+    chat_answer_ttl: float = 600.0
+
+    # Background jobs for async /api/chat
+    jobs_workers: int = 4
+    jobs_max_pending: int = 32
+    job_ttl: float = 600.0
+    # Job records: "memory", "sqlite" or "redis" (empty follows CACHE_BACKEND)
+    jobs_backend: str = None
+    jobs_path: str = "/tmp/campus-compass-jobs.sqlite3"
+    jobs_max_records: int = 1024
+
+    # WebSocket chat server (ws_server.py)
+    ws_port: int = 8765
+    ws_max_pending: int = 4
+    session_history: int = 6
+    session_ttl: float = 3600.0
+
+    # Request tracing (empty TRACE_PATH disables the span file)
+    trace_path: str = "/tmp/campus-compass-traces.jsonl"
+    trace_otlp_endpoint: str = None
+    trace_slow_ms: float = 5000.0
+
+    # Request profiling
+    profile_sample_rate: float = 0.0
+    profile_dir: str = "/tmp/campus-compass-profiles"
+    profile_keep: int = 50
+
+    # Tools whose reply is rendered from a template instead of a second completion
+    direct_answer_tools: tuple = ("make_event", "get_college_team_data")
+
+    @classmethod
+    def from_env(cls, environ=None) -> "Config":
+        """
+        Build a Config from environment variables.
+
+        Args:
+            environ (dict, optional): Mapping to read from (default: os.environ)
+
+        Returns:
+            Config: Populated configuration object
+        """
+        env = os.environ if environ is None else environ
+        return cls(
+            openrouter_key=env.get("key"),
+            ticketmaster_key=env.get("TICKETMASTER_API_KEY"),
+            rental_key=env.get("rental_key"),
+            deals_key=env.get("deals_key"),
+            admin_token=env.get("ADMIN_TOKEN") or None,
+            fast_models=_split(env.get("OPENROUTER_FAST_MODELS")) or cls.fast_models,
+            strong_models=_split(env.get("OPENROUTER_STRONG_MODELS")) or cls.strong_models,
+            router_window=int(env.get("ROUTER_WINDOW", cls.router_window)),
+            router_max_error_rate=float(env.get("ROUTER_MAX_ERROR_RATE", cls.router_max_error_rate)),
+            router_cooldown=float(env.get("ROUTER_COOLDOWN", cls.router_cooldown)),
+            simple_followup_chars=int(env.get("SIMPLE_FOLLOWUP_CHARS", cls.simple_followup_chars)),
+            llm_timeout=float(env.get("LLM_TIMEOUT", cls.llm_timeout)),
+            tool_result_max_chars=int(env.get("TOOL_RESULT_MAX_CHARS", cls.tool_result_max_chars)),
+            usage_window=int(env.get("USAGE_WINDOW", cls.usage_window)),
+            speculation_enabled=_flag(env.get("SPECULATION_ENABLED"), cls.speculation_enabled),
+            speculation_workers=int(env.get("SPECULATION_WORKERS", cls.speculation_workers)),
+            speculation_max_waste=float(env.get("SPECULATION_MAX_WASTE", cls.speculation_max_waste)),
+            tool_cache_max_entries=int(env.get("TOOL_CACHE_MAX_ENTRIES", cls.tool_cache_max_entries)),
+            cache_backend=env.get("CACHE_BACKEND", cls.cache_backend).strip().lower(),
+            cache_path=env.get("CACHE_PATH", cls.cache_path),
+            redis_url=env.get("REDIS_URL", cls.redis_url),
+            cache_snapshot_path=env.get("CACHE_SNAPSHOT_PATH") or None,
+            upstream_timeout=float(env.get("UPSTREAM_TIMEOUT", cls.upstream_timeout)),
+            cassette_mode=env.get("CASSETTE_MODE", cls.cassette_mode).lower(),
+            cassette_path=env.get("CASSETTE_PATH", cls.cassette_path),
+            cassette_time_scale=float(env.get("CASSETTE_TIME_SCALE", cls.cassette_time_scale)),
+            weather_grid_step=float(env.get("WEATHER_GRID_STEP", cls.weather_grid_step)),
+            season_preload=_flag(env.get("SEASON_PRELOAD"), cls.season_preload),
+            rental_index_ttl=float(env.get("RENTAL_INDEX_TTL", cls.rental_index_ttl)),
+            rental_max_pages=int(env.get("RENTAL_MAX_PAGES", cls.rental_max_pages)),
+            quota_max_wait=float(env.get("QUOTA_MAX_WAIT", cls.quota_max_wait)),
+            quota_limits=_split(env.get("QUOTA_LIMITS")),
+            events_ttl=float(env.get("EVENTS_TTL", cls.events_ttl)),
+            deals_ttl=float(env.get("DEALS_TTL", cls.deals_ttl)),
+            events_area_radius=float(env.get("EVENTS_AREA_RADIUS", cls.events_area_radius)),
+            events_max_pages=int(env.get("EVENTS_MAX_PAGES", cls.events_max_pages)),
+            campus_lat=float(env.get("CAMPUS_LAT", cls.campus_lat)),
+            campus_lon=float(env.get("CAMPUS_LON", cls.campus_lon)),
+            campus_timezone=env.get("CAMPUS_TIMEZONE", cls.campus_timezone),
+            chat_rate=float(env.get("CHAT_RATE", cls.chat_rate)),
+            chat_burst=int(env.get("CHAT_BURST", cls.chat_burst)),
+            chat_max_inflight=int(env.get("CHAT_MAX_INFLIGHT", cls.chat_max_inflight)),
+            chat_queue_size=int(env.get("CHAT_QUEUE_SIZE", cls.chat_queue_size)),
+            chat_queue_timeout=float(env.get("CHAT_QUEUE_TIMEOUT", cls.chat_queue_timeout)),
+            chat_shed_mode=env.get("CHAT_SHED_MODE", cls.chat_shed_mode),
+            trusted_proxy_hops=int(env.get("TRUSTED_PROXY_HOPS", cls.trusted_proxy_hops)),
+            chat_slo=float(env.get("CHAT_SLO", cls.chat_slo)),
+            chat_answer_ttl=float(env.get("CHAT_ANSWER_TTL", cls.chat_answer_ttl)),
+            jobs_workers=int(env.get("JOBS_WORKERS", cls.jobs_workers)),
+            jobs_max_pending=int(env.get("JOBS_MAX_PENDING", cls.jobs_max_pending)),
+            job_ttl=float(env.get("JOB_TTL", cls.job_ttl)),
+            jobs_backend=(env.get("JOBS_BACKEND") or env.get("CACHE_BACKEND", cls.cache_backend)).strip().lower(),
+            jobs_path=env.get("JOBS_PATH", cls.jobs_path),
+            jobs_max_records=int(env.get("JOBS_MAX_RECORDS", cls.jobs_max_records)),
+            ws_port=int(env.get("WS_PORT", cls.ws_port)),
+            ws_max_pending=int(env.get("WS_MAX_PENDING", cls.ws_max_pending)),
+            session_history=int(env.get("SESSION_HISTORY", cls.session_history)),
+            session_ttl=float(env.get("SESSION_TTL", cls.session_ttl)),
+            trace_path=env.get("TRACE_PATH", cls.trace_path) or None,
+            trace_otlp_endpoint=env.get("TRACE_OTLP_ENDPOINT") or None,
+            trace_slow_ms=float(env.get("TRACE_SLOW_MS", cls.trace_slow_ms)),
+            profile_sample_rate=float(env.get("PROFILE_SAMPLE_RATE", cls.profile_sample_rate)),
+            profile_dir=env.get("PROFILE_DIR", cls.profile_dir),
+            profile_keep=int(env.get("PROFILE_KEEP", cls.profile_keep)),
+            direct_answer_tools=_split(env.get("DIRECT_ANSWER_TOOLS", ",".join(cls.direct_answer_tools))),
+        )
+
+
+config = Config.from_env()
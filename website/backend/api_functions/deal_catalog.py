@@ -0,0 +1,280 @@
+"""
+Deal Catalog
+
+DiscountAPI deals for a location are fetched once per TTL, reduced to the
+fields worth showing, and indexed in process by category, merchant and
+discount percentage. "Cheap food deals" is then a local lookup that returns
+the few best matches instead of the whole API response.
+
+Each location keeps a min-heap of expiration times: every query first pops
+the deals whose time has passed, so an expired deal is never returned, even
+from a catalog fetched before it expired. The raw deal list also lives in
+the shared cache backend, so other workers index it without refetching.
+"""
+
+import heapq
+import threading
+import time
+from bisect import insort
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from .cache_backends import get_backend
+from .config import config
+from .locks import KeyedLocks
+from .records import Deal, intern, records, to_json
+from .tool_cache import normalize_args
+from .upstream import fetch
+
+DISCOUNTAPI_URL = "https://api.discountapi.com/v2/deals"
+
+PER_PAGE = 100
+# Locations indexed in process memory
+MAX_LOCATIONS = 64
+
+# Everyday words -> words found in DiscountAPI category names
+CATEGORY_ALIASES = {
+    "food": ("food", "restaurant", "dining", "drink"),
+    "drinks": ("drink", "bar", "nightlife"),
+    "coffee": ("coffee", "cafe", "food"),
+    "fun": ("activit", "entertainment", "things to do"),
+    "entertainment": ("entertainment", "activit", "event"),
+    "fitness": ("fitness", "gym", "sport"),
+    "beauty": ("beauty", "spa", "salon"),
+    "shopping": ("shop", "retail", "product"),
+    "travel": ("travel", "hotel", "getaway"),
+}
+
+_raw = get_backend("deals")
+
+
+def _epoch(value) -> float:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _money(value) -> float:
+    try:
+        return round(float(value), 2)
+    except (TypeError, ValueError):
+        return None
+
+
+def deal_from_discountapi(entry: dict) -> Deal:
+    """
+    Reduce one DiscountAPI deal to the fields the catalog keeps.
+
+    Args:
+        entry (dict): One item of the response's "deals" list
+
+    Returns:
+        Deal: Deal with title, merchant, category, prices, discount and expiry
+    """
+    deal = entry.get("deal", entry)
+    merchant = deal.get("merchant") or {}
+    try:
+        discount = round(float(deal.get("discount_percentage") or 0) * 100)
+    except (TypeError, ValueError):
+        discount = 0
+    return Deal(
+        id=str(deal.get("id", "")),
+        title=deal.get("short_title") or deal.get("title"),
+        merchant=merchant.get("name"),
+        category=intern(deal.get("category_name")),
+        price=_money(deal.get("price")),
+        value=_money(deal.get("value")),
+        discount_pct=discount,
+        expires_at=deal.get("expires_at"),
+        city=intern(merchant.get("locality")),
+        online=bool(deal.get("online")),
+        url=deal.get("untracked_url") or deal.get("url"),
+    )
+
+
+def _fetch(location: str) -> list:
+    """One DiscountAPI request for a location; returns reduced deals."""
+    response = fetch(
+        "discountapi",
+        DISCOUNTAPI_URL,
+        params={"api_key": config.deals_key, "location": location, "per_page": PER_PAGE}
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to get deals: {response.text}")
+    return [deal_from_discountapi(d) for d in response.json().get("deals", [])]
+
+
+class LocationDeals:
+    """
+    Indexed deals of one location.
+
+    Args:
+        deals (list): Deal records from deal_from_discountapi
+        fetched_at (float, optional): When the deals were fetched
+    """
+
+    def __init__(self, deals: list, fetched_at: float = None):
+        self.fetched_at = fetched_at or time.time()
+        self.deals = {}
+        self.by_category = {}     # lowercase category -> set of ids
+        self.by_merchant = {}     # lowercase merchant -> set of ids
+        self.by_discount = []     # (-discount_pct, id), best first
+        self.expiry = []          # heap of (expires_at epoch, id)
+        for deal in deals:
+            if deal.id in self.deals:
+                continue
+            self.deals[deal.id] = deal
+            self.by_category.setdefault((deal.category or "other").lower(), set()).add(deal.id)
+            self.by_merchant.setdefault((deal.merchant or "").lower(), set()).add(deal.id)
+            insort(self.by_discount, (-deal.discount_pct, deal.id))
+            expires = _epoch(deal.expires_at)
+            if expires is not None:
+                heapq.heappush(self.expiry, (expires, deal.id))
+
+    def evict_expired(self, now: float = None) -> int:
+        """Drop every deal whose expiration time has passed; returns how many."""
+        now = time.time() if now is None else now
+        evicted = 0
+        while self.expiry and self.expiry[0][0] <= now:
+            _, deal_id = heapq.heappop(self.expiry)
+            deal = self.deals.pop(deal_id, None)
+            if deal is None:
+                continue
+            self.by_category.get((deal.category or "other").lower(), set()).discard(deal_id)
+            self.by_merchant.get((deal.merchant or "").lower(), set()).discard(deal_id)
+            evicted += 1
+        # by_discount is cleaned lazily: ids no longer in self.deals are skipped
+        return evicted
+
+    def next_expiry(self) -> float:
+        return self.expiry[0][0] if self.expiry else None
+
+    def _matching(self, index: dict, terms: tuple) -> set:
+        ids = set()
+        for name, members in index.items():
+            if any(term in name for term in terms):
+                ids |= members
+        return ids
+
+    def query(self, category: str = None, merchant: str = None, keyword: str = None,
+              min_discount: int = None, max_price: float = None, limit: int = 10) -> list:
+        """
+        Best live deals matching the filters, highest discount first.
+
+        Args:
+            category (str, optional): Category word, e.g. 'food' (aliases are expanded)
+            merchant (str, optional): Part of the merchant name
+            keyword (str, optional): Every word must appear in the title, merchant or category
+            min_discount (int, optional): Minimum discount percentage
+            max_price (float, optional): Highest deal price
+            limit (int, optional): Deals returned (default: 10)
+
+        Returns:
+            list: Deals as dicts
+        """
+        candidates = None
+        if category:
+            term = category.strip().lower()
+            candidates = self._matching(self.by_category, CATEGORY_ALIASES.get(term, (term,)))
+        if merchant:
+            found = self._matching(self.by_merchant, (merchant.strip().lower(),))
+            candidates = found if candidates is None else candidates & found
+        words = (keyword or "").lower().split()
+
+        results = []
+        for negative_discount, deal_id in self.by_discount:
+            if min_discount is not None and -negative_discount < min_discount:
+                break
+            deal = self.deals.get(deal_id)
+            if deal is None or (candidates is not None and deal_id not in candidates):
+                continue
+            if max_price is not None and (deal.price is None or deal.price > max_price):
+                continue
+            if words:
+                text = " ".join(str(v or "") for v in (deal.title, deal.merchant, deal.category)).lower()
+                if not all(word in text for word in words):
+                    continue
+            results.append(to_json(deal))
+            if len(results) >= limit:
+                break
+        return results
+
+    def categories(self) -> dict:
+        """Live deal count per category."""
+        return {name: len(ids) for name, ids in sorted(self.by_category.items()) if ids}
+
+
+class DealCatalog:
+    """
+    Location -> indexed deals, fetched once per TTL.
+
+    Args:
+        ttl (float, optional): Seconds a location's deals stay valid
+        max_locations (int, optional): Locations indexed in process memory
+    """
+
+    def __init__(self, ttl: float = 1800.0, max_locations: int = MAX_LOCATIONS):
+        self.ttl = ttl
+        self.max_locations = max_locations
+        self.lookups = 0
+        self.upstream_fetches = 0
+        self.expired_evicted = 0
+        self._locations = OrderedDict()
+        self._lock = threading.Lock()
+        self._location_locks = KeyedLocks()
+
+    def get(self, location: str) -> LocationDeals:
+        """
+        Indexed live deals for a location, fetching them when missing or stale.
+
+        Args:
+            location (str): Location name
+
+        Returns:
+            LocationDeals: Deals with expired ones already evicted
+        """
+        key = normalize_args({"location": location})["location"]
+        with self._lock:
+            self.lookups += 1
+
+        with self._location_locks.hold(key):
+            with self._lock:
+                entry = self._locations.get(key)
+            if entry is None or time.time() - entry.fetched_at >= self.ttl:
+                hit, cached = _raw.get(key)
+                if hit:
+                    entry = LocationDeals(records(Deal, cached["deals"]), cached["fetched_at"])
+                else:
+                    deals = _fetch(location)
+                    with self._lock:
+                        self.upstream_fetches += 1
+                    entry = LocationDeals(deals)
+                    _raw.set(key, {"deals": deals, "fetched_at": entry.fetched_at}, self.ttl)
+            evicted = entry.evict_expired()
+
+        with self._lock:
+            self.expired_evicted += evicted
+            self._locations[key] = entry
+            self._locations.move_to_end(key)
+            while len(self._locations) > self.max_locations:
+                self._locations.popitem(last=False)
+        return entry
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "locations": len(self._locations),
+                "deals": sum(len(entry.deals) for entry in self._locations.values()),
+                "lookups": self.lookups,
+                "upstream_fetches": self.upstream_fetches,
+                "expired_evicted": self.expired_evicted,
+            }
+
+
+deal_catalog = DealCatalog(ttl=config.deals_ttl)
@@ -1,29 +1,39 @@
-import requests
-import os
-from dotenv import load_dotenv
+from .config import config
+from .deal_catalog import deal_catalog
 
-load_dotenv()
-
-deals_key = os.environ.get("deals_key")
-
-def get_deals(location: str) -> str:
+def get_deals(location: str, category: str = None, merchant: str = None, keyword: str = None,
+              min_discount: int = None, max_price: float = None, limit: int = 10) -> dict:
     """
     Get deals and discounts for a specific location.
 
+    Deals for the location are fetched once and filtered locally; only the
+    best matches, highest discount first, are returned.
+
     Args:
         location (str): Location to search for deals
+        category (str, optional): Category such as 'food', 'fitness' or 'entertainment'
+        merchant (str, optional): Part of a merchant name
+        keyword (str, optional): Words that must appear in the deal
+        min_discount (int, optional): Minimum discount percentage (e.g., 40)
+        max_price (float, optional): Highest deal price in dollars
+        limit (int, optional): Number of deals to return (default: 10)
 
     Returns:
-        str: Deals data as a string, or error message if failed
+        dict: {"location", "deals"[, "categories"]}, or {"error": ...} if failed
     """
-    if not deals_key:
-        return "Error: Missing deals_key in environment variables"
-
-    url = f'https://api.discountapi.com/v2/deals?api_key={deals_key}&location={location}'
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        return f"Failed to get deals: {response.text}"
-
-    data = response.json()
-    return str(data)
+    if not config.deals_key:
+        return {"error": "Missing deals_key in environment variables"}
+
+    try:
+        catalog = deal_catalog.get(location)
+    except Exception as e:
+        message = str(e)
+        return {"error": message if message.startswith("Failed") else f"Failed to get deals: {message}"}
+
+    deals = catalog.query(category=category, merchant=merchant, keyword=keyword,
+                          min_discount=min_discount, max_price=max_price, limit=int(limit))
+    result = {"location": location, "deals": deals}
+    if not deals:
+        # Lets the model suggest a category that does have deals
+        result["categories"] = catalog.categories()
+    return result
@@ -0,0 +1,182 @@
+"""
+Direct Answers
+
+Templates that turn a tool's arguments and result straight into the reply,
+so tools whose output needs no interpretation (a calendar link, a score)
+skip the second OpenRouter completion. A template is only used when the
+user's question is the one it answers (a score line for "did we win?", not
+for "what channel is the game on?"), and a renderer returns None whenever
+the result does not fit its template; either way the model writes the
+answer instead.
+
+Which tools answer directly is set with DIRECT_ANSWER_TOOLS.
+"""
+
+import re
+import threading
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .config import config
+
+
+def _format_when(value: str) -> tuple:
+    """Split an ISO datetime into ("Monday, November 10, 2025", "12:30 PM")."""
+    dt = datetime.fromisoformat(value.replace("Z", ""))
+    return dt.strftime("%A, %B %d, %Y").replace(" 0", " "), dt.strftime("%I:%M %p").lstrip("0")
+
+
+def _campus_time(value: str) -> tuple:
+    """
+    A UTC ISO datetime in the campus time zone, as (day, time with zone abbreviation).
+
+    Falls back to UTC when CAMPUS_TIMEZONE is not a known zone.
+    """
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    try:
+        dt = dt.astimezone(ZoneInfo(config.campus_timezone))
+    except (ZoneInfoNotFoundError, ValueError):
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime("%A, %B %d, %Y").replace(" 0", " "), dt.strftime("%I:%M %p %Z").lstrip("0")
+
+
+def render_make_event(args: dict, result) -> str:
+    """
+    Confirmation for a created calendar event.
+
+    Args:
+        args (dict): make_event arguments
+        result (str): Google Calendar URL returned by make_event
+
+    Returns:
+        str: Reply text, or None if the event could not be created
+    """
+    if not isinstance(result, str) or not result.startswith("https://"):
+        return None
+    try:
+        start_day, start_time = _format_when(args["start_datetime"])
+        end_day, end_time = _format_when(args["end_datetime"])
+    except (KeyError, ValueError):
+        return None
+
+    when = f"{start_day} from {start_time} to {end_time}"
+    if end_day != start_day:
+        when = f"{start_day} at {start_time} until {end_day} at {end_time}"
+    reply = f"I've created the event \"{args.get('title', 'Event')}\" on {when}"
+    if args.get("location"):
+        reply += f" at {args['location']}"
+    return reply + ". Use the button below to add it to your Google Calendar."
+
+
+def render_team_data(args: dict, result) -> str:
+    """
+    Score line for a team's current or most recent game.
+
+    Only the single-game ("live_game") result is templated; full schedules
+    go back to the model, which picks out what the user asked about.
+
+    Args:
+        args (dict): get_college_team_data arguments
+        result (dict): get_college_team_data result
+
+    Returns:
+        str: Reply text, or None if the result is not a single game
+    """
+    if not isinstance(result, dict) or result.get("type") != "live_game":
+        return None
+
+    team, opponent = result.get("team"), result.get("opponent")
+    status = result.get("status") or ""
+    venue = f" at {result['venue']}" if result.get("venue") else ""
+
+    if status.lower() == "scheduled":
+        when = ""
+        if result.get("game_date"):
+            try:
+                day, time_of_day = _campus_time(result["game_date"])
+                when = f" on {day} at {time_of_day}"
+            except ValueError:
+                pass
+        return f"{team} play {opponent}{when}{venue}."
+
+    score = f"{team} {result.get('team_score', '0')}, {opponent} {result.get('opponent_score', '0')}"
+    if status.lower() == "final":
+        return f"Final: {score}{venue}."
+    return f"{status}: {score}{venue}."
+
+
+# Questions a score line answers, and questions a "who and when" line answers
+SCORE_QUESTION = re.compile(
+    r"\b(score|scores|scoring|result|results|final|win|won|winning|lose|lost|losing|beat|beating|"
+    r"ahead|behind|leading|how (did|is|are|was)|who (won|is winning|did))\b",
+    re.IGNORECASE
+)
+SCHEDULE_QUESTION = re.compile(
+    r"\b(when|what time|kickoff|kick off|next game|play (next|today|tonight|this week)|"
+    r"who (do|does|are|is) .*play(ing)?)\b",
+    re.IGNORECASE
+)
+# Details neither line carries, even when the question also asks the score
+OTHER_DETAILS = re.compile(
+    r"\b(channel|tv|televised|stream|streaming|watch|radio|ticket|tickets|sold out|odds|favou?red|"
+    r"spread|betting|weather|parking|tailgate|injur\w*|stats|statistics|roster|quarterback|qb|"
+    r"ranking|ranked|record|standings)\b",
+    re.IGNORECASE
+)
+
+
+def _asks_about_game(message: str, result) -> bool:
+    """Whether render_team_data's line is what the user asked for."""
+    if OTHER_DETAILS.search(message):
+        return False
+    scheduled = isinstance(result, dict) and str(result.get("status") or "").lower() == "scheduled"
+    return bool((SCHEDULE_QUESTION if scheduled else SCORE_QUESTION).search(message))
+
+
+# Tool name -> (renderer(args, result), check(message, result) or None for any question)
+DIRECT_ANSWERS = {
+    "make_event": (render_make_event, None),
+    "get_college_team_data": (render_team_data, _asks_about_game),
+}
+
+_saved = {}
+_lock = threading.Lock()
+
+
+def render_direct_answer(function_name: str, function_args: dict, function_response,
+                         user_message: str = ""):
+    """
+    Render the reply for a tool call without a second completion.
+
+    Args:
+        function_name (str): Tool that was called
+        function_args (dict): Arguments the model chose
+        function_response: Raw tool result
+        user_message (str, optional): The user's question
+
+    Returns:
+        str: Reply text, or None if the model should write the answer
+    """
+    if function_name not in config.direct_answer_tools or function_name not in DIRECT_ANSWERS:
+        return None
+    renderer, matches_question = DIRECT_ANSWERS[function_name]
+    if matches_question is not None and not matches_question(user_message or "", function_response):
+        return None
+    reply = renderer(function_args, function_response)
+    if reply is not None:
+        with _lock:
+            _saved[function_name] = _saved.get(function_name, 0) + 1
+    return reply
+
+
+def stats() -> dict:
+    """LLM completions saved by direct answers, total and per tool."""
+    with _lock:
+        by_tool = dict(_saved)
+    return {
+        "enabled_tools": sorted(config.direct_answer_tools),
+        "saved_llm_calls": sum(by_tool.values()),
+        "by_tool": by_tool,
+    }
@@ -0,0 +1,291 @@
+"""
+Event Catalog
+
+One Ticketmaster request per area and date window. The events of that
+request are kept with their classification (segment/genre/subgenre), price
+range, venue and venue coordinates, and every narrower question about the
+same area ("music this weekend", "sports this weekend", a keyword, a
+smaller radius) is filtered locally instead of asking Ticketmaster again.
+
+Areas are snapped to a coarse grid and fetched with a generous radius, so
+nearby coordinates share one catalog entry. An area is read up to
+EVENTS_MAX_PAGES pages (one by default); when it holds more events than
+that (a dense metro) the entry is marked incomplete. A question with a
+keyword, segment or genre is filtered from the area's entry only when a
+complete one is already cached; otherwise it goes straight to one narrowed
+Ticketmaster search, so no question costs more than one call by default.
+Every page is a separate request and goes through the Ticketmaster quota
+bucket. Entries live in the shared cache backend, so other workers reuse
+them too.
+"""
+
+import threading
+
+from .cache_backends import get_backend
+from .config import config
+from .geocoding import distance_miles, snap
+from .locks import KeyedLocks
+from .records import Event, intern, records, to_json
+from .tool_cache import normalize_args
+from .upstream import fetch
+
+TICKETMASTER_URL = "https://app.ticketmaster.com/discovery/v2/events.json"
+
+# Largest page Ticketmaster returns; it serves at most 1000 results per search
+PAGE_SIZE = 200
+MAX_RESULTS = 1000
+# Areas share a catalog entry per 0.1° cell; the fetch radius covers the snap offset
+AREA_STEP = 0.1
+AREA_MARGIN_MILES = 5
+KM_PER_MILE = 1.609344
+
+_catalog = get_backend("events")
+
+
+def event_from_ticketmaster(e: dict) -> Event:
+    """
+    Reduce one Ticketmaster event to the fields the catalog keeps.
+
+    Args:
+        e (dict): One entry of the Ticketmaster "_embedded.events" list
+
+    Returns:
+        Event: Event with name, url, dates, venue, price range and classification
+    """
+    start = e.get("dates", {}).get("start", {})
+    event_data = {
+        "name": e.get("name"),
+        "url": e.get("url"),
+        "start_date": start.get("localDate"),
+        "start_time": start.get("localTime"),
+        "price_range": None
+    }
+
+    # Get venue information
+    venues = e.get("_embedded", {}).get("venues") or []
+    if venues:
+        venue = venues[0]
+        event_data["venue"] = venue.get("name")
+        event_data["city"] = intern(venue.get("city", {}).get("name"))
+        event_data["state"] = intern(venue.get("state", {}).get("stateCode"))
+        location = venue.get("location") or {}
+        try:
+            event_data["latitude"] = float(location["latitude"])
+            event_data["longitude"] = float(location["longitude"])
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    # Get price information
+    if e.get("priceRanges"):
+        price_range = e["priceRanges"][0]
+        min_price = price_range.get("min")
+        max_price = price_range.get("max")
+        currency = price_range.get("currency", "USD")
+        if min_price and max_price:
+            event_data["price_range"] = f"{currency} {min_price} - {max_price}"
+
+    # Get classification/genre
+    if e.get("classifications"):
+        classification = e["classifications"][0]
+        event_data["segment"] = intern(classification.get("segment", {}).get("name"))
+        event_data["genre"] = intern(classification.get("genre", {}).get("name"))
+        event_data["subgenre"] = intern(classification.get("subGenre", {}).get("name"))
+
+    return Event(**event_data)
+
+
+def _fetch(params: dict) -> tuple:
+    """
+    Ticketmaster search for an area, EVENTS_MAX_PAGES pages at most.
+
+    Each page is its own upstream.fetch call, so each one takes a token
+    from the Ticketmaster quota bucket.
+
+    Args:
+        params (dict): Search parameters
+
+    Returns:
+        tuple: (reduced events, requests made, whether every result was read)
+    """
+    max_pages = max(1, min(config.events_max_pages, MAX_RESULTS // PAGE_SIZE))
+    events = []
+    for page in range(max_pages):
+        page_params = dict(params, apikey=config.ticketmaster_key, size=PAGE_SIZE, sort="date,asc", page=page)
+        response = fetch("ticketmaster", TICKETMASTER_URL, params=page_params)
+        if response.status_code != 200:
+            raise RuntimeError(f"Error: {response.status_code} - {response.text}")
+        data = response.json()
+        events.extend(event_from_ticketmaster(e) for e in data.get("_embedded", {}).get("events", []))
+        if page + 1 >= int(data.get("page", {}).get("totalPages") or 1):
+            return events, page + 1, True
+    return events, max_pages, False
+
+
+def _join(value) -> str:
+    return ",".join(value) if isinstance(value, (list, tuple)) else value
+
+
+def _narrowing(keyword: str = None, segment=None, genre=None) -> dict:
+    """Ticketmaster parameters that narrow a search the way filter_events narrows a list."""
+    names = [v for v in (_join(segment), _join(genre)) if v]
+    return {"keyword": keyword or None, "classificationName": ",".join(names) or None}
+
+
+class EventCatalog:
+    """
+    Area/date-window -> events, fetched once per TTL.
+
+    Args:
+        ttl (float, optional): Seconds an area's events stay valid
+    """
+
+    def __init__(self, ttl: float = 900.0):
+        self.ttl = ttl
+        self.upstream_fetches = 0
+        self.narrowed_searches = 0
+        self.lookups = 0
+        self._lock = threading.Lock()
+        self._area_locks = KeyedLocks()
+
+    @staticmethod
+    def _key(params: dict) -> str:
+        return "|".join(f"{k}={v}" for k, v in sorted(normalize_args(params).items()))
+
+    def _cached(self, params: dict):
+        """(events, complete) for one search if it is cached, else None."""
+        hit, entry = _catalog.get(self._key({k: v for k, v in params.items() if v is not None}))
+        if hit and isinstance(entry, dict):
+            return records(Event, entry["events"]), entry["complete"]
+        return None
+
+    def _entry(self, params: dict) -> tuple:
+        """(events, complete) for one search, from the cache or Ticketmaster."""
+        params = {k: v for k, v in params.items() if v is not None}
+        key = self._key(params)
+
+        # One fetch per area even when several requests miss together
+        with self._area_locks.hold(key):
+            hit, entry = _catalog.get(key)
+            if hit and isinstance(entry, dict):
+                return records(Event, entry["events"]), entry["complete"]
+            events, requests_made, complete = _fetch(params)
+            with self._lock:
+                self.upstream_fetches += requests_made
+            _catalog.set(key, {"events": events, "complete": complete}, self.ttl)
+            return events, complete
+
+    def _events(self, area: dict, narrowing: dict = None) -> list:
+        with self._lock:
+            self.lookups += 1
+        narrowing = {k: v for k, v in (narrowing or {}).items() if v}
+        if not narrowing:
+            return self._entry(area)[0]
+        cached = self._cached(area)
+        if cached is not None and cached[1]:
+            # Every event of the area is at hand: filter it locally
+            return cached[0]
+        # Nothing complete to filter: one narrowed search instead of reading the whole area
+        with self._lock:
+            self.narrowed_searches += 1
+        return self._entry(dict(area, **narrowing))[0]
+
+    def near(self, lat: float, lon: float, radius_miles: float, start_date: str = None,
+             end_date: str = None, keyword: str = None, segment=None, genre=None) -> list:
+        """
+        Events within ``radius_miles`` of a point, from the area's catalog entry.
+
+        The keyword, segment and genre select a narrowed search unless a
+        complete catalog entry for the area is cached; filter the result
+        with filter_events either way. Each date bound is sent on its own.
+
+        Args:
+            lat (float): Latitude coordinate
+            lon (float): Longitude coordinate
+            radius_miles (float): Search radius in miles
+            start_date (str, optional): Start of the date window (ISO format)
+            end_date (str, optional): End of the date window (ISO format)
+            keyword (str, optional): Keyword the caller will filter by
+            segment (str or list, optional): Segment names the caller will filter by
+            genre (str or list, optional): Genre names the caller will filter by
+
+        Returns:
+            list: Events in date order, each with distance_miles when the venue is located
+        """
+        cell = snap(lat, lon, AREA_STEP)
+        area_radius = int(max(radius_miles, config.events_area_radius) + AREA_MARGIN_MILES)
+        events = self._events({
+            "latlong": f"{cell[0]},{cell[1]}",
+            "radius": area_radius,
+            "unit": "miles",
+            "startDateTime": start_date,
+            "endDateTime": end_date,
+        }, _narrowing(keyword, segment, genre))
+
+        nearby = []
+        for event in events:
+            if event.latitude is not None:
+                distance = distance_miles(lat, lon, event.latitude, event.longitude)
+                if distance > radius_miles:
+                    continue
+                event = event._replace(distance_miles=round(distance, 1))
+            nearby.append(event)
+        return nearby
+
+    def in_city(self, city: str, state: str = None, country: str = "US", keyword: str = None) -> list:
+        """Events in a city: its catalog entry, or a keyword search unless the complete entry is cached."""
+        return self._events({"city": city, "stateCode": state, "countryCode": country}, _narrowing(keyword))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "upstream_fetches": self.upstream_fetches,
+                "narrowed_searches": self.narrowed_searches,
+            }
+
+
+event_catalog = EventCatalog(ttl=config.events_ttl)
+
+
+def _split(value) -> list:
+    """Lower-cased values of a list or comma-separated string."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [v.strip().lower() for v in value if v and v.strip()]
+
+
+def filter_events(events: list, keyword: str = None, segment=None, genre=None, size: int = 20) -> list:
+    """
+    Filter catalog events locally.
+
+    Args:
+        events (list): Event records from the catalog
+        keyword (str, optional): Every word must appear in the name, venue,
+            city or classification
+        segment (str or list, optional): Segment names to keep (e.g. 'Music', 'Sports')
+        genre (str or list, optional): Genre or subgenre names to keep
+        size (int, optional): Number of results to return (default: 20)
+
+    Returns:
+        list: Matching events as dicts, without venue coordinates
+    """
+    words = (keyword or "").lower().split()
+    segments, genres = set(_split(segment)), set(_split(genre))
+
+    results = []
+    for event in events:
+        if segments and (event.segment or "").lower() not in segments:
+            continue
+        if genres and not genres & {(event.genre or "").lower(), (event.subgenre or "").lower()}:
+            continue
+        if words:
+            text = " ".join(str(getattr(event, k) or "") for k in
+                            ("name", "venue", "city", "segment", "genre", "subgenre")).lower()
+            if not all(word in text for word in words):
+                continue
+        results.append(to_json(event, drop=("latitude", "longitude")))
+        if len(results) >= size:
+            break
+    return results
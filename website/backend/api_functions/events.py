@@ -1,17 +1,16 @@
-import requests
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-ticketmaster_key = os.environ.get("TICKETMASTER_API_KEY")
+from .config import config
+from .event_catalog import KM_PER_MILE, event_catalog, filter_events
 
 def get_events(lat: float, lon: float, radius: int = 10, unit: str = "miles",
                keyword: str = None, start_date: str = None, end_date: str = None,
-               size: int = 20) -> str:
+               size: int = 20, segment: str = None, genre: str = None) -> str:
     """
     Get nearby events from Ticketmaster based on latitude and longitude coordinates.
 
+    Events for the surrounding area and date window are fetched once and
+    filtered locally, so asking for music and then sports in the same area
+    costs one Ticketmaster request.
+
     Args:
         lat (float): Latitude coordinate
         lon (float): Longitude coordinate
@@ -21,56 +20,26 @@ def get_events(lat: float, lon: float, radius: int = 10, unit: str = "miles",
         start_date (str, optional): Optional start date in ISO format
         end_date (str, optional): Optional end date in ISO format
         size (int, optional): Number of results to return (default: 20)
+        segment (str, optional): Optional segment(s), comma-separated (e.g., 'Music', 'Music,Sports')
+        genre (str, optional): Optional genre(s), comma-separated (e.g., 'Rock', 'Football')
 
     Returns:
         str: Events data as a string, or error message if failed
     """
+    ticketmaster_key = config.ticketmaster_key
     if not ticketmaster_key:
         return "Error: Missing TICKETMASTER_API_KEY in environment variables"
 
-    url = "https://app.ticketmaster.com/discovery/v2/events.json"
-    params = {
-        "apikey": ticketmaster_key,
-        "latlong": f"{lat},{lon}",
-        "radius": radius,
-        "unit": unit,
-        "size": size
-    }
-
-    if keyword:
-        params["keyword"] = keyword
-    if start_date and end_date:
-        params["startDateTime"] = start_date
-        params["endDateTime"] = end_date
+    radius_miles = float(radius) / KM_PER_MILE if unit == "km" else float(radius)
 
     try:
-        response = requests.get(url, params=params)
-
-        if response.status_code != 200:
-            return f"Error: {response.status_code} - {response.text}"
-
-        data = response.json()
-        events = data.get("_embedded", {}).get("events", [])
-
-        results = []
-        for e in events:
-            event_data = {
-                "name": e.get("name"),
-                "url": e.get("url"),
-                "start_date": e.get("dates", {}).get("start", {}).get("localDate")
-            }
-
-            if "_embedded" in e and "venues" in e["_embedded"] and len(e["_embedded"]["venues"]) > 0:
-                venue = e["_embedded"]["venues"][0]
-                event_data["venue"] = venue.get("name")
-                event_data["city"] = venue.get("city", {}).get("name")
-
-            results.append(event_data)
-
-        return str(results)
+        events = event_catalog.near(lat, lon, radius_miles, start_date, end_date,
+                                    keyword=keyword, segment=segment, genre=genre)
+        return str(filter_events(events, keyword=keyword, segment=segment, genre=genre, size=size))
 
     except Exception as e:
-        return f"Error fetching events: {str(e)}"
+        message = str(e)
+        return message if message.startswith("Error") else f"Error fetching events: {message}"
 
 def get_events_by_city(city: str, state: str = None, country: str = "US",
                        keyword: str = None, size: int = 20) -> str:
@@ -87,69 +56,17 @@ def get_events_by_city(city: str, state: str = None, country: str = "US",
     Returns:
         str: Events data as a string, or error message if failed
     """
+    ticketmaster_key = config.ticketmaster_key
     if not ticketmaster_key:
         return "Error: Missing TICKETMASTER_API_KEY in environment variables"
 
-    url = "https://app.ticketmaster.com/discovery/v2/events.json"
-    params = {
-        "apikey": ticketmaster_key,
-        "city": city,
-        "countryCode": country,
-        "size": size
-    }
-
-    if state:
-        params["stateCode"] = state
-    if keyword:
-        params["keyword"] = keyword
-
     try:
-        response = requests.get(url, params=params)
-
-        if response.status_code != 200:
-            return f"Error: {response.status_code} - {response.text}"
-
-        data = response.json()
-        events = data.get("_embedded", {}).get("events", [])
-
-        results = []
-        for e in events:
-            event_data = {
-                "name": e.get("name"),
-                "url": e.get("url"),
-                "start_date": e.get("dates", {}).get("start", {}).get("localDate"),
-                "start_time": e.get("dates", {}).get("start", {}).get("localTime"),
-                "price_range": None
-            }
-
-            # Get venue information
-            if "_embedded" in e and "venues" in e["_embedded"] and len(e["_embedded"]["venues"]) > 0:
-                venue = e["_embedded"]["venues"][0]
-                event_data["venue"] = venue.get("name")
-                event_data["city"] = venue.get("city", {}).get("name")
-                event_data["state"] = venue.get("state", {}).get("stateCode")
-
-            # Get price information
-            if "priceRanges" in e and len(e["priceRanges"]) > 0:
-                price_range = e["priceRanges"][0]
-                min_price = price_range.get("min")
-                max_price = price_range.get("max")
-                currency = price_range.get("currency", "USD")
-                if min_price and max_price:
-                    event_data["price_range"] = f"{currency} {min_price} - {max_price}"
-
-            # Get classification/genre
-            if "classifications" in e and len(e["classifications"]) > 0:
-                classification = e["classifications"][0]
-                event_data["genre"] = classification.get("genre", {}).get("name")
-                event_data["segment"] = classification.get("segment", {}).get("name")
-
-            results.append(event_data)
-
-        return str(results)
+        events = event_catalog.in_city(city, state, country, keyword=keyword)
+        return str(filter_events(events, keyword=keyword, size=size))
 
     except Exception as e:
-        return f"Error fetching events by city: {str(e)}"
+        message = str(e)
+        return message if message.startswith("Error") else f"Error fetching events by city: {message}"
 
 def get_music_events(lat: float, lon: float, radius: int = 25, size: int = 20) -> str:
     """
@@ -164,7 +81,7 @@ def get_music_events(lat: float, lon: float, radius: int = 25, size: int = 20) -
     Returns:
         str: Music events data as a string, or error message if failed
     """
-    return get_events(lat=lat, lon=lon, radius=radius, keyword="music", size=size)
+    return get_events(lat=lat, lon=lon, radius=radius, segment="Music", size=size)
 
 def get_sports_events(lat: float, lon: float, radius: int = 50, size: int = 20) -> str:
     """
@@ -179,4 +96,4 @@ def get_sports_events(lat: float, lon: float, radius: int = 50, size: int = 20)
     Returns:
         str: Sports events data as a string, or error message if failed
     """
-    return get_events(lat=lat, lon=lon, radius=radius, keyword="sports", size=size)
+    return get_events(lat=lat, lon=lon, radius=radius, segment="Sports", size=size)
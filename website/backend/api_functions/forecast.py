@@ -0,0 +1,330 @@
+"""
+Forecast Store
+
+Hourly and daily forecast series fetched once per weather grid cell and
+kept as typed arrays (one array('f') per variable) instead of lists of
+dicts. Questions about a specific time ("will it rain during my 3 pm
+class", "what to wear to Saturday's game") are answered from the arrays,
+and only the handful of numbers that matter are sent to the model.
+
+Forecasts are held in-process for fast queries and also written to the
+shared cache backend in packed form, so other workers reuse them.
+"""
+
+import base64
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .cache_backends import get_backend
+from .geocoding import geocode, snap
+from .upstream import fetch
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+
+HOURLY_VARIABLES = (
+    "temperature_2m",
+    "apparent_temperature",
+    "precipitation_probability",
+    "precipitation",
+    "weathercode",
+    "windspeed_10m",
+)
+DAILY_VARIABLES = (
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "precipitation_sum",
+    "precipitation_probability_max",
+    "weathercode",
+)
+
+FORECAST_TTL = 3600
+MAX_CELLS = 256
+
+# WMO weather interpretation codes used by Open-Meteo
+WEATHER_CODES = {
+    0: "clear sky", 1: "mainly clear", 2: "partly cloudy", 3: "overcast",
+    45: "fog", 48: "rime fog", 51: "light drizzle", 53: "drizzle", 55: "dense drizzle",
+    61: "light rain", 63: "rain", 65: "heavy rain", 66: "freezing rain", 67: "heavy freezing rain",
+    71: "light snow", 73: "snow", 75: "heavy snow", 77: "snow grains",
+    80: "light showers", 81: "showers", 82: "violent showers", 85: "snow showers", 86: "heavy snow showers",
+    95: "thunderstorm", 96: "thunderstorm with hail", 99: "severe thunderstorm with hail",
+}
+
+
+def _packed(values) -> array:
+    """Typed array for a series; missing values become NaN."""
+    return array("f", (float("nan") if v is None else v for v in values))
+
+
+def _is_nan(value: float) -> bool:
+    return value != value
+
+
+class Forecast:
+    """
+    Forecast series for one grid cell.
+
+    Hourly series start at ``start`` (epoch seconds, UTC) and advance by one
+    hour; daily series start at local midnight of ``daily_start``. Local
+    times are converted with the cell's IANA time zone, so a DST change
+    inside the forecast range shifts the hours after it correctly;
+    ``utc_offset`` (the offset at fetch time) is only the fallback when the
+    zone is unknown.
+    """
+
+    __slots__ = ("cell", "start", "utc_offset", "tz", "hourly", "daily_start", "daily", "fetched_at")
+
+    def __init__(self, cell, start, utc_offset, hourly, daily_start, daily, fetched_at=None, tz=None):
+        self.cell = cell
+        self.start = start
+        self.utc_offset = utc_offset
+        self.tz = tz
+        self.hourly = hourly
+        self.daily_start = daily_start
+        self.daily = daily
+        self.fetched_at = fetched_at or time.time()
+
+    @classmethod
+    def from_open_meteo(cls, cell, data: dict) -> "Forecast":
+        hourly = data.get("hourly", {})
+        daily = data.get("daily", {})
+        hourly_times = hourly.get("time") or [0]
+        daily_times = daily.get("time") or [0]
+        return cls(
+            cell=cell,
+            start=int(hourly_times[0]),
+            utc_offset=int(data.get("utc_offset_seconds", 0)),
+            hourly={var: _packed(hourly.get(var, [])) for var in HOURLY_VARIABLES},
+            daily_start=int(daily_times[0]),
+            daily={var: _packed(daily.get(var, [])) for var in DAILY_VARIABLES},
+            tz=data.get("timezone"),
+        )
+
+    def to_payload(self) -> dict:
+        """JSON-safe packed form for the shared cache backend."""
+        def pack(series):
+            return {var: base64.b64encode(values.tobytes()).decode() for var, values in series.items()}
+        return {
+            "cell": list(self.cell), "start": self.start, "utc_offset": self.utc_offset, "timezone": self.tz,
+            "daily_start": self.daily_start, "fetched_at": self.fetched_at,
+            "hourly": pack(self.hourly), "daily": pack(self.daily),
+        }
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "Forecast":
+        def unpack(series):
+            out = {}
+            for var, data in series.items():
+                values = array("f")
+                values.frombytes(base64.b64decode(data))
+                out[var] = values
+            return out
+        return cls(
+            cell=tuple(payload["cell"]), start=payload["start"], utc_offset=payload["utc_offset"],
+            hourly=unpack(payload["hourly"]), daily_start=payload["daily_start"],
+            daily=unpack(payload["daily"]), fetched_at=payload["fetched_at"],
+            tz=payload.get("timezone"),
+        )
+
+    def zone(self):
+        """The cell's time zone, or its fixed fetch-time offset when the zone is unknown."""
+        if self.tz:
+            try:
+                return ZoneInfo(self.tz)
+            except (ZoneInfoNotFoundError, ValueError):
+                pass
+        return timezone(timedelta(seconds=self.utc_offset))
+
+    def to_epoch(self, local_iso: str) -> int:
+        """Epoch seconds for a local (cell time zone) ISO datetime; explicit offsets are honored."""
+        dt = datetime.fromisoformat(local_iso.replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=self.zone())
+        return int(dt.timestamp())
+
+    def _hour_index(self, epoch: int) -> int:
+        index = (epoch - self.start) // 3600
+        length = len(self.hourly["temperature_2m"])
+        if index < 0 or index >= length:
+            raise ValueError("Time is outside the forecast range")
+        return int(index)
+
+    def value_at(self, variable: str, local_iso: str) -> float:
+        """
+        Hourly value of one variable at a local time.
+
+        Args:
+            variable (str): One of HOURLY_VARIABLES
+            local_iso (str): Local datetime, e.g. '2025-11-15T15:00'
+
+        Returns:
+            float: Value, or None if missing
+        """
+        value = self.hourly[variable][self._hour_index(self.to_epoch(local_iso))]
+        return None if _is_nan(value) else round(value, 1)
+
+    def at(self, local_iso: str) -> dict:
+        """All hourly variables at a local time."""
+        index = self._hour_index(self.to_epoch(local_iso))
+        values = {var: self.hourly[var][index] for var in HOURLY_VARIABLES}
+        return _describe({k: None if _is_nan(v) else round(v, 1) for k, v in values.items()})
+
+    def window(self, start_iso: str, end_iso: str) -> dict:
+        """
+        Summary of the hours in [start, end): temperature range, precipitation
+        total, highest precipitation chance, peak wind and worst conditions.
+
+        Args:
+            start_iso (str): Local start datetime
+            end_iso (str): Local end datetime
+
+        Returns:
+            dict: Compact summary
+        """
+        first = self._hour_index(self.to_epoch(start_iso))
+        last_epoch = self.to_epoch(end_iso) - 1
+        last = min((last_epoch - self.start) // 3600, len(self.hourly["temperature_2m"]) - 1)
+        if last < first:
+            last = first
+        span = slice(first, int(last) + 1)
+
+        def clean(var):
+            return [v for v in self.hourly[var][span] if not _is_nan(v)]
+
+        temps, feels = clean("temperature_2m"), clean("apparent_temperature")
+        rain, chance = clean("precipitation"), clean("precipitation_probability")
+        wind, codes = clean("windspeed_10m"), clean("weathercode")
+        return _describe({
+            "hours": int(last) - first + 1,
+            "temperature_min": round(min(temps), 1) if temps else None,
+            "temperature_max": round(max(temps), 1) if temps else None,
+            "apparent_temperature_min": round(min(feels), 1) if feels else None,
+            "precipitation_total": round(sum(rain), 1) if rain else None,
+            "precipitation_probability_max": round(max(chance)) if chance else None,
+            "windspeed_max": round(max(wind), 1) if wind else None,
+            "weathercode": max(codes) if codes else None,
+        })
+
+    def day(self, date_iso: str) -> dict:
+        """Daily summary for a local date ('YYYY-MM-DD')."""
+        # Count calendar days: local days are 23 or 25 hours long across a DST change
+        first = datetime.fromtimestamp(self.daily_start, self.zone()).date()
+        index = (date.fromisoformat(date_iso) - first).days
+        if index < 0 or index >= len(self.daily["temperature_2m_max"]):
+            raise ValueError("Date is outside the forecast range")
+        values = {var: self.daily[var][int(index)] for var in DAILY_VARIABLES}
+        return _describe({k: None if _is_nan(v) else round(v, 1) for k, v in values.items()})
+
+
+def _describe(summary: dict) -> dict:
+    code = summary.get("weathercode")
+    if code is not None:
+        summary["weathercode"] = int(code)
+        summary["conditions"] = WEATHER_CODES.get(int(code), "unknown")
+    return summary
+
+
+class ForecastStore:
+    """
+    Per-cell forecasts: in-process LRU in front of the shared cache backend.
+
+    Args:
+        ttl (float, optional): Seconds before a cell is refetched
+        max_cells (int, optional): Cells held in process memory
+    """
+
+    def __init__(self, ttl: float = FORECAST_TTL, max_cells: int = MAX_CELLS):
+        self.ttl = ttl
+        self.max_cells = max_cells
+        self._cells = OrderedDict()
+        self._shared = get_backend("forecast")
+        self._lock = threading.Lock()
+
+    def _fetch(self, cell) -> Forecast:
+        response = fetch(
+            "open-meteo",
+            OPEN_METEO_URL,
+            params={
+                "latitude": cell[0],
+                "longitude": cell[1],
+                "hourly": ",".join(HOURLY_VARIABLES),
+                "daily": ",".join(DAILY_VARIABLES),
+                "timezone": "auto",
+                "timeformat": "unixtime",
+                "forecast_days": 7,
+            }
+        )
+        response.raise_for_status()
+        return Forecast.from_open_meteo(cell, response.json())
+
+    def get(self, lat: float, lon: float) -> Forecast:
+        """
+        Forecast for the grid cell containing a point, fetching it if needed.
+
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
+
+        Returns:
+            Forecast: Cell forecast
+        """
+        cell = snap(lat, lon)
+        key = f"{cell[0]},{cell[1]}"
+        with self._lock:
+            forecast = self._cells.get(cell)
+            if forecast is not None and time.time() - forecast.fetched_at < self.ttl:
+                self._cells.move_to_end(cell)
+                return forecast
+
+        hit, payload = self._shared.get(key)
+        if hit:
+            forecast = Forecast.from_payload(payload)
+        else:
+            print(f"Fetching hourly forecast for grid cell {cell}")
+            forecast = self._fetch(cell)
+            self._shared.set(key, forecast.to_payload(), self.ttl)
+
+        with self._lock:
+            self._cells[cell] = forecast
+            self._cells.move_to_end(cell)
+            while len(self._cells) > self.max_cells:
+                self._cells.popitem(last=False)
+        return forecast
+
+
+forecast_store = ForecastStore()
+
+
+def get_weather_forecast(location: str, start: str, end: str = None) -> dict:
+    """
+    Forecast for a place at a time, over a time window, or for a whole day.
+
+    Args:
+        location (str): Name of the location
+        start (str): Local date ('2025-11-15') or datetime ('2025-11-15T15:00')
+        end (str, optional): Local end datetime for a window summary
+
+    Returns:
+        dict: Compact forecast numbers, or an error
+    """
+    try:
+        place = geocode(location)
+        if place is None:
+            return {"error": "Location not found"}
+        forecast = forecast_store.get(place["lat"], place["lon"])
+        if end:
+            summary = forecast.window(start, end)
+        elif "T" in start:
+            summary = forecast.at(start)
+        else:
+            summary = forecast.day(start)
+        units = {"temperature": "°C", "precipitation": "mm", "windspeed": "km/h"}
+        return dict(summary, location=location, start=start, end=end, units=units)
+    except ValueError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": f"Failed to get forecast: {str(e)}"}
@@ -0,0 +1,97 @@
+"""
+Geocoding
+
+Resolves place names to coordinates with Nominatim. Results are cached in
+the shared cache backend for a long time (places do not move), and
+coordinates can be snapped to a grid so nearby points share weather and
+forecast cache entries.
+"""
+
+import math
+
+from .cache_backends import get_backend
+from .config import config
+from .tool_cache import normalize_args
+from .upstream import fetch
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+
+# Place coordinates rarely change; misses are retried sooner
+GEOCODE_TTL = 30 * 24 * 3600
+NOT_FOUND_TTL = 3600
+
+EARTH_RADIUS_MILES = 3958.8
+
+_cache = get_backend("geocode")
+
+
+def geocode(location: str):
+    """
+    Resolve a place name to coordinates.
+
+    Args:
+        location (str): Name of the location (city, address, or place name)
+
+    Returns:
+        dict: {"lat", "lon", "name"}, or None if the place was not found
+    """
+    key = normalize_args({"location": location})["location"]
+    hit, cached = _cache.get(key)
+    if hit:
+        return cached or None
+
+    response = fetch(
+        "nominatim",
+        NOMINATIM_URL,
+        params={"q": location, "format": "json", "limit": 1},
+        headers={"User-Agent": "geo-coord-fetcher"}
+    )
+    response.raise_for_status()
+    data = response.json()
+
+    if not data:
+        _cache.set(key, {}, NOT_FOUND_TTL)
+        return None
+
+    place = {
+        "lat": float(data[0]["lat"]),
+        "lon": float(data[0]["lon"]),
+        "name": data[0].get("display_name", location),
+    }
+    _cache.set(key, place, GEOCODE_TTL)
+    return place
+
+
+def snap(lat: float, lon: float, step: float = None) -> tuple:
+    """
+    Snap coordinates to the weather grid.
+
+    Args:
+        lat (float): Latitude
+        lon (float): Longitude
+        step (float, optional): Grid size in degrees (default: WEATHER_GRID_STEP)
+
+    Returns:
+        tuple: (lat, lon) of the grid cell center, rounded for stable cache keys
+    """
+    step = step or config.weather_grid_step
+    return (round(round(lat / step) * step, 4), round(round(lon / step) * step, 4))
+
+
+def distance_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle (haversine) distance between two points.
+
+    Args:
+        lat1 (float): Latitude of the first point
+        lon1 (float): Longitude of the first point
+        lat2 (float): Latitude of the second point
+        lon2 (float): Longitude of the second point
+
+    Returns:
+        float: Distance in miles
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    h = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(min(1.0, h)))
@@ -0,0 +1,156 @@
+"""
+Background Jobs
+
+Slow requests (multi-page rental searches, wide event searches) can run as
+jobs instead of holding a gunicorn worker and the client's connection: the
+request returns a job id at once, the work runs on a small pool and the
+result is polled from /api/jobs/<id>.
+
+Job records have a store of their own (JOBS_BACKEND, following
+CACHE_BACKEND by default), bounded by JOBS_MAX_RECORDS and separate from the
+tool caches, so cached tool results never evict a job nobody has polled yet.
+With SQLite or Redis any worker or node can answer a poll; the memory store
+is private to one process, so when gunicorn runs several workers async
+requests are answered inline instead of handing out ids another worker
+cannot find. Every update stores a new record, never a live object, and
+records expire JOB_TTL seconds after their last update. The pool runs
+JOBS_WORKERS jobs at a time and accepts at most JOBS_MAX_PENDING waiting or
+running jobs per process.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache_backends import MemoryBackend, RedisBackend, SQLiteBackend
+from .config import config
+from .tracing import start_trace
+
+# Longest a poll may wait for a job to finish, and how often it rechecks
+MAX_POLL_WAIT = 25.0
+POLL_INTERVAL = 0.25
+
+
+def _build_backend():
+    """Dedicated record store for jobs, selected by JOBS_BACKEND."""
+    kind = config.jobs_backend
+    if kind == "sqlite":
+        return SQLiteBackend(config.jobs_path, max_entries=config.jobs_max_records)
+    if kind == "redis":
+        return RedisBackend(config.redis_url, prefix="cc:jobs:")
+    if kind != "memory":
+        print(f"Unknown JOBS_BACKEND {kind!r}; using memory")
+    return MemoryBackend(max_entries=config.jobs_max_records)
+
+
+class JobStore:
+    """
+    Runs jobs on a thread pool and keeps their records in a dedicated store.
+
+    Args:
+        workers (int): Jobs running at once
+        max_pending (int): Queued plus running jobs accepted per process
+        ttl (float): Seconds a job record is kept after its last update
+        backend (CacheBackend, optional): Record store (default: built from JOBS_BACKEND)
+    """
+
+    def __init__(self, workers: int, max_pending: int, ttl: float, backend=None):
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.backend = backend if backend is not None else _build_backend()
+        # Processes serving polls; set by the gunicorn post_fork hook
+        self.processes = 1
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self._counts = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0}
+        self._run_seconds = 0.0
+
+    @property
+    def available(self) -> bool:
+        """Whether a poll can reach this process's jobs (a shared store, or a single process)."""
+        return self.processes <= 1 or not isinstance(self.backend, MemoryBackend)
+
+    def _save(self, job: dict, **changes) -> dict:
+        """Store a new record with ``changes`` applied; the stored dict is never modified again."""
+        job = dict(job, **changes)
+        self.backend.set(job["id"], job, self.ttl)
+        return job
+
+    def submit(self, kind: str, func, *args) -> str:
+        """
+        Queue ``func(*args)``; its return value becomes the job result.
+
+        Args:
+            kind (str): Job type, e.g. "chat"
+            func (callable): Work to run
+            *args: Arguments for func
+
+        Returns:
+            str: Job id, or None when too many jobs are pending
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self._counts["rejected"] += 1
+                return None
+            self.pending += 1
+            self._counts["submitted"] += 1
+
+        job = self._save({"id": os.urandom(12).hex(), "kind": kind, "created": time.time()}, status="pending")
+        self._executor.submit(self._run, job, func, args)
+        return job["id"]
+
+    def _run(self, job: dict, func, args: tuple):
+        started = time.time()
+        status = "failed"
+        try:
+            with start_trace(f"job {job['kind']}", job_id=job["id"]) as root:
+                job = self._save(job, status="running", started=started, trace_id=root.trace.trace_id)
+                try:
+                    outcome = {"status": "done", "result": func(*args)}
+                except Exception as e:
+                    print(f"Job {job['id']} failed: {e}")
+                    outcome = {"status": "failed", "error": str(e)}
+            self._save(job, finished=time.time(), **outcome)
+            status = outcome["status"]
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self._counts[status] += 1
+                self._run_seconds += time.time() - started
+
+    def get(self, job_id: str, wait: float = 0.0) -> dict:
+        """
+        Current record of a job, optionally waiting for it to finish.
+
+        Args:
+            job_id (str): Id from submit()
+            wait (float, optional): Seconds to wait while the job is pending or running
+
+        Returns:
+            dict: Copy of the job record, or None if unknown or expired
+        """
+        deadline = time.monotonic() + min(max(wait, 0.0), MAX_POLL_WAIT)
+        while True:
+            hit, job = self.backend.get(job_id)
+            if not hit:
+                return None
+            if job["status"] in ("done", "failed") or time.monotonic() >= deadline:
+                return dict(job)
+            time.sleep(POLL_INTERVAL)
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self._counts["done"] + self._counts["failed"]
+            return dict(
+                self._counts,
+                pending=self.pending,
+                max_pending=self.max_pending,
+                records=self.backend.count(""),
+                shared=not isinstance(self.backend, MemoryBackend),
+                avg_run_s=round(self._run_seconds / finished, 3) if finished else None,
+            )
+
+
+job_store = JobStore(workers=config.jobs_workers, max_pending=config.jobs_max_pending, ttl=config.job_ttl)
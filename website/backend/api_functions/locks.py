@@ -0,0 +1,45 @@
+"""
+Keyed Locks
+
+One lock per key (a location, an area) for the stores that fetch upstream
+data at most once per key even when several requests miss together. A
+key's lock exists only while someone holds or waits for it, so the table
+does not grow with every location ever asked about.
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class KeyedLocks:
+    """Per-key mutual exclusion with locks dropped once unused."""
+
+    def __init__(self):
+        self._locks = {}          # key -> [lock, holders and waiters]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, key):
+        """
+        Hold the lock for ``key`` for the duration of the with block.
+
+        Args:
+            key: Any hashable key
+        """
+        with self._lock:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._locks)
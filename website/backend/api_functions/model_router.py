@@ -0,0 +1,150 @@
+"""
+Model Router
+
+Chooses which OpenRouter model serves each completion. Models are grouped
+into tiers ("fast" for tool selection and simple follow-ups, "strong" for
+answers that need more reasoning). Within a tier, candidates are ordered by
+rolling latency and error statistics so a degraded provider is skipped
+automatically and retried once its cooldown expires.
+"""
+
+import threading
+import time
+from collections import deque
+from statistics import median
+
+from .config import config
+
+
+class ModelStats:
+    """Rolling latency/outcome window for a single model."""
+
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.last_failure = 0.0
+
+    def record(self, latency: float, ok: bool):
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+        else:
+            self.last_failure = time.monotonic()
+
+    @property
+    def samples(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def p50(self) -> float:
+        return median(self.latencies) if self.latencies else None
+
+    def as_dict(self) -> dict:
+        return {
+            "samples": self.samples,
+            "error_rate": round(self.error_rate, 3),
+            "p50_latency_s": round(self.p50, 3) if self.p50 is not None else None,
+        }
+
+
+class ModelRouter:
+    """
+    Latency-aware model selection across configurable tiers.
+
+    Args:
+        tiers (dict): Tier name -> ordered tuple of OpenRouter model ids
+        window (int, optional): Number of recent calls kept per model
+        max_error_rate (float, optional): Error rate above which a model is degraded
+        min_samples (int, optional): Calls needed before a model can be degraded
+        cooldown (float, optional): Seconds a degraded model is avoided after its last failure
+    """
+
+    def __init__(self, tiers: dict, window: int = 50, max_error_rate: float = 0.3,
+                 min_samples: int = 5, cooldown: float = 60.0):
+        self.tiers = {name: tuple(models) for name, models in tiers.items()}
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get_stats(self, model: str) -> ModelStats:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats(self.window)
+        return stats
+
+    def is_degraded(self, model: str) -> bool:
+        """Whether the model is currently being avoided."""
+        stats = self._stats.get(model)
+        if stats is None or stats.samples < self.min_samples:
+            return False
+        if stats.error_rate <= self.max_error_rate:
+            return False
+        return time.monotonic() - stats.last_failure < self.cooldown
+
+    def candidates(self, tier: str) -> list:
+        """
+        Models for a tier, best first.
+
+        Healthy models come before degraded ones; among healthy models the
+        lowest rolling median latency wins, and models without latency data
+        yet keep their configured position so they still get traffic.
+
+        Args:
+            tier (str): Tier name ("fast" or "strong")
+
+        Returns:
+            list: Ordered model ids
+        """
+        models = self.tiers.get(tier) or self.tiers["strong"]
+        with self._lock:
+            def key(indexed):
+                index, model = indexed
+                stats = self._stats.get(model)
+                p50 = stats.p50 if stats else None
+                return (self.is_degraded(model), p50 if p50 is not None else 0.0, index)
+
+            return [model for _, model in sorted(enumerate(models), key=key)]
+
+    def choose(self, tier: str) -> str:
+        """Best model for a tier."""
+        return self.candidates(tier)[0]
+
+    def record(self, model: str, latency: float, ok: bool):
+        """
+        Record the outcome of one completion call.
+
+        Args:
+            model (str): Model id that served the call
+            latency (float): Wall-clock seconds for the call
+            ok (bool): Whether the call succeeded
+        """
+        with self._lock:
+            self._get_stats(model).record(latency, ok)
+
+    def stats(self) -> dict:
+        """Per-model rolling statistics, grouped by tier."""
+        with self._lock:
+            return {
+                tier: {
+                    model: dict(self._get_stats(model).as_dict(), degraded=self.is_degraded(model))
+                    for model in models
+                }
+                for tier, models in self.tiers.items()
+            }
+
+
+router = ModelRouter(
+    tiers={"fast": config.fast_models, "strong": config.strong_models},
+    window=config.router_window,
+    max_error_rate=config.router_max_error_rate,
+    cooldown=config.router_cooldown,
+)
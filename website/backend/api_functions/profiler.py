@@ -0,0 +1,165 @@
+"""
+Request Profiler
+
+Opt-in cProfile capture for production requests. A request is profiled
+when it is sampled (PROFILE_SAMPLE_RATE) or when it carries
+``X-Profile: 1`` together with a valid ``X-Admin-Token``. Each profile is
+saved to PROFILE_DIR as a ``.prof`` file (pstats format, readable by
+snakeviz, flameprof, gprof2dot) plus a small ``.json`` description; only
+the newest PROFILE_KEEP profiles are kept.
+
+With the sample rate at 0 and no admin header, the only cost is a header
+lookup: no profiler is created. cProfile sees the request thread only, so
+work done in speculation threads shows up as time spent waiting.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from .config import config
+
+_NAME = re.compile(r"^[\w.-]+$")
+
+
+class RequestProfiler:
+    """
+    Samples requests and manages the profile directory.
+
+    Args:
+        directory (str): Where profiles are written
+        keep (int): Profiles kept before the oldest are deleted
+        sample_rate (float): Fraction of requests profiled automatically
+        admin_token (str, optional): Token that unlocks X-Profile
+    """
+
+    def __init__(self, directory: str, keep: int, sample_rate: float, admin_token: str = None):
+        self.directory = directory
+        self.keep = keep
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token
+        self.captured = 0
+        self.skipped_busy = 0
+        # Only one profiler can be active per process on newer Pythons
+        self._active = threading.Lock()
+
+    def wanted(self, headers) -> bool:
+        """Whether to profile a request with these headers."""
+        if headers.get("X-Profile") == "1" and self.admin_token and headers.get("X-Admin-Token") == self.admin_token:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @contextmanager
+    def profile(self, label: str, **details):
+        """
+        Profile a block and save the result.
+
+        Args:
+            label (str): Short name for the file, e.g. "chat"
+            **details: Stored in the profile's description (trace id, path, ...)
+
+        Yields:
+            dict: Description; add fields (e.g. status) before the block ends
+        """
+        if not self._active.acquire(blocking=False):
+            self.skipped_busy += 1
+            yield details
+            return
+        profile = cProfile.Profile()
+        started = time.time()
+        try:
+            profile.enable()
+            try:
+                yield details
+            finally:
+                profile.disable()
+            details["duration_ms"] = round((time.time() - started) * 1000, 1)
+            self._save(profile, label, started, details)
+        finally:
+            self._active.release()
+
+    def _save(self, profile: cProfile.Profile, label: str, started: float, details: dict):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(started))
+            safe_label = re.sub(r"[^\w-]", "_", label)
+            name = f"{stamp}-{int(started * 1000) % 1000:03d}-{safe_label}"
+            profile.dump_stats(os.path.join(self.directory, name + ".prof"))
+            with open(os.path.join(self.directory, name + ".json"), "w") as f:
+                json.dump(dict(details, name=name, label=label, created=started), f)
+            self.captured += 1
+            self._rotate()
+        except OSError as e:
+            print(f"Saving profile failed: {e}")
+
+    def _rotate(self):
+        profiles = sorted(f[:-5] for f in os.listdir(self.directory) if f.endswith(".prof"))
+        for name in profiles[:-self.keep] if self.keep > 0 else profiles:
+            for ext in (".prof", ".json"):
+                try:
+                    os.remove(os.path.join(self.directory, name + ext))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> list:
+        """Descriptions of saved profiles, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        out = []
+        for filename in sorted(os.listdir(self.directory), reverse=True):
+            if filename.endswith(".json"):
+                try:
+                    with open(os.path.join(self.directory, filename)) as f:
+                        out.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return out
+
+    def path(self, name: str) -> str:
+        """Path of a saved .prof file, or None for unknown or unsafe names."""
+        if not _NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name + ".prof")
+        return path if os.path.isfile(path) else None
+
+    def render(self, name: str, sort: str = "cumulative", limit: int = 60) -> str:
+        """
+        Text report of a saved profile.
+
+        Args:
+            name (str): Profile name from list()
+            sort (str, optional): pstats sort key, e.g. "cumulative" or "tottime"
+            limit (int, optional): Functions shown
+
+        Returns:
+            str: pstats report, or None if the profile does not exist
+        """
+        path = self.path(name)
+        if path is None:
+            return None
+        out = io.StringIO()
+        stats = pstats.Stats(path, stream=out)
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "captured": self.captured,
+            "skipped_busy": self.skipped_busy,
+        }
+
+
+profiler = RequestProfiler(
+    directory=config.profile_dir,
+    keep=config.profile_keep,
+    sample_rate=config.profile_sample_rate,
+    admin_token=config.admin_token,
+)
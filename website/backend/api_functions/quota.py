@@ -0,0 +1,408 @@
+"""
+Upstream Quotas
+
+Per-upstream token buckets and daily caps, so bursts of tool calls wait
+briefly for their turn instead of tripping an upstream's rate limit (and
+failing the chat turn on a 429).
+
+Bucket state follows CACHE_BACKEND: with "sqlite" or "redis" every worker
+(and, for Redis, every node) draws from the same buckets; with "memory"
+each process has its own. Within a process, callers waiting on the same
+upstream are served by priority (interactive chat before prefetch before
+batch jobs), then in arrival order.
+"""
+
+import contextvars
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .cache_backends import RedisConnection, RedisError
+from .config import config
+
+# Lower value is served first
+PRIORITIES = {"interactive": 0, "prefetch": 1, "batch": 2}
+
+# Longest a caller of each priority waits for a token before giving up
+MAX_WAIT = {"interactive": None, "prefetch": 2.0, "batch": 60.0}
+
+# Upstream -> (tokens per second, burst, daily cap or None); QUOTA_LIMITS overrides
+QUOTAS = {
+    "nominatim": (1.0, 1, None),          # usage policy: 1 request/second
+    "zillow": (0.5, 3, 1000),             # metered RapidAPI plan
+    "ticketmaster": (5.0, 5, 5000),       # 5 requests/second, 5000/day
+    "discountapi": (1.0, 3, 1000),
+    "open-meteo": (10.0, 20, 10000),
+    "espn": (10.0, 20, None),
+}
+
+_priority = contextvars.ContextVar("quota_priority", default="interactive")
+
+
+class QuotaExceeded(RuntimeError):
+    """Raised when an upstream's budget is spent or the wait would be too long."""
+
+
+@contextmanager
+def priority(name: str):
+    """
+    Run a block of upstream calls at a priority.
+
+    Args:
+        name (str): "interactive", "prefetch" or "batch"
+    """
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%d")
+
+
+# Takes between sweeps that drop refilled buckets and past days' counters
+PRUNE_EVERY = 1024
+
+
+def _full_at(tokens: float, burst: int, rate: float, now: float) -> float:
+    """When a bucket holding ``tokens`` at ``now`` is full again (and can be forgotten)."""
+    return now + (burst - tokens) / rate
+
+
+class LocalBuckets:
+    """
+    Token buckets and day counters for one process.
+
+    A bucket that has refilled is the same as no bucket, so refilled ones
+    are dropped every PRUNE_EVERY takes; per-client buckets would otherwise
+    pile up for every address ever seen.
+    """
+
+    def __init__(self):
+        self._buckets = {}        # name -> (tokens, updated, full_at)
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._takes = 0
+
+    def take(self, name: str, rate: float, burst: int) -> float:
+        """Take one token; returns 0 on success or seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(name, (burst, now, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if wait == 0.0:
+                tokens -= 1
+            self._buckets[name] = (tokens, now, _full_at(tokens, burst, rate, now))
+            self._takes += 1
+            if self._takes % PRUNE_EVERY == 0:
+                self._prune(now)
+            return wait
+
+    def _prune(self, now: float):
+        self._buckets = {name: b for name, b in self._buckets.items() if b[2] > now}
+        today = _today()
+        self._counters = {key: n for key, n in self._counters.items() if key[1] >= today}
+
+    def tokens(self, name: str, rate: float, burst: int) -> float:
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(name, (burst, time.monotonic(), 0))
+        return min(burst, tokens + (time.monotonic() - updated) * rate)
+
+    def count(self, name: str, amount: int = 1) -> int:
+        """Add to today's counter for an upstream and return the new value."""
+        key = (name, _today())
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            return self._counters[key]
+
+
+class SQLiteBuckets:
+    """
+    Token buckets in the SQLite cache file, shared by every process on a host.
+
+    Each take is one IMMEDIATE transaction, so concurrent workers never
+    spend the same token twice. Every PRUNE_EVERY takes per process, rows of
+    buckets that have refilled and counters of past days are deleted.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._takes = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, "
+            "full_at REAL)"
+        )
+        try:
+            # Tables created before full_at existed
+            conn.execute("ALTER TABLE quota_buckets ADD COLUMN full_at REAL")
+        except sqlite3.OperationalError:
+            pass
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_counters (name TEXT NOT NULL, day TEXT NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (name, day))"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, name: str, rate: float, burst: int) -> float:
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM quota_buckets WHERE name = ?", (name,)).fetchone()
+                tokens = burst if row is None else min(burst, row[0] + max(0.0, now - row[1]) * rate)
+                wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+                if wait == 0.0:
+                    tokens -= 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO quota_buckets (name, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                    (name, tokens, now, _full_at(tokens, burst, rate, now)),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._takes += 1
+            if self._takes % PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM quota_buckets WHERE full_at IS NULL OR full_at <= ?", (now,))
+                conn.execute("DELETE FROM quota_counters WHERE day < ?", (_today(),))
+            return wait
+        except sqlite3.Error as e:
+            print(f"SQLite quota check failed: {e}")
+            return 0.0
+
+    def tokens(self, name: str, rate: float, burst: int) -> float:
+        try:
+            row = self._conn().execute("SELECT tokens, updated FROM quota_buckets WHERE name = ?", (name,)).fetchone()
+        except sqlite3.Error:
+            return float(burst)
+        if row is None:
+            return float(burst)
+        return min(burst, row[0] + max(0.0, time.time() - row[1]) * rate)
+
+    def count(self, name: str, amount: int = 1) -> int:
+        day = _today()
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT INTO quota_counters (name, day, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (name, day) DO UPDATE SET count = count + excluded.count",
+                (name, day, amount),
+            )
+            return conn.execute(
+                "SELECT count FROM quota_counters WHERE name = ? AND day = ?", (name, day)
+            ).fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"SQLite quota count failed: {e}")
+            return 0
+
+
+class RedisBuckets:
+    """
+    Buckets on a Redis-protocol server, shared across nodes.
+
+    Redis has no atomic read-modify-write without scripting, so each bucket
+    is approximated by a fixed window of ``burst / rate`` seconds holding
+    ``burst`` tokens, counted with INCRBY.
+    """
+
+    def __init__(self, url: str, prefix: str = "cc:quota:"):
+        self.prefix = prefix
+        self.client = RedisConnection(url)
+
+    def _window(self, rate: float, burst: int):
+        length = burst / rate
+        now = time.time()
+        index = int(now // length)
+        return index, (index + 1) * length - now, length
+
+    def take(self, name: str, rate: float, burst: int) -> float:
+        index, remaining, length = self._window(rate, burst)
+        key = f"{self.prefix}{name}:{index}"
+        try:
+            used = self.client.execute("INCRBY", key, 1)
+            if used == 1:
+                self.client.execute("PEXPIRE", key, max(1, int(length * 2000)))
+        except (OSError, RedisError) as e:
+            print(f"Redis quota check failed: {e}")
+            return 0.0
+        return 0.0 if used <= burst else remaining
+
+    def tokens(self, name: str, rate: float, burst: int) -> float:
+        index, _, _ = self._window(rate, burst)
+        try:
+            used = self.client.execute("INCRBY", f"{self.prefix}{name}:{index}", 0)
+        except (OSError, RedisError):
+            return float(burst)
+        return float(max(0, burst - used))
+
+    def count(self, name: str, amount: int = 1) -> int:
+        key = f"{self.prefix}{name}:day:{_today()}"
+        try:
+            value = self.client.execute("INCRBY", key, amount)
+            if amount and value == amount:
+                self.client.execute("PEXPIRE", key, 2 * 86400 * 1000)
+            return value
+        except (OSError, RedisError) as e:
+            print(f"Redis quota count failed: {e}")
+            return 0
+
+
+def build_buckets():
+    """Bucket store for CACHE_BACKEND: shared for sqlite/redis, per process for memory."""
+    if config.cache_backend == "sqlite":
+        return SQLiteBuckets(config.cache_path)
+    if config.cache_backend == "redis":
+        return RedisBuckets(config.redis_url)
+    return LocalBuckets()
+
+
+def _limits() -> dict:
+    """QUOTAS with QUOTA_LIMITS entries ("name=rate:burst:daily") applied."""
+    limits = dict(QUOTAS)
+    for entry in config.quota_limits:
+        try:
+            name, spec = entry.split("=", 1)
+            parts = spec.split(":")
+            rate, burst = float(parts[0]), int(parts[1])
+            daily = int(parts[2]) if len(parts) > 2 and parts[2] else None
+        except (ValueError, IndexError):
+            print(f"Ignoring malformed QUOTA_LIMITS entry {entry!r}")
+            continue
+        limits[name.strip()] = (rate, burst, daily)
+    return limits
+
+
+class QuotaManager:
+    """
+    Gatekeeper for upstream requests.
+
+    Args:
+        limits (dict): Upstream -> (rate, burst, daily cap)
+        buckets: LocalBuckets, SQLiteBuckets or RedisBuckets
+    """
+
+    def __init__(self, limits: dict, buckets):
+        self.limits = limits
+        self.buckets = buckets
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._waiting = {}           # upstream -> heap of (priority, seq)
+        self._conditions = {}
+        self._stats = {}
+
+    def _condition(self, name: str) -> threading.Condition:
+        with self._lock:
+            if name not in self._conditions:
+                self._conditions[name] = threading.Condition()
+                self._waiting[name] = []
+                self._stats[name] = {"granted": 0, "waited": 0, "wait_seconds": 0.0, "rejected": 0, "retried_429": 0}
+            return self._conditions[name]
+
+    def acquire(self, name: str, priority_name: str = None, max_wait: float = None):
+        """
+        Wait for permission to call an upstream.
+
+        Args:
+            name (str): Upstream name (a key of QUOTAS); unknown upstreams are not limited
+            priority_name (str, optional): Defaults to the current priority()
+            max_wait (float, optional): Seconds to wait at most (default: per priority)
+
+        Raises:
+            QuotaExceeded: The daily cap is spent or no token arrived in time
+        """
+        if name not in self.limits:
+            return
+        rate, burst, daily = self.limits[name]
+        priority_name = priority_name or current_priority()
+        if max_wait is None:
+            max_wait = MAX_WAIT.get(priority_name) or config.quota_max_wait
+        deadline = time.monotonic() + max_wait
+        started = time.monotonic()
+
+        condition = self._condition(name)
+        stats = self._stats[name]
+        waiting = self._waiting[name]
+        me = (PRIORITIES.get(priority_name, 0), next(self._sequence))
+
+        with condition:
+            heapq.heappush(waiting, me)
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if waiting[0] == me:
+                        wait = self.buckets.take(name, rate, burst)
+                        if wait == 0:
+                            break
+                        if wait > remaining:
+                            stats["rejected"] += 1
+                            raise QuotaExceeded(f"Error: {name} is rate limited, try again in {wait:.0f}s")
+                        condition.wait(wait)
+                    else:
+                        if remaining <= 0:
+                            stats["rejected"] += 1
+                            raise QuotaExceeded(f"Error: {name} is busy, try again shortly")
+                        condition.wait(remaining)
+            finally:
+                waiting.remove(me)
+                heapq.heapify(waiting)
+                condition.notify_all()
+
+        if daily is not None and self.buckets.count(name) > daily:
+            stats["rejected"] += 1
+            raise QuotaExceeded(f"Error: daily {name} quota of {daily} requests is used up")
+
+        waited = time.monotonic() - started
+        with self._lock:
+            stats["granted"] += 1
+            if waited > 0.001:
+                stats["waited"] += 1
+                stats["wait_seconds"] += waited
+
+    def record_429(self, name: str):
+        self._condition(name)
+        with self._lock:
+            self._stats[name]["retried_429"] += 1
+
+    def stats(self) -> dict:
+        """Remaining budget and wait counters per upstream."""
+        out = {}
+        for name, (rate, burst, daily) in self.limits.items():
+            used_today = self.buckets.count(name, 0)
+            entry = {
+                "rate_per_second": rate,
+                "burst": burst,
+                "tokens": round(self.buckets.tokens(name, rate, burst), 2),
+                "daily_cap": daily,
+                "used_today": used_today,
+                "remaining_today": None if daily is None else max(0, daily - used_today),
+                "queued": len(self._waiting.get(name, ())),
+            }
+            stats = self._stats.get(name)
+            if stats:
+                entry.update(stats, wait_seconds=round(stats["wait_seconds"], 3))
+            out[name] = entry
+        return out
+
+
+quota_manager = QuotaManager(_limits(), build_buckets())
@@ -0,0 +1,130 @@
+"""
+Records
+
+Compact record types for the parsed upstream data the catalogs and stores
+keep: football games, Ticketmaster events, Zillow listings and DiscountAPI
+deals.
+
+Each record is a NamedTuple: the values live in one tuple with no
+per-instance ``__dict__`` and no repeated key strings, and enum-like strings
+(game state, event segment and genre, city, home type, deal category) are
+interned so thousands of records share one copy. In the JSON cache backends
+a record is stored as an array in field order and rebuilt with ``records``;
+tools turn records into dicts only when building their output
+(``to_json``).
+
+``bench/record_memory.py`` measures the per-record memory against the
+dicts these types replaced.
+"""
+
+import sys
+from typing import NamedTuple
+
+
+def intern(value):
+    """Interned copy of a string; anything else is returned unchanged."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Game(NamedTuple):
+    """One game from one team's point of view."""
+    event_id: str
+    start: float          # epoch seconds
+    opponent_id: str
+    opponent: str
+    home: bool
+    team_score: str
+    opponent_score: str
+    state: str            # "pre", "in" or "post" (interned)
+    status: str           # ESPN description, e.g. "Final" (interned)
+    venue: str
+
+    @property
+    def final(self) -> bool:
+        return self.state == "post"
+
+
+class Event(NamedTuple):
+    """One Ticketmaster event."""
+    name: str
+    url: str
+    start_date: str
+    start_time: str
+    price_range: str
+    venue: str = None
+    city: str = None          # interned
+    state: str = None         # interned
+    latitude: float = None
+    longitude: float = None
+    segment: str = None       # interned
+    genre: str = None         # interned
+    subgenre: str = None      # interned
+    distance_miles: float = None
+
+
+class Listing(NamedTuple):
+    """One Zillow for-rent listing."""
+    address: str
+    price: object             # number or display string such as "$1,250/mo"
+    bedrooms: float
+    bathrooms: float
+    square_feet: float
+    property_type: str        # interned
+    listing_url: str
+    image_url: str
+    description: str          # interned (a handful of status texts)
+    latitude: float
+    longitude: float
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Listing":
+        """Listing from a dict with the same keys (missing keys become None)."""
+        return cls(*(data.get(field) for field in cls._fields))
+
+
+class Deal(NamedTuple):
+    """One DiscountAPI deal."""
+    id: str
+    title: str
+    merchant: str
+    category: str             # interned
+    price: float
+    value: float
+    discount_pct: int
+    expires_at: str
+    city: str                 # interned
+    online: bool
+    url: str
+
+
+def records(cls, rows: list) -> list:
+    """
+    Records from a cache backend value.
+
+    The memory backend hands back the records themselves; the SQLite and
+    Redis backends hand back JSON arrays in field order.
+
+    Args:
+        cls (type): Record type
+        rows (list): Records or arrays
+
+    Returns:
+        list: Records of ``cls``
+    """
+    if not rows or isinstance(rows[0], cls):
+        return rows
+    return [cls._make(row) for row in rows]
+
+
+def to_json(record, drop: tuple = ()) -> dict:
+    """
+    Dict of a record for tool output, without empty fields.
+
+    Args:
+        record (NamedTuple): Record to convert
+        drop (tuple, optional): Fields to leave out
+
+    Returns:
+        dict: Field -> value for fields that are set
+    """
+    return {k: v for k, v in zip(record._fields, record) if v is not None and k not in drop}
@@ -0,0 +1,503 @@
+"""
+Rental Listing Index
+
+All for-rent listings of a location are fetched from Zillow once per TTL
+and kept in a columnar in-memory index, so price ranges, bedroom/bathroom
+filters, sorting and paging are answered locally instead of spending a
+RapidAPI request per question.
+
+Columns are typed arrays; rows are also kept in price order (for bisecting
+price ranges) and bucketed by bedrooms and bathrooms as integer bitmasks.
+These are plain Python loops over compact columns, not vectorized (numpy is
+not a dependency): the saving is in doing the per-listing work once when
+the index is built, so a query is a bisect, a few bitmask AND/ORs and a
+loop over the candidate rows only.
+Great-circle distance to campus (CAMPUS_LAT/CAMPUS_LON) is computed for
+every listing in one pass when the index is built, so distance sorting and
+radius filtering cost no trigonometry per query.
+"""
+
+import json
+import math
+import re
+import statistics
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from .cache_backends import get_backend
+from .config import config
+from .geocoding import EARTH_RADIUS_MILES
+from .locks import KeyedLocks
+from .records import Listing, intern, records
+from .tool_cache import normalize_args
+from .upstream import fetch
+
+ZILLOW_URL = "https://zillow56.p.rapidapi.com/search"
+
+# Listing fields kept per row (everything else in the Zillow payload is dropped)
+FIELDS = Listing._fields
+
+SORT_KEYS = ("price", "bedrooms", "bathrooms", "square_feet", "distance")
+
+# Locations indexed in process memory
+MAX_LOCATIONS = 64
+
+# First number in a display price, with thousands separators
+NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+_listings = get_backend("rentals")
+
+
+def _number(value, default=-1):
+    """
+    Float from a number or a display string; ``default`` if missing.
+
+    Only the first number in a string counts, so "$1,250/mo" is 1250 and a
+    range such as "$1,250 - $1,800" is its lower bound.
+    """
+    if isinstance(value, str):
+        match = NUMBER.search(value)
+        value = match.group().replace(",", "") if match else None
+    try:
+        return float(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        return default
+
+
+def listing_from_zillow(property_data: dict) -> Listing:
+    """
+    Reduce one Zillow result to the fields the index keeps.
+
+    Args:
+        property_data (dict): One entry of the Zillow "results" list
+
+    Returns:
+        Listing: Listing with FIELDS
+    """
+    address = property_data.get("address")
+    if not address:
+        parts = [property_data.get(k) for k in ("streetAddress", "city", "state", "zipcode")]
+        address = ", ".join(str(p) for p in parts if p) or "Address not available"
+    return Listing(
+        address=address,
+        price=property_data.get("price"),
+        bedrooms=property_data.get("bedrooms"),
+        bathrooms=property_data.get("bathrooms"),
+        square_feet=property_data.get("livingArea"),
+        property_type=intern(property_data.get("homeType")),
+        listing_url=property_data.get("detailUrl", ""),
+        image_url=property_data.get("imgSrc", ""),
+        description=intern(property_data.get("statusText", "")),
+        latitude=property_data.get("latitude"),
+        longitude=property_data.get("longitude"),
+    )
+
+
+def distances_from(latitudes, longitudes, lat: float, lon: float) -> array:
+    """
+    Haversine distance in miles from one point to every coordinate pair.
+
+    A single Python loop over the columns (numpy is not a dependency), run
+    once per index build; queries then bisect the sorted result.
+
+    Args:
+        latitudes (array): Listing latitudes in degrees (NaN if unknown)
+        longitudes (array): Listing longitudes in degrees (NaN if unknown)
+        lat (float): Latitude of the reference point
+        lon (float): Longitude of the reference point
+
+    Returns:
+        array: Distances in miles; -1 where coordinates are unknown
+    """
+    sin, cos, asin, sqrt, radians = math.sin, math.cos, math.asin, math.sqrt, math.radians
+    phi0, lambda0 = radians(lat), radians(lon)
+    cos_phi0 = cos(phi0)
+    diameter = 2 * EARTH_RADIUS_MILES
+    out = array("d", bytes(8 * len(latitudes)))
+    for i, (la, lo) in enumerate(zip(latitudes, longitudes)):
+        if la != la or lo != lo:
+            out[i] = -1.0
+            continue
+        phi = radians(la)
+        h = sin((phi - phi0) / 2) ** 2 + cos_phi0 * cos(phi) * sin((radians(lo) - lambda0) / 2) ** 2
+        out[i] = diameter * asin(sqrt(min(1.0, h)))
+    return out
+
+
+class ListingIndex:
+    """
+    Columnar index over one location's listings.
+
+    Args:
+        listings (list): Listing records as produced by listing_from_zillow
+        origin (tuple, optional): (lat, lon) distances are measured from
+            (default: the configured campus)
+    """
+
+    def __init__(self, listings: list, origin: tuple = None):
+        n = len(listings)
+        self.size = n
+        self.price = array("d", (_number(l.price) for l in listings))
+        self.bedrooms = array("d", (_number(l.bedrooms) for l in listings))
+        self.bathrooms = array("d", (_number(l.bathrooms) for l in listings))
+        self.square_feet = array("d", (_number(l.square_feet) for l in listings))
+        self.latitude = array("d", (_number(l.latitude, float("nan")) for l in listings))
+        self.longitude = array("d", (_number(l.longitude, float("nan")) for l in listings))
+        self.property_type = [sys.intern(str(l.property_type or "N/A")) for l in listings]
+        self.address = [l.address for l in listings]
+        self.listing_url = [l.listing_url for l in listings]
+        self.image_url = [l.image_url for l in listings]
+        self.description = [l.description for l in listings]
+
+        origin = origin or (config.campus_lat, config.campus_lon)
+        self.distance = distances_from(self.latitude, self.longitude, *origin)
+        located = sorted((i for i in range(n) if self.distance[i] >= 0), key=self.distance.__getitem__)
+        self.distance_order = array("l", located)
+        self.sorted_distances = array("d", (self.distance[i] for i in located))
+
+        # Rows with a known price, sorted by price, plus the sorted prices for bisect
+        priced = sorted((i for i in range(n) if self.price[i] >= 0), key=self.price.__getitem__)
+        self.price_order = array("l", priced)
+        self.sorted_prices = array("d", (self.price[i] for i in priced))
+
+        self.bedroom_buckets = self._buckets(self.bedrooms)
+        self.bathroom_buckets = self._buckets(self.bathrooms)
+
+    @staticmethod
+    def _buckets(column) -> dict:
+        """Value -> bitmask of rows with that value (unknown values are skipped)."""
+        buckets = {}
+        for row, value in enumerate(column):
+            if value >= 0:
+                buckets[value] = buckets.get(value, 0) | (1 << row)
+        return buckets
+
+    def _mask(self, bedrooms=None, bathrooms=None) -> int:
+        """Bitmask of rows passing the bedroom (exact) and bathroom (minimum) filters."""
+        mask = (1 << self.size) - 1
+        if bedrooms is not None:
+            mask &= self.bedroom_buckets.get(float(bedrooms), 0)
+        if bathrooms is not None:
+            allowed = 0
+            for value, bits in self.bathroom_buckets.items():
+                if value >= float(bathrooms):
+                    allowed |= bits
+            mask &= allowed
+        return mask
+
+    def _within(self, max_distance: float) -> int:
+        """Bitmask of rows within ``max_distance`` miles of the origin."""
+        mask = 0
+        for row in self.distance_order[:bisect_right(self.sorted_distances, max_distance)]:
+            mask |= 1 << row
+        return mask
+
+    def select(self, min_price=None, max_price=None, bedrooms=None, bathrooms=None, max_distance=None) -> list:
+        """
+        Row ids matching the filters, in ascending price order.
+
+        Args:
+            min_price (int, optional): Minimum monthly rent
+            max_price (int, optional): Maximum monthly rent
+            bedrooms (int, optional): Exact number of bedrooms
+            bathrooms (float, optional): Minimum number of bathrooms
+            max_distance (float, optional): Maximum miles from campus
+
+        Returns:
+            list: Matching row ids
+        """
+        lo = bisect_left(self.sorted_prices, min_price) if min_price is not None else 0
+        hi = bisect_right(self.sorted_prices, max_price) if max_price is not None else len(self.sorted_prices)
+        candidates = self.price_order[lo:hi]
+        if bedrooms is None and bathrooms is None and max_distance is None:
+            return list(candidates)
+        mask = self._mask(bedrooms, bathrooms)
+        if max_distance is not None:
+            mask &= self._within(float(max_distance))
+        return [row for row in candidates if (mask >> row) & 1]
+
+    def sort(self, rows: list, key: str = "price") -> list:
+        """
+        Order rows by a column; prefix with "-" for descending.
+
+        Args:
+            rows (list): Row ids (as returned by select)
+            key (str, optional): "price", "bedrooms", "bathrooms", "square_feet"
+                or "distance"
+
+        Returns:
+            list: Sorted row ids (rows missing the value last)
+        """
+        descending = key.startswith("-")
+        name = key.lstrip("-")
+        column = getattr(self, name, None)
+        if name not in SORT_KEYS or not isinstance(column, array):
+            raise ValueError(f"Cannot sort by {key!r}")
+        if name == "price" and not descending:
+            return rows
+        known = [row for row in rows if column[row] >= 0]
+        unknown = [row for row in rows if column[row] < 0]
+        return sorted(known, key=column.__getitem__, reverse=descending) + unknown
+
+    def row(self, i: int) -> dict:
+        """Compact dict for one listing, as sent to the model."""
+        def num(value):
+            if value < 0:
+                return None
+            return int(value) if value.is_integer() else value
+        return {
+            "address": self.address[i],
+            "price": num(self.price[i]),
+            "bedrooms": num(self.bedrooms[i]),
+            "bathrooms": num(self.bathrooms[i]),
+            "square_feet": num(self.square_feet[i]),
+            "distance_miles": round(self.distance[i], 2) if self.distance[i] >= 0 else None,
+            "property_type": self.property_type[i],
+            "listing_url": self.listing_url[i],
+        }
+
+
+def _spread(values: list) -> dict:
+    """min/p25/median/p75/max of an ascending list (None if empty)."""
+    if not values:
+        return None
+    if len(values) == 1:
+        q1 = median = q3 = values[0]
+    else:
+        q1, median, q3 = statistics.quantiles(values, n=4, method="inclusive")
+    return {
+        "min": round(values[0], 2), "p25": round(q1, 2), "median": round(median, 2),
+        "p75": round(q3, 2), "max": round(values[-1], 2),
+    }
+
+
+def summarize(index: ListingIndex, rows: list) -> dict:
+    """
+    Market summary of some rows: rent and $/sqft spread, and per-bedroom and
+    per-home-type counts with median rent.
+
+    Rows come from ListingIndex.select in ascending price order, so one pass
+    fills every group already sorted.
+
+    Args:
+        index (ListingIndex): Index the rows belong to
+        rows (list): Row ids in ascending price order
+
+    Returns:
+        dict: Compact summary
+    """
+    price, sqft, bedrooms, types = index.price, index.square_feet, index.bedrooms, index.property_type
+    rents, per_sqft, by_bedrooms, by_type = [], [], {}, {}
+    for row in rows:
+        rent = price[row]
+        if rent < 0:
+            continue
+        rents.append(rent)
+        if sqft[row] > 0:
+            per_sqft.append(rent / sqft[row])
+        beds = bedrooms[row]
+        by_bedrooms.setdefault("unknown" if beds < 0 else f"{beds:g}", []).append(rent)
+        by_type.setdefault(types[row], []).append(rent)
+    per_sqft.sort()
+
+    def groups(buckets):
+        return {
+            key: {"count": len(values), "median_rent": round(statistics.median(values))}
+            for key, values in sorted(buckets.items())
+        }
+
+    return {
+        "listings": len(rows),
+        "priced": len(rents),
+        "rent": _spread(rents),
+        "rent_per_sqft": _spread(per_sqft),
+        "by_bedrooms": groups(by_bedrooms),
+        "by_property_type": groups(by_type),
+    }
+
+
+def summarize_listings(listings: list) -> dict:
+    """
+    Market summary of already parsed listings (e.g. parse_rental_data's "properties").
+
+    Args:
+        listings (list): Listing records, or dicts with price, bedrooms,
+            square_feet and property_type
+
+    Returns:
+        dict: Compact summary
+    """
+    index = ListingIndex([l if isinstance(l, Listing) else Listing.from_dict(l) for l in listings])
+    return summarize(index, index.select())
+
+
+def _fetch_listings(location: str) -> list:
+    """Download a location's listings from Zillow (RENTAL_MAX_PAGES pages at most)."""
+    headers = {
+        'x-rapidapi-key': config.rental_key,
+        'x-rapidapi-host': "zillow56.p.rapidapi.com"
+    }
+    listings = []
+    for page in range(1, config.rental_max_pages + 1):
+        querystring = {
+            "location": location,
+            "output": "json",
+            "status": "forRent",
+            "sortSelection": "priorityscore",
+            "listing_type": "by_agent",
+            "doz": "any",
+            "page": page
+        }
+        response = fetch("zillow", ZILLOW_URL, headers=headers, params=querystring)
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to get rentals: {response.text}")
+        data = response.json()
+        listings.extend(listing_from_zillow(p) for p in data.get("results", []))
+        if page >= int(data.get("totalPages") or 1):
+            break
+    return listings
+
+
+class ListingStore:
+    """
+    Location -> ListingIndex, rebuilt once per TTL.
+
+    The reduced listings are also kept in the shared cache backend so other
+    workers build their index without another upstream request. At most
+    ``max_locations`` indexes are kept, least recently used dropped first,
+    and an expired index is dropped when its location is next looked up.
+
+    Args:
+        ttl (float, optional): Seconds an index stays valid
+        max_locations (int, optional): Locations indexed in process memory
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_locations: int = MAX_LOCATIONS):
+        self.ttl = ttl
+        self.max_locations = max_locations
+        self.upstream_fetches = 0
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self._location_locks = KeyedLocks()
+
+    def _fresh(self, key: str):
+        """Live index for a key (marked recently used), dropping it if expired; call with _lock held."""
+        entry = self._indexes.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] >= self.ttl:
+            del self._indexes[key]
+            return None
+        self._indexes.move_to_end(key)
+        return entry[1]
+
+    def get(self, location: str) -> ListingIndex:
+        """
+        Index for a location, fetching listings at most once per TTL.
+
+        Args:
+            location (str): Location to search for rentals
+
+        Returns:
+            ListingIndex: Index over the location's listings
+        """
+        key = normalize_args({"location": location})["location"]
+        with self._lock:
+            index = self._fresh(key)
+        if index is not None:
+            return index
+
+        # One fetch per location even when several requests miss together
+        with self._location_locks.hold(key):
+            with self._lock:
+                index = self._fresh(key)
+            if index is not None:
+                return index
+
+            hit, listings = _listings.get(key)
+            if hit:
+                listings = records(Listing, listings)
+            else:
+                listings = _fetch_listings(location)
+                with self._lock:
+                    self.upstream_fetches += 1
+                _listings.set(key, listings, self.ttl)
+
+            index = ListingIndex(listings)
+            with self._lock:
+                self._indexes[key] = (time.time(), index)
+                self._indexes.move_to_end(key)
+                while len(self._indexes) > self.max_locations:
+                    self._indexes.popitem(last=False)
+            return index
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "locations": len(self._indexes),
+                "listings": sum(entry[1].size for entry in self._indexes.values()),
+                "upstream_fetches": self.upstream_fetches,
+            }
+
+
+listing_store = ListingStore(ttl=config.rental_index_ttl)
+
+
+def search_listings(location: str, min_price=None, max_price=None, bedrooms=None, bathrooms=None,
+                    max_distance=None, sort: str = "price", offset: int = 0, limit: int = 20) -> dict:
+    """
+    Filter, sort and page a location's listings locally.
+
+    Args:
+        location (str): Location to search for rentals
+        min_price (int, optional): Minimum monthly rent
+        max_price (int, optional): Maximum monthly rent
+        bedrooms (int, optional): Exact number of bedrooms
+        bathrooms (float, optional): Minimum number of bathrooms
+        max_distance (float, optional): Maximum miles from campus
+        sort (str, optional): Column to sort by, "-" prefix for descending (default: "price")
+        offset (int, optional): Rows to skip, for paging
+        limit (int, optional): Rows to return (default: 20)
+
+    Returns:
+        dict: {"total_results", "offset", "properties"}
+    """
+    index = listing_store.get(location)
+    rows = index.select(min_price, max_price, bedrooms, bathrooms, max_distance)
+    rows = index.sort(rows, sort)
+    page = rows[offset:offset + limit]
+    return {
+        "total_results": len(rows),
+        "offset": offset,
+        "properties": [index.row(i) for i in page],
+    }
+
+
+def summarize_location(location: str, min_price=None, max_price=None, bedrooms=None, bathrooms=None,
+                       max_distance=None) -> dict:
+    """
+    Market summary of a location's listings matching the filters.
+
+    Args:
+        location (str): Location to search for rentals
+        min_price (int, optional): Minimum monthly rent
+        max_price (int, optional): Maximum monthly rent
+        bedrooms (int, optional): Exact number of bedrooms
+        bathrooms (float, optional): Minimum number of bathrooms
+        max_distance (float, optional): Maximum miles from campus
+
+    Returns:
+        dict: Compact summary
+    """
+    index = listing_store.get(location)
+    rows = index.select(min_price, max_price, bedrooms, bathrooms, max_distance)
+    return dict(summarize(index, rows), location=location)
+
+
+def dumps(result: dict) -> str:
+    """Compact JSON for tool output."""
+    return json.dumps(result, separators=(",", ":"))
@@ -1,102 +1,93 @@
-import requests
-import os
-from dotenv import load_dotenv
 import json
+from .config import config
+from .records import to_json
+from .rental_index import listing_from_zillow, search_listings, summarize_location, dumps
 
-load_dotenv()
-
-rental_key = os.environ.get("rental_key")
-
-def get_rentals(location: str) -> str:
+def get_rentals(location: str, min_price: int = None, max_price: int = None, bedrooms: int = None,
+                bathrooms: float = None, max_distance: float = None, sort: str = "price",
+                offset: int = 0, limit: int = 20) -> str:
     """
     Search for rental properties in a specific location using Zillow data.
 
+    Listings are fetched once per location per TTL into the listing index;
+    filters, sorting and paging are applied locally.
+
     Args:
         location (str): Location to search for rentals (e.g., 'college station, tx', 'new york, ny')
+        min_price (int, optional): Minimum monthly rent
+        max_price (int, optional): Maximum monthly rent
+        bedrooms (int, optional): Exact number of bedrooms
+        bathrooms (float, optional): Minimum number of bathrooms
+        max_distance (float, optional): Maximum miles from campus
+        sort (str, optional): "price", "bedrooms", "bathrooms", "square_feet" or "distance";
+            "-" prefix for descending
+        offset (int, optional): Results to skip, for paging
+        limit (int, optional): Results to return (default: 20)
 
     Returns:
-        str: Rental properties data as a string, or error message if failed
+        str: Matching rental properties as compact JSON, or error message if failed
     """
-    if not rental_key:
+    if not config.rental_key:
         return "Error: Missing rental_key in environment variables"
 
-    url = "https://zillow56.p.rapidapi.com/search"
-    querystring = {
-        "location": location,
-        "output": "json",
-        "status": "forRent",
-        "sortSelection": "priorityscore",
-        "listing_type": "by_agent",
-        "doz": "any"
-    }
-
-    headers = {
-        'x-rapidapi-key': rental_key,
-        'x-rapidapi-host': "zillow56.p.rapidapi.com"
-    }
-
     try:
-        response = requests.get(url, headers=headers, params=querystring)
+        return dumps(search_listings(location, min_price, max_price, bedrooms, bathrooms, max_distance,
+                                     sort=sort, offset=offset, limit=limit))
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error fetching rentals: {str(e)}"
+
+def get_rental_summary(location: str, min_price: int = None, max_price: int = None, bedrooms: int = None,
+                       bathrooms: float = None, max_distance: float = None) -> str:
+    """
+    Summarize the rental market in a location instead of listing properties.
 
-        if response.status_code != 200:
-            return f"Failed to get rentals: {response.text}"
+    Answers "what's typical rent for a 2-bedroom near campus" with median,
+    quartiles, price per square foot and counts by bedrooms and home type.
 
-        return response.text
+    Args:
+        location (str): Location to search for rentals
+        min_price (int, optional): Minimum monthly rent
+        max_price (int, optional): Maximum monthly rent
+        bedrooms (int, optional): Exact number of bedrooms
+        bathrooms (float, optional): Minimum number of bathrooms
+        max_distance (float, optional): Maximum miles from campus
 
+    Returns:
+        str: Summary as compact JSON, or error message if failed
+    """
+    if not config.rental_key:
+        return "Error: Missing rental_key in environment variables"
+
+    try:
+        return dumps(summarize_location(location, min_price, max_price, bedrooms, bathrooms, max_distance))
     except Exception as e:
-        return f"Error fetching rentals: {str(e)}"
+        return f"Error summarizing rentals: {str(e)}"
 
 def get_filtered_rentals(location: str, min_price: int = None, max_price: int = None,
                         bedrooms: int = None, bathrooms: int = None) -> str:
     """
     Search for rental properties with additional filtering options.
 
+    Answered from the same listing index as get_rentals, so different
+    filter combinations for one location cost no extra upstream requests.
+
     Args:
         location (str): Location to search for rentals
         min_price (int, optional): Minimum monthly rent
         max_price (int, optional): Maximum monthly rent
         bedrooms (int, optional): Number of bedrooms
-        bathrooms (int, optional): Number of bathrooms
+        bathrooms (int, optional): Minimum number of bathrooms
 
     Returns:
         str: Filtered rental properties data as a string, or error message if failed
     """
-    if not rental_key:
+    if not config.rental_key:
         return "Error: Missing rental_key in environment variables"
 
-    url = "https://zillow56.p.rapidapi.com/search"
-    querystring = {
-        "location": location,
-        "output": "json",
-        "status": "forRent",
-        "sortSelection": "priorityscore",
-        "listing_type": "by_agent",
-        "doz": "any"
-    }
-
-    # Add filtering parameters if provided
-    if min_price:
-        querystring["minPrice"] = min_price
-    if max_price:
-        querystring["maxPrice"] = max_price
-    if bedrooms:
-        querystring["bedrooms"] = bedrooms
-    if bathrooms:
-        querystring["bathrooms"] = bathrooms
-
-    headers = {
-        'x-rapidapi-key': rental_key,
-        'x-rapidapi-host': "zillow56.p.rapidapi.com"
-    }
-
     try:
-        response = requests.get(url, headers=headers, params=querystring)
-
-        if response.status_code != 200:
-            return f"Failed to get filtered rentals: {response.text}"
-
-        return response.text
-
+        return dumps(search_listings(location, min_price, max_price, bedrooms, bathrooms))
     except Exception as e:
         return f"Error fetching filtered rentals: {str(e)}"
 
@@ -104,6 +95,10 @@ def parse_rental_data(rental_response: str) -> dict:
     """
     Parse the raw rental API response into a more readable format.
 
+    Each result becomes a Listing record, as in the listing index; dicts
+    are built only for the output, and fields Zillow left out are omitted
+    instead of being filled with placeholders.
+
     Args:
         rental_response (str): Raw response from rental API
 
@@ -116,24 +111,10 @@ def parse_rental_data(rental_response: str) -> dict:
         if "results" not in data:
             return {"error": "No results found in rental data"}
 
-        parsed_rentals = []
-        for property_data in data.get("results", []):
-            rental_info = {
-                "address": property_data.get("address", "Address not available"),
-                "price": property_data.get("price", "Price not available"),
-                "bedrooms": property_data.get("bedrooms", "N/A"),
-                "bathrooms": property_data.get("bathrooms", "N/A"),
-                "square_feet": property_data.get("livingArea", "N/A"),
-                "property_type": property_data.get("homeType", "N/A"),
-                "listing_url": property_data.get("detailUrl", ""),
-                "image_url": property_data.get("imgSrc", ""),
-                "description": property_data.get("statusText", "")
-            }
-            parsed_rentals.append(rental_info)
-
+        listings = [listing_from_zillow(p) for p in data.get("results", [])]
         return {
-            "total_results": len(parsed_rentals),
-            "properties": parsed_rentals
+            "total_results": len(listings),
+            "properties": [to_json(l, drop=("latitude", "longitude")) for l in listings]
         }
 
     except json.JSONDecodeError:
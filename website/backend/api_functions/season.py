@@ -0,0 +1,313 @@
+"""
+Season Store
+
+Schedules for every team in TEAM_REFERENCE, loaded concurrently once and
+kept as compact per-game records. Refreshes are incremental: final games
+never change and are never refetched; only games that are scheduled or in
+progress are rechecked, first from the shared scoreboard and then, for
+teams whose games have started but are missing from it, from that team's
+schedule. Next game, last result, record and head-to-head queries are
+answered from memory.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from .quota import priority
+from .records import Game
+from .teams import TEAMS
+from .upstream import fetch
+
+ESPN_BASE = "https://site.api.espn.com/apis/site/v2/sports/football/college-football"
+SCOREBOARD_URL = f"{ESPN_BASE}/scoreboard"
+SCHEDULE_URL = ESPN_BASE + "/teams/{team_id}/schedule"
+
+
+def _score(competitor: dict) -> str:
+    """Scores are strings on the scoreboard and objects on team schedules."""
+    score = competitor.get("score", "")
+    if isinstance(score, dict):
+        return score.get("displayValue", "")
+    return str(score) if score is not None else ""
+
+
+def _parse_time(value: str) -> float:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+def parse_event(event: dict, team_id: str):
+    """
+    Build a Game for ``team_id`` from an ESPN event.
+
+    Args:
+        event (dict): Event from a schedule or scoreboard response
+        team_id (str): ESPN id of the team whose view to build
+
+    Returns:
+        Game: Parsed game, or None if the team is not in the event
+    """
+    comp = (event.get("competitions") or [{}])[0]
+    competitors = comp.get("competitors", [])
+    team = next((c for c in competitors if str(c.get("team", {}).get("id")) == team_id), None)
+    if team is None:
+        return None
+    opp = next((c for c in competitors if c is not team), {})
+    status = comp.get("status", {}).get("type", {})
+    return Game(
+        event_id=str(event.get("id", "")),
+        start=_parse_time(event.get("date") or comp.get("date", "")),
+        opponent_id=str(opp.get("team", {}).get("id", "")),
+        opponent=opp.get("team", {}).get("displayName", "Unknown"),
+        home=team.get("homeAway") == "home",
+        team_score=_score(team),
+        opponent_score=_score(opp),
+        state=sys.intern(status.get("state", "pre")),
+        status=sys.intern(status.get("description", "")),
+        venue=comp.get("venue", {}).get("fullName", ""),
+    )
+
+
+class SeasonStore:
+    """
+    In-memory season schedules with incremental refresh.
+
+    Args:
+        team_ids (list): ESPN ids to keep loaded
+        refresh_interval (float, optional): Seconds between refreshes
+        max_workers (int, optional): Concurrent schedule downloads
+    """
+
+    def __init__(self, team_ids: list, refresh_interval: float = 60.0, max_workers: int = 8):
+        self.team_ids = [str(t) for t in team_ids]
+        self.refresh_interval = refresh_interval
+        self.max_workers = max_workers
+        self.games = {}            # team_id -> tuple of Game sorted by start
+        self.names = {}            # team_id -> display name
+        self.current_events = set()
+        self.last_refresh = 0.0
+        self.fetches = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._started = False
+
+    # Loading
+
+    def _fetch_schedule(self, team_id: str):
+        resp = fetch("espn", SCHEDULE_URL.format(team_id=team_id))
+        resp.raise_for_status()
+        with self._lock:
+            self.fetches += 1
+        return resp.json()
+
+    def _store_schedule(self, team_id: str, schedule: dict):
+        fresh = [g for g in (parse_event(e, team_id) for e in schedule.get("events", [])) if g]
+        with self._lock:
+            # Final games are immutable: keep what we already have for them
+            finals = {g.event_id: g for g in self.games.get(team_id, ()) if g.final}
+            merged = {g.event_id: g for g in fresh}
+            merged.update(finals)
+            self.games[team_id] = tuple(sorted(merged.values(), key=lambda g: g.start))
+            name = schedule.get("team", {}).get("displayName")
+            if name:
+                self.names[team_id] = name
+
+    def load_team(self, team_id: str) -> bool:
+        """Download and store one team's schedule; returns False on failure."""
+        try:
+            self._store_schedule(team_id, self._fetch_schedule(team_id))
+            return True
+        except Exception as e:
+            print(f"Error loading schedule for team {team_id}: {e}")
+            return False
+
+    def _load_batch(self, team_id: str) -> bool:
+        # Pool threads do not inherit the caller's context, so set the priority here
+        with priority("batch"):
+            return self.load_team(team_id)
+
+    def load_all(self):
+        """Load every team's schedule concurrently, yielding to interactive requests."""
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="season") as pool:
+            loaded = sum(pool.map(self._load_batch, self.team_ids))
+        print(f"Season store loaded {loaded}/{len(self.team_ids)} schedules in {time.monotonic() - started:.1f}s")
+
+    def ensure_team(self, team_id: str):
+        team_id = str(team_id)
+        if team_id not in self.games:
+            self.load_team(team_id)
+
+    # Refreshing
+
+    def _apply_scoreboard(self, scoreboard: dict) -> set:
+        """Update pending games from the scoreboard; returns the event ids it covered."""
+        seen = set()
+        for event in scoreboard.get("events", []):
+            event_id = str(event.get("id", ""))
+            seen.add(event_id)
+            comp = (event.get("competitions") or [{}])[0]
+            for competitor in comp.get("competitors", []):
+                team_id = str(competitor.get("team", {}).get("id", ""))
+                game = parse_event(event, team_id)
+                with self._lock:
+                    games = self.games.get(team_id)
+                    if not games:
+                        continue
+                    self.games[team_id] = tuple(
+                        game if g.event_id == event_id and not g.final else g for g in games
+                    )
+        return seen
+
+    def _overdue(self, game: Game, now: float) -> bool:
+        """Started (within the last few days), not final, and not on the scoreboard."""
+        return (
+            not game.final
+            and now - 3 * 86400 < game.start <= now
+            and game.event_id not in self.current_events
+        )
+
+    def refresh(self):
+        """
+        Recheck games that are not final.
+
+        One scoreboard request updates every listed game; teams with a game
+        that should have started but is still not final and was not on the
+        scoreboard get their schedule refetched.
+        """
+        now = time.time()
+        try:
+            resp = fetch("espn", SCOREBOARD_URL)
+            resp.raise_for_status()
+            with self._lock:
+                self.fetches += 1
+            self.current_events = self._apply_scoreboard(resp.json())
+        except Exception as e:
+            print(f"Error fetching scoreboard: {e}")
+
+        with self._lock:
+            stale = [
+                team_id for team_id, games in self.games.items()
+                if any(self._overdue(g, now) for g in games)
+            ]
+        for team_id in stale:
+            self.load_team(team_id)
+        self.last_refresh = now
+
+    def refresh_if_stale(self):
+        """Refresh inline when overdue; concurrent callers skip rather than pile on."""
+        if time.time() - self.last_refresh < self.refresh_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self.refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def _run(self):
+        # Background loading yields to interactive requests for the same upstream
+        with priority("batch"):
+            self.load_all()
+            while True:
+                try:
+                    self.refresh_if_stale()
+                except Exception as e:
+                    print(f"Season refresh failed: {e}")
+                time.sleep(self.refresh_interval)
+
+    def start(self):
+        """Load all schedules and keep refreshing on a background thread (idempotent)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._run, name="season-store", daemon=True).start()
+
+    # Queries
+
+    def schedule(self, team_id: str) -> tuple:
+        return self.games.get(str(team_id), ())
+
+    def current_game(self, team_id: str):
+        """The team's game on the current scoreboard, if any."""
+        for game in self.schedule(team_id):
+            if game.event_id in self.current_events:
+                return game
+        return None
+
+    def next_game(self, team_id: str, now: float = None):
+        now = time.time() if now is None else now
+        for game in self.schedule(team_id):
+            if not game.final and game.start >= now - 6 * 3600:
+                return game
+        return None
+
+    def last_result(self, team_id: str):
+        for game in reversed(self.schedule(team_id)):
+            if game.final:
+                return game
+        return None
+
+    def record(self, team_id: str) -> dict:
+        """Wins, losses and ties (rare in college football, but possible in old or exhibition games)."""
+        wins = losses = ties = 0
+        for game in self.schedule(team_id):
+            if not game.final:
+                continue
+            try:
+                team_score, opponent_score = float(game.team_score), float(game.opponent_score)
+            except ValueError:
+                continue
+            if team_score > opponent_score:
+                wins += 1
+            elif team_score < opponent_score:
+                losses += 1
+            else:
+                ties += 1
+        return {"wins": wins, "losses": losses, "ties": ties}
+
+    def head_to_head(self, team_id: str, opponent_id: str) -> list:
+        return [g for g in self.schedule(team_id) if g.opponent_id == str(opponent_id)]
+
+    def stats(self) -> dict:
+        return {
+            "teams_loaded": len(self.games),
+            "games": sum(len(g) for g in self.games.values()),
+            "upstream_fetches": self.fetches,
+            "last_refresh": self.last_refresh,
+        }
+
+
+def game_date(game: Game, fmt: str = "%Y-%m-%d") -> str:
+    """UTC date (or datetime, with ``fmt``) of a game's kickoff."""
+    if not game.start:
+        return ""
+    return datetime.fromtimestamp(game.start, timezone.utc).strftime(fmt)
+
+
+def game_summary(game: Game, team_name: str = None) -> dict:
+    """Compact dict for a game, as sent to the model."""
+    if game is None:
+        return None
+    summary = {
+        "date": game_date(game),
+        "opponent": game.opponent,
+        "home": game.home,
+        "status": game.status,
+        "venue": game.venue,
+    }
+    if team_name:
+        summary["team"] = team_name
+    if game.state != "pre":
+        summary["team_score"] = game.team_score
+        summary["opponent_score"] = game.opponent_score
+    return summary
+
+
+season_store = SeasonStore([espn_id for _, _, espn_id, _ in TEAMS])
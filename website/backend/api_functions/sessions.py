@@ -0,0 +1,51 @@
+"""
+Chat Sessions
+
+Recent turns of a conversation, kept in the shared cache backend under the
+"sessions" namespace so a client that reconnects (possibly to another
+worker, with the SQLite or Redis backend) keeps its history. Only the last
+SESSION_HISTORY messages are kept, and a session expires SESSION_TTL
+seconds after its last message.
+"""
+
+import uuid
+
+from .cache_backends import get_backend
+from .config import config
+
+
+class SessionStore:
+    """
+    Conversation history per session id.
+
+    Args:
+        max_messages (int): Messages (user and assistant) kept per session
+        ttl (float): Seconds a session lives after its last message
+    """
+
+    def __init__(self, max_messages: int, ttl: float):
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self.backend = get_backend("sessions")
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def history(self, session_id: str) -> list:
+        """Earlier {"role", "content"} turns, oldest first."""
+        hit, messages = self.backend.get(session_id)
+        return list(messages) if hit else []
+
+    def append(self, session_id: str, user_message: str, response: str):
+        """Add one exchange and trim the history."""
+        if self.max_messages <= 0:
+            return
+        messages = self.history(session_id) + [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": response},
+        ]
+        self.backend.set(session_id, messages[-self.max_messages:], self.ttl)
+
+
+session_store = SessionStore(max_messages=config.session_history, ttl=config.session_ttl)
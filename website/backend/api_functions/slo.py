@@ -0,0 +1,174 @@
+"""
+Chat Latency SLO
+
+Runs the AI pipeline for /api/chat on a worker pool and waits at most
+CHAT_SLO seconds for it. When the pipeline is late the client gets the best
+degraded answer available right away:
+
+1. "cached_answer": the pipeline's answer to the same message, kept for
+   CHAT_ANSWER_TTL seconds after every successful run
+2. "tool_data": a cached result of the tool the message most likely needs
+   (the speculation predictions), templated where a direct answer exists
+3. "simple": the keyword responder
+
+The late pipeline keeps running, so its tool results and final answer land
+in the caches for the next asker. It keeps its admission slot until it
+finishes, so load shedding still sees the real number of running pipelines.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from .ai_handler import compact_tool_result
+from .cache_backends import get_backend
+from .config import config
+from .direct_answers import render_direct_answer
+from .speculation import predict_tool_calls
+from .tool_cache import tool_cache
+from .tracing import span
+
+# Longest raw tool result shown in a degraded answer
+MAX_TOOL_DATA_CHARS = 1500
+
+
+def answer_key(message: str) -> str:
+    """Messages that differ only in case and whitespace share a cached answer."""
+    return " ".join(message.lower().split())
+
+
+def _tool_data_answer(message: str) -> dict:
+    """Answer from a cached result of the predicted tool call, or None."""
+    for name, args in predict_tool_calls(message):
+        hit, value = tool_cache.get(name, args)
+        if not hit:
+            continue
+        # Same rules as in the pipeline: enabled tools, and only when the template fits the question
+        reply = render_direct_answer(name, args, value, message)
+        if reply is None:
+            text = compact_tool_result(value)
+            if len(text) > MAX_TOOL_DATA_CHARS:
+                text = text[:MAX_TOOL_DATA_CHARS] + "..."
+            label = name.replace("get_", "").replace("_", " ")
+            reply = f"I'm still putting together a full answer. Here is the latest {label} data I have:\n{text}"
+        result = {"response": reply}
+        if name == "make_event" and isinstance(value, str) and value.startswith("https://"):
+            result["calendar_url"] = value
+        return result
+    return None
+
+
+class ChatSLO:
+    """
+    Deadline for the chat pipeline with degraded fallbacks.
+
+    Args:
+        slo (float): Seconds to wait for the pipeline (0 runs it inline with no deadline)
+        workers (int): Pipelines running at once; match the admission limit
+        answer_ttl (float): Seconds a pipeline answer stays available as a fallback
+    """
+
+    def __init__(self, slo: float, workers: int, answer_ttl: float):
+        self.slo = slo
+        self.answer_ttl = answer_ttl
+        self.answers = get_backend("answers")
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="chat")
+        self._lock = threading.Lock()
+        self._counts = {"on_time": 0, "degraded": 0, "late_completed": 0, "late_failed": 0}
+        self._sources = {}
+        self._on_time_seconds = 0.0
+
+    def _run(self, message: str, pipeline) -> dict:
+        result = pipeline(message)
+        if "error" not in result and result.get("response"):
+            answer = {"response": result["response"], "calendar_url": result.get("calendar_url")}
+            self.answers.set(answer_key(message), answer, self.answer_ttl)
+        return result
+
+    def _late_done(self, future, release):
+        try:
+            failed = future.exception() is not None or "error" in future.result()
+            with self._lock:
+                self._counts["late_failed" if failed else "late_completed"] += 1
+        finally:
+            release()
+
+    def degraded_answer(self, message: str, fallback) -> tuple:
+        """
+        Best answer available without waiting.
+
+        Args:
+            message (str): User's message
+            fallback (callable): Keyword responder, message -> {"response": ...}
+
+        Returns:
+            tuple: (result dict, source name)
+        """
+        hit, cached = self.answers.get(answer_key(message))
+        if hit:
+            return dict(cached), "cached_answer"
+        result = _tool_data_answer(message)
+        if result is not None:
+            return result, "tool_data"
+        return fallback(message), "simple"
+
+    def answer(self, message: str, pipeline, fallback, release, inline: bool = False) -> tuple:
+        """
+        Run the pipeline within the SLO, degrading when it is late.
+
+        ``release`` is called exactly once when the pipeline is done, which
+        for a late pipeline is after this method has returned.
+
+        Args:
+            message (str): User's message
+            pipeline (callable): AI pipeline, message -> result dict
+            fallback (callable): Keyword responder, message -> {"response": ...}
+            release (callable): Frees the request's admission slot
+            inline (bool, optional): Run in the calling thread without a deadline (used when profiling)
+
+        Returns:
+            tuple: (result dict, degraded source or None)
+        """
+        handed_off = False
+        started = time.monotonic()
+        try:
+            if inline or self.slo <= 0:
+                return self._run(message, pipeline), None
+
+            future = self._executor.submit(contextvars.copy_context().run, self._run, message, pipeline)
+            try:
+                result = future.result(timeout=self.slo)
+            except FutureTimeout:
+                handed_off = True
+                future.add_done_callback(lambda f: self._late_done(f, release))
+                with span("chat.degraded", slo_s=self.slo) as degraded_span:
+                    result, source = self.degraded_answer(message, fallback)
+                    degraded_span.set(source=source)
+                with self._lock:
+                    self._counts["degraded"] += 1
+                    self._sources[source] = self._sources.get(source, 0) + 1
+                return result, source
+
+            with self._lock:
+                self._counts["on_time"] += 1
+                self._on_time_seconds += time.monotonic() - started
+            return result, None
+        finally:
+            if not handed_off:
+                release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._counts["on_time"] + self._counts["degraded"]
+            return dict(
+                self._counts,
+                slo_s=self.slo,
+                degraded_rate=round(self._counts["degraded"] / total, 3) if total else 0.0,
+                by_source=dict(self._sources),
+                avg_on_time_s=round(self._on_time_seconds / self._counts["on_time"], 3) if self._counts["on_time"] else None,
+                cached_answers=self.answers.size(),
+            )
+
+
+chat_slo = ChatSLO(slo=config.chat_slo, workers=config.chat_max_inflight, answer_ttl=config.chat_answer_ttl)
@@ -0,0 +1,274 @@
+"""
+Speculative Tool Prefetch
+
+Predicts the tool call a message is likely to need (weather for a known
+place, a team's scores) and starts it in the background as soon as the
+request arrives, so the upstream call overlaps the first LLM call. If the
+model then asks for the same tool with matching arguments the prefetched
+result is used; otherwise the result is parked in the tool cache.
+
+Wasted speculation is tracked per tool over a rolling time window, and a
+tool stops being speculated while its waste rate is above the configured
+cap, so guessing wrong cannot burn upstream quota.
+"""
+
+import contextvars
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import config
+from .quota import priority
+from .teams import find_team_id
+from .tracing import span
+from .tool_cache import tool_cache, normalize_args
+
+# Places students ask about, mapped to the location string we geocode
+KNOWN_PLACES = {
+    "college station": "College Station, TX",
+    "bryan": "Bryan, TX",
+    "texas a&m": "College Station, TX",
+    "tamu": "College Station, TX",
+    "campus": "College Station, TX",
+    "austin": "Austin, TX",
+    "houston": "Houston, TX",
+    "dallas": "Dallas, TX",
+    "san antonio": "San Antonio, TX",
+    "fort worth": "Fort Worth, TX",
+    "waco": "Waco, TX",
+}
+
+_WEATHER_WORDS = ("weather", "rain", "temperature", "forecast", "sunny", "cold outside", "hot outside", "wear")
+_SPORTS_WORDS = ("game", "score", "play", "won", "win", "lose", "lost", "schedule", "football", "record")
+
+_PLACE_PATTERN = re.compile(
+    r"(?<![\w&])(" + "|".join(re.escape(p) for p in sorted(KNOWN_PLACES, key=len, reverse=True)) + r")(?![\w&])"
+)
+
+
+def predict_tool_calls(message: str) -> list:
+    """
+    Guess the tool calls a message will need.
+
+    Args:
+        message (str): User's message
+
+    Returns:
+        list: (tool_name, args) pairs, most likely first
+    """
+    lower = message.lower()
+    predictions = []
+
+    if any(word in lower for word in _WEATHER_WORDS):
+        match = _PLACE_PATTERN.search(lower)
+        if match:
+            predictions.append(("get_weather", {"location": KNOWN_PLACES[match.group(1)]}))
+
+    if any(word in lower for word in _SPORTS_WORDS):
+        team_id = find_team_id(message)
+        if team_id:
+            predictions.append(("get_college_team_data", {"team_id": team_id}))
+
+    return predictions
+
+
+def _place_key(value) -> str:
+    """Compare locations by their first component ("College Station, TX" ~ "college station")."""
+    return str(value).split(",")[0].strip().lower()
+
+
+def args_match(name: str, predicted: dict, actual: dict) -> bool:
+    """
+    Whether the model's arguments ask for the same thing we prefetched.
+
+    Args:
+        name (str): Tool name
+        predicted (dict): Arguments used for the speculative call
+        actual (dict): Arguments chosen by the model
+
+    Returns:
+        bool: True if the speculative result answers the actual call
+    """
+    predicted = normalize_args(predicted)
+    actual = normalize_args(actual)
+    if name == "get_weather":
+        return _place_key(predicted.get("location")) == _place_key(actual.get("location"))
+    if name == "get_college_team_data":
+        return str(predicted.get("team_id")) == str(actual.get("team_id"))
+    return predicted == actual
+
+
+class SpeculationHandle:
+    """Speculative calls started for one request."""
+
+    def __init__(self, calls: list):
+        # [(name, args, future)]
+        self.calls = calls
+        self.claimed = set()
+
+
+class Speculator:
+    """
+    Runs predicted tool calls on a small thread pool and accounts for waste.
+
+    Args:
+        max_workers (int, optional): Concurrent speculative calls
+        max_waste (float, optional): Waste rate above which a tool is paused
+        min_samples (int, optional): Outcomes needed before pausing a tool
+        window (float, optional): Seconds of outcomes kept per tool
+    """
+
+    def __init__(self, max_workers: int = 4, max_waste: float = 0.7,
+                 min_samples: int = 10, window: float = 600.0):
+        self.max_workers = max_workers
+        self.max_waste = max_waste
+        self.min_samples = min_samples
+        self.window = window
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._outcomes = {}
+        self._counts = {"started": 0, "used": 0, "wasted": 0, "skipped": 0}
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="speculate"
+                    )
+        return self._executor
+
+    def _recent(self, name: str) -> deque:
+        outcomes = self._outcomes.setdefault(name, deque())
+        cutoff = time.monotonic() - self.window
+        while outcomes and outcomes[0][0] < cutoff:
+            outcomes.popleft()
+        return outcomes
+
+    def waste_rate(self, name: str) -> float:
+        """Fraction of recent speculative calls for a tool that went unused."""
+        with self._lock:
+            outcomes = self._recent(name)
+            if not outcomes:
+                return 0.0
+            return sum(1 for _, used in outcomes if not used) / len(outcomes)
+
+    def _allowed(self, name: str) -> bool:
+        with self._lock:
+            outcomes = self._recent(name)
+            if len(outcomes) < self.min_samples:
+                return True
+            wasted = sum(1 for _, used in outcomes if not used)
+            return wasted / len(outcomes) <= self.max_waste
+
+    def _record(self, name: str, used: bool):
+        with self._lock:
+            self._recent(name).append((time.monotonic(), used))
+            self._counts["used" if used else "wasted"] += 1
+
+    def _run(self, name, func, args):
+        try:
+            # Guesses queue behind real tool calls for rate-limited upstreams
+            with priority("prefetch"), span("tool.prefetch", tool=name):
+                return func(**args)
+        finally:
+            self._slots.release()
+
+    def start(self, message: str, function_map) -> SpeculationHandle:
+        """
+        Start speculative calls for a message.
+
+        Calls are skipped when the tool is unknown, already cached, paused for
+        waste, or when every speculation slot is busy.
+
+        Args:
+            message (str): User's message
+            function_map (Mapping): Tool name -> function
+
+        Returns:
+            SpeculationHandle: Handle to pass to claim() and finish()
+        """
+        calls = []
+        for name, args in predict_tool_calls(message):
+            if name not in function_map or tool_cache.contains(name, args):
+                continue
+            if not self._allowed(name) or not self._slots.acquire(blocking=False):
+                with self._lock:
+                    self._counts["skipped"] += 1
+                continue
+            try:
+                # Run in a copy of the request's context so its spans join the trace
+                future = self._pool().submit(contextvars.copy_context().run, self._run, name, function_map[name], args)
+            except RuntimeError:
+                self._slots.release()
+                continue
+            with self._lock:
+                self._counts["started"] += 1
+            calls.append((name, args, future))
+        return SpeculationHandle(calls)
+
+    def claim(self, handle: SpeculationHandle, name: str, args: dict, timeout: float = None):
+        """
+        Use a speculative result for the model's tool call if one matches.
+
+        Args:
+            handle (SpeculationHandle): Handle from start()
+            name (str): Tool chosen by the model
+            args (dict): Arguments chosen by the model
+            timeout (float, optional): Seconds to wait for an in-flight call
+
+        Returns:
+            tuple: (hit, value)
+        """
+        for index, (spec_name, spec_args, future) in enumerate(handle.calls):
+            if index in handle.claimed or spec_name != name or not args_match(name, spec_args, args):
+                continue
+            try:
+                value = future.result(timeout=timeout)
+            except Exception:
+                continue
+            handle.claimed.add(index)
+            self._record(name, used=True)
+            return True, value
+        return False, None
+
+    def finish(self, handle: SpeculationHandle):
+        """
+        Settle a request's unclaimed speculative calls.
+
+        Each one counts as wasted, and its result is stored in the tool cache
+        under the tool's TTL policy when it completes so a follow-up question
+        can still use it.
+
+        Args:
+            handle (SpeculationHandle): Handle from start()
+        """
+        for index, (name, args, future) in enumerate(handle.calls):
+            if index in handle.claimed:
+                continue
+            self._record(name, used=False)
+            future.add_done_callback(lambda f, name=name, args=args: self._park(name, args, f))
+
+    @staticmethod
+    def _park(name: str, args: dict, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        tool_cache.put(name, args, future.result())
+
+    def stats(self) -> dict:
+        """Counters plus the current per-tool waste rate."""
+        with self._lock:
+            counts = dict(self._counts)
+            tools = list(self._outcomes)
+        counts["waste_rate"] = {name: round(self.waste_rate(name), 3) for name in tools}
+        counts["enabled"] = config.speculation_enabled
+        return counts
+
+
+speculator = Speculator(
+    max_workers=config.speculation_workers,
+    max_waste=config.speculation_max_waste,
+)
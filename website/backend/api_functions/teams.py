@@ -0,0 +1,133 @@
+"""
+Team reference data shared by the sports tool and the AI system prompt.
+
+Kept separate from ``sports`` so the prompt can be built without importing
+the tool module.
+"""
+
+import re
+
+# Team reference data for easy lookup
+TEAM_REFERENCE = """Format: School | Nickname | ESPN_ID | Abbreviation
+Ohio State        | Buckeyes       | 194  | OSU
+Indiana           | Hoosiers       | 84   | IND
+Texas A&M         | Aggies         | 245  | TAMU
+Alabama           | Crimson Tide   | 333  | ALA
+Georgia           | Bulldogs       | 61   | UGA
+Ole Miss          | Rebels         | 145  | MISS
+BYU               | Cougars        | 252  | BYU
+Texas Tech        | Red Raiders    | 2641 | TTU
+Oregon            | Ducks          | 2483 | ORE
+Notre Dame        | Fighting Irish | 87   | ND
+Tennessee         | Volunteers     | 2633 | TENN
+Miami             | Hurricanes     | 2390 | MIA
+Texas             | Longhorns      | 251  | TEX
+Virginia          | Cavaliers      | 258  | UVA
+Penn State        | Nittany Lions  | 213  | PSU
+Clemson           | Tigers         | 228  | CLEM
+Boise State       | Broncos        | 68   | BSU
+LSU               | Tigers         | 99   | LSU
+SMU               | Mustangs       | 2567 | SMU
+Iowa              | Hawkeyes       | 2294 | IOWA
+South Carolina    | Gamecocks      | 2579 | SC
+Missouri          | Tigers         | 142  | MIZZOU
+Kansas State      | Wildcats       | 2306 | KSU
+Louisville        | Cardinals      | 97   | LOU
+Colorado          | Buffaloes      | 38   | COLO
+## OTHER MAJOR PROGRAMS
+Michigan          | Wolverines     | 130  | MICH
+USC               | Trojans        | 30   | USC
+Oklahoma          | Sooners        | 201  | OU
+Nebraska          | Cornhuskers    | 158  | NEB
+Florida           | Gators         | 57   | FLA
+Florida State     | Seminoles      | 52   | FSU
+Auburn            | Tigers         | 2    | AUB
+Wisconsin         | Badgers        | 275  | WISC
+UCLA              | Bruins         | 26   | UCLA
+Michigan State    | Spartans       | 127  | MSU
+Washington        | Huskies        | 264  | WASH
+Stanford          | Cardinal       | 24   | STAN
+Arkansas          | Razorbacks     | 8    | ARK
+Oklahoma State    | Cowboys        | 197  | OKST
+TCU               | Horned Frogs   | 2628 | TCU
+Baylor            | Bears          | 239  | BAY
+Utah              | Utes           | 254  | UTAH
+Oregon State      | Beavers        | 204  | ORST
+Arizona State     | Sun Devils     | 9    | ASU
+Arizona           | Wildcats       | 12   | ARIZ
+West Virginia     | Mountaineers   | 277  | WVU
+Iowa State        | Cyclones       | 66   | ISU
+Pittsburgh        | Panthers       | 221  | PITT
+NC State          | Wolfpack       | 152  | NCST
+North Carolina    | Tar Heels      | 153  | UNC
+Duke              | Blue Devils    | 150  | DUKE
+Virginia Tech     | Hokies         | 259  | VT
+Georgia Tech      | Yellow Jackets | 59   | GT
+Kentucky          | Wildcats       | 96   | UK
+Vanderbilt        | Commodores     | 238  | VANDY
+Mississippi State | Bulldogs       | 344  | MSST
+Texas State       | Bobcats        | 326  | TXST
+UCF               | Knights        | 2116 | UCF
+Houston           | Cougars        | 248  | HOU
+Cincinnati        | Bearcats       | 2132 | CIN"""
+
+
+def _parse_reference(reference: str) -> list:
+    """Parse the reference table into (school, nickname, espn_id, abbreviation) rows."""
+    rows = []
+    for line in reference.splitlines()[1:]:
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 4:
+            rows.append(tuple(parts))
+    return rows
+
+
+TEAMS = _parse_reference(TEAM_REFERENCE)
+
+
+_AMBIGUOUS_ABBREVIATIONS = {"miss", "wash", "ore", "ind", "stan", "hou", "cin"}
+
+
+def _build_aliases(teams: list) -> dict:
+    """
+    Map lowercase school names, nicknames and abbreviations to ESPN ids.
+
+    Aliases shared by several schools ("Tigers", "Wildcats") are dropped so
+    a lookup never guesses between teams, as are short abbreviations that
+    read like ordinary words.
+    """
+    owners = {}
+    for school, nickname, espn_id, abbreviation in teams:
+        names = {school, nickname, f"{school} {nickname}"}
+        if len(abbreviation) > 2 and abbreviation.lower() not in _AMBIGUOUS_ABBREVIATIONS:
+            names.add(abbreviation)
+        for alias in names:
+            owners.setdefault(alias.lower(), set()).add(espn_id)
+    aliases = {alias: ids.pop() for alias, ids in owners.items() if len(ids) == 1}
+    # Common campus nicknames that are not in the table
+    aliases.setdefault("aggies", "245")
+    aliases.setdefault("a&m", "245")
+    aliases.setdefault("longhorns", "251")
+    return aliases
+
+
+TEAM_ALIASES = _build_aliases(TEAMS)
+
+# Longest aliases first so "texas a&m" wins over "texas"
+_ALIAS_PATTERN = re.compile(
+    r"(?<![\w&])(" + "|".join(re.escape(a) for a in sorted(TEAM_ALIASES, key=len, reverse=True)) + r")(?![\w&])"
+)
+
+
+def find_team_id(text: str) -> str:
+    """
+    Find the first unambiguous team mentioned in free text.
+
+    Args:
+        text (str): User message or team name
+
+    Returns:
+        str: ESPN team id, or None if no known team is mentioned
+    """
+    match = _ALIAS_PATTERN.search(text.lower())
+    return TEAM_ALIASES[match.group(1)] if match else None
@@ -0,0 +1,224 @@
+"""
+Tool Result Cache
+
+Stores tool results keyed by tool name plus normalized arguments so the
+same call made seconds apart (by different users, by speculative prefetch,
+or by a follow-up question) is answered without touching the upstream.
+
+Each tool has a TTL policy; tools without a policy are never cached.
+Storage is delegated to the backend chosen by CACHE_BACKEND (see
+cache_backends), which bounds the size with LRU eviction; hit/miss
+counters are kept per tool.
+"""
+
+import atexit
+import json
+import threading
+import time
+from datetime import datetime
+
+from .cache_backends import get_backend, restore_shared, snapshot_shared
+from .config import config
+
+# Never expires (still subject to LRU eviction)
+FOREVER = None
+
+
+def _deals_ttl(args: dict, result) -> float:
+    """Never serve a deal from the cache after it expires."""
+    ttl = 1800
+    if isinstance(result, dict):
+        for deal in result.get("deals", []):
+            expires = deal.get("expires_at")
+            if expires:
+                try:
+                    remaining = datetime.fromisoformat(expires.replace("Z", "+00:00")).timestamp() - time.time()
+                except ValueError:
+                    continue
+                ttl = min(ttl, remaining)
+    # 0 means "do not cache"
+    return max(ttl, 0)
+
+
+def _events_near_ttl(args: dict, result) -> float:
+    """Events with a failed forecast are not cached; the events themselves stay in the catalog."""
+    if isinstance(result, dict) and result.get("forecast_error"):
+        return 0
+    return 900
+
+
+# Tool name -> TTL in seconds, FOREVER, or callable(args, result) -> TTL
+# get_college_team_data and get_team_season_info have no policy: the season
+# store answers them from memory and rechecks live games every minute, which a
+# cached copy would hide. make_event has none either: building its URL is
+# cheap, and normalized keys would hand one event's link (with its casing and
+# spacing) to another that differs only in those.
+TTL_POLICIES = {
+    "get_weather": 600,
+    "get_weather_multi": 600,
+    "get_weather_forecast": 1800,
+    "get_events": 900,
+    "get_events_near": _events_near_ttl,
+    "get_weather_for_game": 1800,
+    "get_rentals": 3600,
+    "get_rental_summary": 3600,
+    "get_deals": _deals_ttl,
+}
+
+
+def normalize_args(args: dict) -> dict:
+    """
+    Canonical form of tool arguments for comparison and cache keys.
+
+    Strings are trimmed, lowercased and whitespace-collapsed, integral
+    floats become ints and None values are dropped, so "College Station "
+    and "college station" map to the same entry.
+
+    Args:
+        args (dict): Tool arguments as sent by the model
+
+    Returns:
+        dict: Normalized arguments
+    """
+    normalized = {}
+    for key, value in (args or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = " ".join(value.lower().split())
+        elif isinstance(value, float) and value.is_integer():
+            value = int(value)
+        normalized[key] = value
+    return normalized
+
+
+def make_key(name: str, args: dict) -> str:
+    """Cache key for a tool call."""
+    return name + ":" + json.dumps(normalize_args(args), sort_keys=True, default=str)
+
+
+def is_error_result(value) -> bool:
+    """Whether a tool result is one of the tools' error shapes (never cached)."""
+    if isinstance(value, dict):
+        return "error" in value
+    if isinstance(value, str):
+        return value.startswith(("Error", "Failed"))
+    return value is None
+
+
+def ttl_for(name: str, args: dict, value):
+    """
+    TTL for a tool result under its policy.
+
+    Returns:
+        float: Seconds, FOREVER, or 0 if the tool is not cacheable
+    """
+    if name not in TTL_POLICIES:
+        return 0
+    policy = TTL_POLICIES[name]
+    return policy(args, value) if callable(policy) else policy
+
+
+class ToolCache:
+    """
+    Tool results stored in a pluggable cache backend, with per-tool counters.
+
+    The backend (memory LRU, shared SQLite file or Redis) bounds the size and
+    handles expiry; this class applies the TTL policies and keeps hit/miss
+    statistics for the current worker.
+
+    Args:
+        backend (CacheBackend): Where entries are stored
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str, counter: str):
+        with self._lock:
+            counters = self._counters.setdefault(name, {"hits": 0, "misses": 0, "stores": 0})
+            counters[counter] += 1
+
+    def get(self, name: str, args: dict):
+        """
+        Look up a cached tool result.
+
+        Args:
+            name (str): Tool name
+            args (dict): Tool arguments
+
+        Returns:
+            tuple: (hit, value)
+        """
+        hit, value = self.backend.get(make_key(name, args))
+        self._count(name, "hits" if hit else "misses")
+        return hit, value
+
+    def contains(self, name: str, args: dict) -> bool:
+        """Whether a live entry exists, without touching the counters."""
+        return self.backend.get(make_key(name, args))[0]
+
+    def put(self, name: str, args: dict, value, ttl=0):
+        """
+        Store a tool result; error results and uncacheable tools are ignored.
+
+        Args:
+            name (str): Tool name
+            args (dict): Tool arguments
+            value: Tool result
+            ttl (float, optional): Seconds to keep the entry; defaults to the tool's policy
+        """
+        if is_error_result(value):
+            return
+        if ttl == 0:
+            ttl = ttl_for(name, args, value)
+            if ttl == 0:
+                return
+        self.backend.set(make_key(name, args), value, ttl)
+        self._count(name, "stores")
+
+    def call(self, name: str, func, args: dict):
+        """
+        Return the cached result for a tool call, computing and storing it on a miss.
+
+        Args:
+            name (str): Tool name
+            func (callable): Tool function
+            args (dict): Tool arguments
+
+        Returns:
+            Tool result
+        """
+        hit, value = self.get(name, args)
+        if hit:
+            return value
+        value = func(**args)
+        self.put(name, args, value)
+        return value
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        """Backend size (None on Redis) and evictions plus per-tool hit/miss counters with hit rate."""
+        with self._lock:
+            by_tool = {}
+            for name, counters in self._counters.items():
+                lookups = counters["hits"] + counters["misses"]
+                by_tool[name] = dict(counters, hit_rate=round(counters["hits"] / lookups, 3) if lookups else None)
+        return {
+            "backend": config.cache_backend,
+            "entries": self.backend.size(),
+            "evictions": getattr(self.backend, "evictions", 0),
+            "by_tool": by_tool,
+        }
+
+
+tool_cache = ToolCache(get_backend("tools"))
+
+# Entries survive restarts: load the last snapshot on boot, write one on shutdown
+restore_shared()
+atexit.register(snapshot_shared)
@@ -0,0 +1,265 @@
+"""
+Request Tracing
+
+Every /api/chat request gets a trace: a tree of timed spans covering each
+OpenRouter call (with token counts), each tool invocation, each upstream
+HTTP request (host, status, bytes, retries, quota wait) and each cache
+lookup. The trace id is returned to the client, so one slow answer can be
+reconstructed afterwards.
+
+Finished traces are written off the request path, one OTLP/JSON
+``ExportTraceServiceRequest`` per line, to TRACE_PATH and/or POSTed to an
+OTLP/HTTP collector at TRACE_OTLP_ENDPOINT. Requests slower than
+TRACE_SLOW_MS print their whole span tree.
+
+Outside a trace (background threads, scripts) ``span`` costs one context
+variable lookup and records nothing.
+"""
+
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+from .config import config
+
+# Rotate the span file once it grows past this many bytes
+MAX_FILE_BYTES = 50 * 1024 * 1024
+MAX_ATTRIBUTE_CHARS = 512
+
+_current = contextvars.ContextVar("trace_span", default=None)
+
+
+class Span:
+    """One timed operation in a trace."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start", "end", "attributes", "error")
+
+    def __init__(self, trace, span_id: str, parent_id: str, name: str, attributes: dict):
+        self.trace = trace
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self.end = None
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes):
+        """Add or update attributes."""
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time()) - self.start) * 1000
+
+
+class _NoopSpan:
+    """Stand-in yielded when no trace is active."""
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """All spans of one request."""
+
+    __slots__ = ("trace_id", "spans", "_lock")
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def new_span(self, name: str, parent_id: str, attributes: dict) -> Span:
+        span_ = Span(self, os.urandom(8).hex(), parent_id, name, attributes)
+        with self._lock:
+            self.spans.append(span_)
+        return span_
+
+    @property
+    def root(self) -> Span:
+        return self.spans[0]
+
+
+@contextmanager
+def start_trace(name: str, **attributes):
+    """
+    Trace a request; the yielded root span's ``trace.trace_id`` identifies it.
+
+    Args:
+        name (str): Root span name, e.g. "POST /api/chat"
+        **attributes: Root span attributes
+    """
+    trace = Trace()
+    root = trace.new_span(name, None, attributes)
+    token = _current.set(root)
+    try:
+        yield root
+    except Exception as e:
+        root.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        root.end = time.time()
+        _current.reset(token)
+        _finish(trace)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time a block as a child of the current span.
+
+    Args:
+        name (str): Span name, e.g. "tool" or "http"
+        **attributes: Span attributes (more can be added with .set())
+    """
+    parent = _current.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    span_ = parent.trace.new_span(name, parent.span_id, attributes)
+    token = _current.set(span_)
+    try:
+        yield span_
+    except Exception as e:
+        span_.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span_.end = time.time()
+        _current.reset(token)
+
+
+def current_trace_id() -> str:
+    """Id of the active trace, or None."""
+    current = _current.get()
+    return current.trace.trace_id if current is not None else None
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)[:MAX_ATTRIBUTE_CHARS]}
+
+
+def to_otlp(trace: Trace) -> dict:
+    """OTLP/JSON ExportTraceServiceRequest for one trace."""
+    spans = []
+    for span_ in list(trace.spans):
+        end = span_.end or time.time()
+        entry = {
+            "traceId": trace.trace_id,
+            "spanId": span_.span_id,
+            "name": span_.name,
+            "kind": 2 if span_.parent_id is None else 1,
+            "startTimeUnixNano": str(int(span_.start * 1e9)),
+            "endTimeUnixNano": str(int(end * 1e9)),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span_.attributes.items() if v is not None],
+            "status": {"code": 2, "message": span_.error} if span_.error else {"code": 1},
+        }
+        if span_.parent_id:
+            entry["parentSpanId"] = span_.parent_id
+        spans.append(entry)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "campus-compass-backend"}}]},
+            "scopeSpans": [{"scope": {"name": "api_functions.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+def format_tree(trace: Trace) -> str:
+    """Indented span tree with durations and attributes."""
+    children = {}
+    for span_ in trace.spans:
+        children.setdefault(span_.parent_id, []).append(span_)
+
+    lines = []
+
+    def walk(span_, depth):
+        attributes = " ".join(f"{k}={v}" for k, v in span_.attributes.items() if v is not None)
+        error = f" ERROR={span_.error}" if span_.error else ""
+        lines.append(f"{'  ' * depth}{span_.name} {span_.duration_ms:.0f}ms {attributes}{error}".rstrip())
+        for child in sorted(children.get(span_.span_id, ()), key=lambda s: s.start):
+            walk(child, depth + 1)
+
+    walk(trace.root, 0)
+    return "\n".join(lines)
+
+
+class SpanExporter:
+    """
+    Writes finished traces from a background thread.
+
+    Args:
+        path (str, optional): JSON-lines file (rotated to ``path + ".1"``)
+        endpoint (str, optional): OTLP/HTTP traces URL, e.g. http://collector:4318/v1/traces
+    """
+
+    def __init__(self, path: str = None, endpoint: str = None, max_pending: int = 1000):
+        self.path = path
+        self.endpoint = endpoint
+        self.exported = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path or self.endpoint)
+
+    def export(self, trace: Trace):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait(to_otlp(trace))
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self, payload: dict):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > MAX_FILE_BYTES:
+            os.replace(self.path, self.path + ".1")
+        with open(self.path, "a") as f:
+            f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+    def _run(self):
+        while True:
+            payload = self._queue.get()
+            try:
+                if self.path:
+                    self._write(payload)
+                if self.endpoint:
+                    requests.post(self.endpoint, json=payload, timeout=5)
+                self.exported += 1
+            except (OSError, requests.exceptions.RequestException) as e:
+                print(f"Trace export failed: {e}")
+
+    def stats(self) -> dict:
+        return {"exported": self.exported, "dropped": self.dropped, "pending": self._queue.qsize()}
+
+
+exporter = SpanExporter(path=config.trace_path, endpoint=config.trace_otlp_endpoint)
+
+
+def _finish(trace: Trace):
+    root = trace.root
+    if config.trace_slow_ms and root.duration_ms >= config.trace_slow_ms:
+        print(f"Slow request ({root.duration_ms:.0f}ms) trace={trace.trace_id}\n{format_tree(trace)}")
+    exporter.export(trace)
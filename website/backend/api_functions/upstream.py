@@ -0,0 +1,92 @@
+"""
+Upstream HTTP
+
+The single path every tool uses to reach an external API. Each request
+first waits for the upstream's quota (see quota.py); a 429 response is
+retried after the Retry-After delay as long as it fits in the wait
+budget, so a brief burst slows a chat turn down instead of failing it.
+
+With CASSETTE_MODE set, requests are also recorded to or replayed from a
+cassette (see cassette.py). Replayed requests skip the quota and the 429
+backoff: nothing reaches the upstream, and replay stays fast and
+deterministic. Streamed responses (``stream=True``) are returned unread;
+recording one buffers it first.
+"""
+
+import time
+from urllib.parse import urlparse
+
+import requests
+
+from .cassette import Cassette
+from .config import config
+from .quota import QuotaExceeded, quota_manager
+from .tracing import span
+
+# 429 retries per request, and the longest Retry-After honored
+MAX_RETRIES = 2
+MAX_RETRY_AFTER = 5.0
+
+cassette = None
+if config.cassette_mode in ("record", "replay"):
+    cassette = Cassette(config.cassette_path, config.cassette_mode, config.cassette_time_scale)
+
+
+def _retry_after(response) -> float:
+    value = response.headers.get("Retry-After", "")
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return 1.0
+
+
+def fetch(upstream: str, url: str, method: str = "GET", **kwargs) -> requests.Response:
+    """
+    Send a request to an upstream within its quota.
+
+    Args:
+        upstream (str): Upstream name, e.g. "nominatim" or "zillow"
+        url (str): Request URL
+        method (str, optional): HTTP method (default: "GET")
+        **kwargs: Passed to requests (params, headers, json, timeout, ...)
+
+    Returns:
+        requests.Response: The final response (possibly still a 429)
+
+    Raises:
+        QuotaExceeded: The upstream's budget is spent
+        requests.exceptions.RequestException: The request itself failed
+    """
+    kwargs.setdefault("timeout", config.upstream_timeout)
+    streaming = kwargs.get("stream", False)
+    replaying = cassette is not None and cassette.mode == "replay"
+    with span("http", upstream=upstream, method=method, host=urlparse(url).hostname,
+              cassette=cassette.mode if cassette else None) as http_span:
+        quota_wait = 0.0
+        for attempt in range(MAX_RETRIES + 1):
+            if replaying:
+                response = cassette.replay(method, url, kwargs)
+            else:
+                started = time.monotonic()
+                quota_manager.acquire(upstream)
+                quota_wait += time.monotonic() - started
+                sent = time.monotonic()
+                response = requests.request(method, url, **kwargs)
+                if cassette is not None:
+                    cassette.record(upstream, method, url, kwargs, response, time.monotonic() - sent)
+            http_span.set(status=response.status_code, retries=attempt,
+                          quota_wait_ms=round(quota_wait * 1000, 1))
+            if not streaming:
+                http_span.set(bytes=len(response.content))
+            if response.status_code != 429 or attempt == MAX_RETRIES:
+                return response
+            delay = _retry_after(response)
+            if delay > MAX_RETRY_AFTER:
+                return response
+            if replaying:
+                # The recorded retry follows in the cassette
+                continue
+            quota_manager.record_429(upstream)
+            print(f"{upstream} returned 429; retrying in {delay:.1f}s")
+            time.sleep(delay)
+        return response
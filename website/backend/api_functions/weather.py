@@ -1,9 +1,97 @@
-import requests
-import os
-from dotenv import load_dotenv
-from urllib.parse import quote_plus
+from .cache_backends import get_backend
+from .geocoding import geocode, snap
+from .upstream import fetch
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+
+# Current conditions per grid cell, shared by single and batched lookups
+CURRENT_WEATHER_TTL = 600
+
+_cells = get_backend("weather")
+
+
+def _fetch_current(cells: list) -> list:
+    """
+    Fetch current weather for several grid cells in one Open-Meteo request.
+
+    Args:
+        cells (list): (lat, lon) tuples
+
+    Returns:
+        list: One Open-Meteo response object per cell, in the same order
+    """
+    response = fetch(
+        "open-meteo",
+        OPEN_METEO_URL,
+        params={
+            "latitude": ",".join(str(lat) for lat, _ in cells),
+            "longitude": ",".join(str(lon) for _, lon in cells),
+            "current_weather": "true",
+        }
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to get weather: {response.text}")
+    data = response.json()
+    # Open-Meteo returns a single object for one coordinate and a list for several
+    return data if isinstance(data, list) else [data]
+
+
+def get_weather_batch(locations: list) -> list:
+    """
+    Get current weather for several locations with at most one Open-Meteo call.
+
+    Locations are geocoded through the geocode cache and snapped to the
+    weather grid, so nearby places and repeated names share one cell. Cells
+    already cached are not refetched; the rest are requested together.
+
+    Args:
+        locations (list): Location names
+
+    Returns:
+        list: Per-location dicts in input order, each with "location" and
+            either "weather" (the Open-Meteo response) or "error"
+    """
+    results = [{"location": location} for location in locations]
+    cell_of = {}
+    missing = []
+
+    for index, location in enumerate(locations):
+        try:
+            place = geocode(location)
+        except Exception as e:
+            results[index]["error"] = f"Geocoding failed: {str(e)}"
+            continue
+        if place is None:
+            results[index]["error"] = "Location not found"
+            continue
+
+        cell = snap(place["lat"], place["lon"])
+        cell_of[index] = cell
+        if cell not in missing:
+            hit, weather = _cells.get(f"{cell[0]},{cell[1]}")
+            if hit:
+                results[index]["weather"] = weather
+            else:
+                missing.append(cell)
+
+    fetched = {}
+    if missing:
+        print(f"Fetching weather for {len(missing)} grid cell(s)")
+        try:
+            for cell, weather in zip(missing, _fetch_current(missing)):
+                fetched[cell] = weather
+                _cells.set(f"{cell[0]},{cell[1]}", weather, CURRENT_WEATHER_TTL)
+        except Exception as e:
+            for index, cell in cell_of.items():
+                if cell in missing:
+                    results[index]["error"] = str(e)
+
+    for index, cell in cell_of.items():
+        if "weather" not in results[index] and cell in fetched:
+            results[index]["weather"] = fetched[cell]
+
+    return results
 
-load_dotenv()
 
 def get_weather(location: str) -> str:
     """
@@ -15,23 +103,31 @@ def get_weather(location: str) -> str:
     Returns:
         str: Weather data as a string, or error message if failed
     """
-    query = quote_plus(location)
-    url = f"https://nominatim.openstreetmap.org/search?q={query}&format=json&limit=1"
-    response = requests.get(url, headers={"User-Agent": "geo-coord-fetcher"})
-    data = response.json()
-
-    if not data:
-        return "Error: Location not found"
+    result = get_weather_batch([location])[0]
+    if "error" in result:
+        if result["error"] == "Location not found":
+            return "Error: Location not found"
+        return result["error"] if result["error"].startswith("Failed") else f"Error: {result['error']}"
+    return str(result["weather"])
 
-    lat = float(data[0]["lat"])
-    lon = float(data[0]["lon"])
 
-    print(f"Fetching weather for {location} (lat={lat}, lon={lon})")
-    weather_url = f'https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current_weather=true'
-    weather_response = requests.get(weather_url)
+def get_weather_multi(locations: list) -> list:
+    """
+    Compare current weather across several locations.
 
-    if weather_response.status_code != 200:
-        return f"Failed to get weather: {weather_response.text}"
+    Args:
+        locations (list): Location names (e.g., ['Austin', 'Houston', 'College Station'])
 
-    weather_data = weather_response.json()
-    return str(weather_data)
+    Returns:
+        list: Per-location current conditions in input order
+    """
+    compact = []
+    for result in get_weather_batch(locations):
+        if "error" in result:
+            compact.append({"location": result["location"], "error": result["error"]})
+        else:
+            compact.append({
+                "location": result["location"],
+                "current_weather": result["weather"].get("current_weather", {}),
+            })
+    return compact
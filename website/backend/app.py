@@ -1,18 +1,31 @@
 import os
 import sys
-from flask import Flask, request, jsonify
+from functools import wraps
+from flask import Flask, request, jsonify, g, send_file
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import json
 from datetime import datetime
 
-# Import the modular API functions
-from api_functions import (
-    get_weather, get_deals, get_college_team_data, make_event,
-    get_rentals, get_events, get_ai_response, get_default_tools, FUNCTION_MAP
-)
+# Import the modular API functions. Tool modules and runtime singletons
+# (router, caches, stores, admission, tracing) are imported where they are
+# used, so importing app stays cheap and starts no background work.
+import api_functions
+from api_functions import FUNCTION_MAP
+from api_functions.config import config
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend requests
+if config.trusted_proxy_hops:
+    # remote_addr becomes the address the trusted proxy saw, not whatever the client put in X-Forwarded-For
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=config.trusted_proxy_hops)
+
+def start_background_work():
+    """Start per-process background loading (gunicorn post_fork hook, ws_server and __main__)"""
+    if config.season_preload:
+        # Load every team's season in the background so /api/health is not delayed
+        from api_functions.season import season_store
+        season_store.start()
 
 # Mock data for college-specific responses
 COLLEGE_DATA = {
@@ -42,10 +55,10 @@ def process_student_query_ai(message):
     """AI-powered response system using OpenRouter and modular APIs"""
     try:
         # Get the default tools and function mapping
-        tools = get_default_tools()
+        tools = api_functions.get_default_tools()
 
         # Get AI response with access to all API functions
-        result = get_ai_response(
+        result = api_functions.get_ai_response(
             user_message=message,
             tools=tools,
             function_map=FUNCTION_MAP
@@ -112,14 +125,29 @@ def process_student_query_simple(message):
                 "• Email assistance\n"
                 "What would you like to know about?")}
 
+def require_admin(view):
+    """Allow only requests carrying X-Admin-Token; admin routes 404 when ADMIN_TOKEN is unset"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not config.admin_token:
+            return jsonify({"error": "Not found", "status": "error"}), 404
+        if request.headers.get('X-Admin-Token') != config.admin_token:
+            return jsonify({"error": "Unauthorized", "status": "error"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
 @app.route('/', methods=['GET'])
 def home():
     return jsonify({
         "message": "College Assistant Backend API",
         "status": "running",
         "endpoints": {
-            "/api/chat": "POST - Send chat messages",
-            "/api/health": "GET - Health check"
+            "/api/chat": "POST - Send chat messages ({\"async\": true} returns a job id)",
+            "/api/jobs/<id>": "GET - Async chat job status and result (?wait=seconds)",
+            "/api/health": "GET - Health check",
+            "/api/metrics": "GET - Runtime statistics (X-Admin-Token)",
+            "/api/admin/profiles": "GET - Saved request profiles (X-Admin-Token)",
+            "/api/admin/usage": "GET - Token and cost accounting (X-Admin-Token)"
         }
     })
 
@@ -131,8 +159,98 @@ def health_check():
         "service": "College Assistant Backend"
     })
 
+@app.route('/api/metrics', methods=['GET'])
+@require_admin
+def metrics():
+    """Runtime statistics for dashboards and autoscaling (per-client, cost and quota data: admin only)"""
+    from api_functions import direct_answers, upstream
+    from api_functions.admission import admission
+    from api_functions.deal_catalog import deal_catalog
+    from api_functions.event_catalog import event_catalog
+    from api_functions.jobs import job_store
+    from api_functions.model_router import router
+    from api_functions.profiler import profiler
+    from api_functions.quota import quota_manager
+    from api_functions.rental_index import listing_store
+    from api_functions.season import season_store
+    from api_functions.slo import chat_slo
+    from api_functions.speculation import speculator
+    from api_functions.tool_cache import tool_cache
+    from api_functions.tracing import exporter
+    return jsonify({
+        "models": router.stats(),
+        "speculation": speculator.stats(),
+        "direct_answers": direct_answers.stats(),
+        "tool_cache": tool_cache.stats(),
+        "season": season_store.stats(),
+        "rentals": listing_store.stats(),
+        "events": event_catalog.stats(),
+        "deals": deal_catalog.stats(),
+        "quota": quota_manager.stats(),
+        "admission": admission.stats(),
+        "tracing": exporter.stats(),
+        "profiler": profiler.stats(),
+        "slo": chat_slo.stats(),
+        "jobs": job_store.stats(),
+        "cassette": upstream.cassette.stats() if upstream.cassette else None,
+        "timestamp": datetime.now().isoformat()
+    })
+
+def client_id():
+    """Client address for rate limiting (ProxyFix has applied the trusted X-Forwarded-For hop)"""
+    return request.remote_addr or 'unknown'
+
+def shed_response(message, rejection):
+    """Answer a request that was not admitted: simple answer when overloaded, else 429"""
+    if rejection.reason == "overloaded" and config.chat_shed_mode == "simple":
+        result = process_student_query_simple(message)
+        return jsonify({
+            "response": result["response"],
+            "timestamp": datetime.now().isoformat(),
+            "status": "success",
+            "degraded": True
+        })
+
+    response = jsonify({
+        "error": "Too many requests, please try again shortly" if rejection.reason == "rate_limited"
+                 else "The assistant is busy right now, please try again shortly",
+        "status": "error",
+        "retry_after": rejection.retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(rejection.retry_after)
+    return response
+
+@app.after_request
+def add_trace_id(response):
+    """Return the request's trace id in a header and in JSON bodies"""
+    trace_id = g.get('trace_id')
+    if trace_id:
+        response.headers['X-Trace-Id'] = trace_id
+        body = response.get_json(silent=True) if response.is_json else None
+        if isinstance(body, dict):
+            body['trace_id'] = trace_id
+            response.set_data(json.dumps(body))
+    return response
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
+    from api_functions.profiler import profiler
+    from api_functions.tracing import start_trace
+    with start_trace("POST /api/chat", client=client_id()) as root:
+        g.trace_id = root.trace.trace_id
+        if profiler.wanted(request.headers):
+            with profiler.profile("chat", trace_id=g.trace_id, path=request.path) as details:
+                response = app.make_response(handle_chat(profiling=True))
+                details["status"] = response.status_code
+        else:
+            response = app.make_response(handle_chat())
+        root.set(status=response.status_code)
+        return response
+
+def handle_chat(profiling=False):
+    from api_functions.admission import admission
+    from api_functions.slo import chat_slo
     try:
         data = request.get_json()
 
@@ -144,9 +262,20 @@ def chat():
 
         user_message = data['message']
 
-        # Try AI-powered response first, fallback to simple if needed
+        if data.get('async') or 'respond-async' in request.headers.get('Prefer', ''):
+            return submit_chat_job(user_message)
+
+        rejection = admission.admit(client_id())
+        if rejection:
+            return shed_response(user_message, rejection)
+
+        # Try AI-powered response first, fallback to simple if needed.
+        # chat_slo releases the admission slot once the pipeline is done,
+        # which for a late pipeline is after the degraded answer is sent.
         try:
-            result = process_student_query_ai(user_message)
+            result, degraded = chat_slo.answer(user_message, process_student_query_ai,
+                                               process_student_query_simple, release=admission.release,
+                                               inline=profiling)
 
             # Check if AI returned an error
             if "error" in result:
@@ -159,6 +288,10 @@ def chat():
                 "status": "success"
             }
 
+            if degraded:
+                response_data["degraded"] = True
+                response_data["degraded_source"] = degraded
+
             # Add calendar URL if present
             if result.get("calendar_url"):
                 response_data["calendar_url"] = result["calendar_url"]
@@ -181,6 +314,103 @@ def chat():
             "status": "error"
         }), 500
 
+def answer_chat_job(message):
+    """Answer a chat message in the background; the return value is the job result"""
+    result = process_student_query_ai(message)
+    if "error" in result:
+        print(f"AI error: {result['error']}")
+        result = process_student_query_simple(message)
+
+    response_data = {
+        "response": result.get("response", "I couldn't process your request."),
+        "timestamp": datetime.now().isoformat(),
+        "status": "success"
+    }
+    if result.get("calendar_url"):
+        response_data["calendar_url"] = result["calendar_url"]
+    return response_data
+
+def submit_chat_job(message):
+    """Queue a chat message as a background job and return its id (202)"""
+    from api_functions.admission import admission
+    from api_functions.jobs import job_store
+    rejection = admission.rate_limit(client_id())
+    if rejection:
+        return shed_response(message, rejection)
+
+    if not job_store.available:
+        # Job records are private to this worker and a poll may land on another: answer now
+        return jsonify(answer_chat_job(message))
+
+    job_id = job_store.submit("chat", answer_chat_job, message)
+    if job_id is None:
+        response = jsonify({
+            "error": "Too many background requests, please try again shortly",
+            "status": "error",
+            "retry_after": 5
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+
+    response = jsonify({
+        "job_id": job_id,
+        "status": "pending",
+        "poll": f"/api/jobs/{job_id}"
+    })
+    response.status_code = 202
+    response.headers['Location'] = f"/api/jobs/{job_id}"
+    return response
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a background job; ?wait=N holds the request up to N seconds for the result"""
+    try:
+        wait = float(request.args.get('wait', 0))
+    except ValueError:
+        return jsonify({"error": "wait must be a number of seconds", "status": "error"}), 400
+
+    from api_functions.jobs import job_store
+    job = job_store.get(job_id, wait=wait)
+    if job is None:
+        return jsonify({"error": "Job not found or expired", "status": "error"}), 404
+    return jsonify(job)
+
+@app.route('/api/admin/profiles', methods=['GET'])
+@require_admin
+def list_profiles():
+    """Saved request profiles, newest first"""
+    from api_functions.profiler import profiler
+    return jsonify({"profiles": profiler.list(), "status": "success"})
+
+@app.route('/api/admin/profiles/<name>', methods=['GET'])
+@require_admin
+def get_profile(name):
+    """One profile: pstats text report (?sort=tottime&limit=100) or the raw .prof file (?format=raw)"""
+    from api_functions.profiler import profiler
+    if request.args.get('format') == 'raw':
+        path = profiler.path(name)
+        if path is None:
+            return jsonify({"error": "Profile not found", "status": "error"}), 404
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                         download_name=name + '.prof')
+
+    try:
+        report = profiler.render(name, sort=request.args.get('sort', 'cumulative'),
+                                 limit=int(request.args.get('limit', 60)))
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": f"Bad report options: {str(e)}", "status": "error"}), 400
+    if report is None:
+        return jsonify({"error": "Profile not found", "status": "error"}), 404
+    return app.response_class(report, mimetype='text/plain')
+
+@app.route('/api/admin/usage', methods=['GET'])
+@require_admin
+def usage():
+    """Token and cost aggregates by model, stage and tool over recent requests"""
+    from api_functions.accounting import usage_ledger
+    return jsonify(dict(usage_ledger.stats(), status="success"))
+
 @app.route('/api/calendar', methods=['POST'])
 def add_to_calendar():
     """Placeholder for Google Calendar integration"""
@@ -225,4 +455,5 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_ENV') == 'development'
     print(f"Running on port {port}")
+    start_background_work()
     app.run(debug=debug, host='0.0.0.0', port=port)
@@ -0,0 +1,148 @@
+"""
+End-to-end /api/chat benchmark on recorded upstream traffic.
+
+Record once against the live services (needs the usual API keys in .env):
+
+    python bench/chat_replay.py --mode record
+
+then benchmark offline and deterministically, as often as needed:
+
+    python bench/chat_replay.py [--time-scale 1.0] [--repeat 3] [--concurrency 1]
+
+Replay serves every ESPN, Ticketmaster, Zillow, Open-Meteo, Nominatim and
+OpenRouter response from the cassette with its recorded latency times
+--time-scale (0 = instant), so the numbers cover the backend's own work on
+real payload sizes. The first pass over the messages runs with cold caches;
+later passes show the warm path.
+
+Usage (from website/backend):
+    python bench/chat_replay.py [--mode record|replay] [--cassette PATH]
+                                [--messages FILE] [--repeat N] [--time-scale X]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CASSETTE = os.path.join(BACKEND_DIR, "bench", "cassettes", "chat.jsonl")
+
+MESSAGES = [
+    "What's the weather in College Station right now?",
+    "Will it rain in College Station tomorrow afternoon?",
+    "Compare the weather in Austin, Houston and College Station",
+    "Did the Aggies win their last game?",
+    "When do the Longhorns play next?",
+    "Find me a 2 bedroom apartment in College Station under $1500 close to campus",
+    "What's typical rent for a 1 bedroom in College Station?",
+    "Any concerts or sports events near College Station this weekend?",
+    "Put a study session on my calendar tomorrow from 3 to 5 pm",
+    "Any deals near College Station?",
+]
+
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _summary(samples: list) -> dict:
+    if not samples:
+        return {}
+    return {
+        "requests": len(samples),
+        "p50_ms": round(statistics.median(samples), 1),
+        "p95_ms": round(_percentile(samples, 95), 1),
+        "max_ms": round(max(samples), 1),
+    }
+
+
+def run(messages: list, repeat: int, concurrency: int) -> dict:
+    """
+    Send every message ``repeat`` times through the Flask app.
+
+    Args:
+        messages (list): Chat messages
+        repeat (int): Passes over the messages (the first one is cold)
+        concurrency (int): Requests in flight at once
+
+    Returns:
+        dict: Latency summaries and cassette counters
+    """
+    sys.path.insert(0, BACKEND_DIR)
+    import app
+    from api_functions import upstream
+
+    client = app.app.test_client()
+
+    def send(message):
+        started = time.perf_counter()
+        response = client.post("/api/chat", json={"message": message})
+        elapsed = (time.perf_counter() - started) * 1000
+        body = response.get_json() or {}
+        return message, elapsed, response.status_code, body.get("degraded", False)
+
+    passes = []
+    for _ in range(repeat):
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            passes.append(list(pool.map(send, messages)))
+
+    per_message = {}
+    for results in passes:
+        for message, elapsed, _, _ in results:
+            per_message.setdefault(message, []).append(round(elapsed, 1))
+
+    return {
+        "cold": _summary([elapsed for _, elapsed, _, _ in passes[0]]),
+        "warm": _summary([elapsed for results in passes[1:] for _, elapsed, _, _ in results]),
+        "errors": sum(1 for results in passes for _, _, status, _ in results if status != 200),
+        "degraded": sum(1 for results in passes for _, _, _, degraded in results if degraded),
+        "per_message_ms": per_message,
+        "cassette": upstream.cassette.stats() if upstream.cassette else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("record", "replay"), default="replay")
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE, help="cassette file (JSON lines)")
+    parser.add_argument("--messages", help="file with one chat message per line")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the messages")
+    parser.add_argument("--concurrency", type=int, default=1, help="requests in flight at once")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="recorded latency multiplier on replay")
+    args = parser.parse_args()
+
+    messages = MESSAGES
+    if args.messages:
+        with open(args.messages) as f:
+            messages = [line.strip() for line in f if line.strip()]
+
+    if args.mode == "record":
+        os.makedirs(os.path.dirname(os.path.abspath(args.cassette)), exist_ok=True)
+        if os.path.exists(args.cassette):
+            os.remove(args.cassette)
+    elif not os.path.exists(args.cassette):
+        parser.error(f"no cassette at {args.cassette}; run with --mode record first")
+
+    # Settings are read once at import, so set them before the app loads
+    os.environ.update({
+        "CASSETTE_MODE": args.mode,
+        "CASSETTE_PATH": args.cassette,
+        "CASSETTE_TIME_SCALE": str(args.time_scale),
+        "SEASON_PRELOAD": "0",
+        "CACHE_BACKEND": "memory",
+        "CACHE_SNAPSHOT_PATH": "",
+        "TRACE_PATH": "",
+        "CHAT_RATE": "1000",
+        "CHAT_BURST": "1000",
+    })
+    repeat = 1 if args.mode == "record" else args.repeat
+    print(json.dumps(run(messages, repeat, args.concurrency), indent=2))
+
+
+if __name__ == "__main__":
+    main()
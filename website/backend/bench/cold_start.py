@@ -0,0 +1,140 @@
+"""
+Cold start benchmark for the backend.
+
+Measures the three numbers that matter when Railway restarts or scales the
+service:
+
+- import time of ``app`` in a fresh interpreter (median of several runs)
+- time from launching gunicorn to the first 200 from /api/health
+- resident memory of the gunicorn master and each worker after --preload
+
+Usage (from website/backend):
+    python bench/cold_start.py [--runs 5] [--workers 2] [--port 5055]
+
+RSS is read from /proc, so the server part only works on Linux.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import(runs: int) -> dict:
+    """
+    Import ``app`` in ``runs`` fresh interpreters.
+
+    Args:
+        runs (int): Number of interpreter launches
+
+    Returns:
+        dict: Median/min/max import time in milliseconds
+    """
+    samples = []
+    for _ in range(runs):
+        out = subprocess.check_output(
+            [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, text=True
+        )
+        samples.append(float(out.strip().splitlines()[-1]) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": round(min(samples), 1),
+        "max_ms": round(max(samples), 1),
+    }
+
+
+def _rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _children(pid: int) -> list:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def measure_server(workers: int, port: int, timeout: float = 30.0) -> dict:
+    """
+    Start gunicorn with --preload and poll /api/health until it answers.
+
+    Args:
+        workers (int): Number of gunicorn workers
+        port (int): Local port to bind
+        timeout (float, optional): Seconds to wait for a healthy response
+
+    Returns:
+        dict: Time to first healthy response and RSS per process in KiB
+    """
+    cmd = [
+        sys.executable, "-m", "gunicorn", "app:app",
+        "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers),
+        "--preload",
+    ]
+    url = f"http://127.0.0.1:{port}/api/health"
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        healthy_after = None
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        healthy_after = time.perf_counter() - started
+                        break
+            except OSError:
+                time.sleep(0.02)
+
+        # Give the remaining workers a moment to finish forking
+        time.sleep(0.5)
+        worker_pids = _children(proc.pid)
+        return {
+            "time_to_healthy_ms": round(healthy_after * 1000, 1) if healthy_after else None,
+            "master_rss_kb": _rss_kb(proc.pid),
+            "worker_rss_kb": [_rss_kb(pid) for pid in worker_pids],
+        }
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh-interpreter import runs")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--port", type=int, default=5055, help="local port for the server run")
+    parser.add_argument("--skip-server", action="store_true", help="only measure import time")
+    args = parser.parse_args()
+
+    report = {"import": measure_import(args.runs)}
+    if not args.skip_server:
+        report["server"] = measure_server(args.workers, args.port)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Memory benchmark for the cached record types.
+
+Builds synthetic Ticketmaster, Zillow and DiscountAPI payloads, runs them
+through the real parsers and measures, with tracemalloc, how many bytes one
+parsed item takes when kept as a record (api_functions/records.py) and as
+the dict it used to be (``record._asdict()``). Also reports the JSON size
+of both shapes, which is what the SQLite and Redis backends store.
+
+Usage (from website/backend):
+    python bench/record_memory.py [--count 5000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEGMENTS = [("Music", "Rock", "Alternative Rock"), ("Sports", "Football", "College"),
+            ("Arts & Theatre", "Theatre", "Musical"), ("Music", "Country", "Country")]
+CITIES = [("College Station", "TX"), ("Bryan", "TX"), ("Houston", "TX"), ("Austin", "TX")]
+HOME_TYPES = ["APARTMENT", "CONDO", "SINGLE_FAMILY", "TOWNHOUSE"]
+DEAL_CATEGORIES = ["Food & Drink", "Health & Fitness", "Things To Do", "Beauty & Spas"]
+
+
+def _fresh(text: str) -> str:
+    """A new string object with the same text, as json.loads would produce."""
+    return text.encode().decode()
+
+
+def ticketmaster_payload(i: int, rng: random.Random) -> dict:
+    segment, genre, subgenre = rng.choice(SEGMENTS)
+    city, state = rng.choice(CITIES)
+    return {
+        "name": f"Event number {i} live",
+        "url": f"https://www.ticketmaster.com/event/{i:016X}",
+        "dates": {"start": {"localDate": "2026-10-24", "localTime": "19:30:00"}},
+        "_embedded": {"venues": [{
+            "name": f"Venue {i % 40}",
+            "city": {"name": _fresh(city)},
+            "state": {"stateCode": _fresh(state)},
+            "location": {"latitude": str(30.6 + rng.random() / 10), "longitude": str(-96.3 - rng.random() / 10)},
+        }]},
+        "priceRanges": [{"min": 25.0, "max": 25.0 + i % 200, "currency": "USD"}],
+        "classifications": [{
+            "segment": {"name": _fresh(segment)},
+            "genre": {"name": _fresh(genre)},
+            "subGenre": {"name": _fresh(subgenre)},
+        }],
+    }
+
+
+def zillow_payload(i: int, rng: random.Random) -> dict:
+    return {
+        "address": f"{100 + i} George Bush Dr, College Station, TX 77840",
+        "price": 700 + rng.randrange(0, 2000, 25),
+        "bedrooms": rng.randint(1, 5),
+        "bathrooms": rng.choice([1, 1.5, 2, 2.5, 3]),
+        "livingArea": rng.randrange(450, 2600, 10),
+        "homeType": _fresh(rng.choice(HOME_TYPES)),
+        "detailUrl": f"https://www.zillow.com/homedetails/{i}_zpid/",
+        "imgSrc": f"https://photos.zillowstatic.com/fp/{i:032x}-p_e.jpg",
+        "statusText": _fresh("For Rent"),
+        "latitude": 30.6 + rng.random() / 10,
+        "longitude": -96.3 - rng.random() / 10,
+    }
+
+
+def discountapi_payload(i: int, rng: random.Random) -> dict:
+    city, _ = rng.choice(CITIES)
+    return {"deal": {
+        "id": 1000000 + i,
+        "short_title": f"$20 for $40 worth of food at place {i}",
+        "merchant": {"name": f"Merchant {i % 300}", "locality": _fresh(city)},
+        "category_name": _fresh(rng.choice(DEAL_CATEGORIES)),
+        "price": 20.0,
+        "value": 40.0,
+        "discount_percentage": rng.random(),
+        "expires_at": "2026-12-31T23:59:59Z",
+        "online": i % 5 == 0,
+        "untracked_url": f"https://deals.example.com/d/{i}",
+    }}
+
+
+def _allocated(build) -> tuple:
+    """Bytes still allocated after ``build()``, and what it returned."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    value = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return size, value
+
+
+def measure(parser, payloads: list) -> dict:
+    """
+    Per-item memory and JSON size of parsed payloads as records and as dicts.
+
+    Args:
+        parser (callable): Payload -> record
+        payloads (list): Raw upstream items
+
+    Returns:
+        dict: Bytes per item for both shapes and the saving
+    """
+    count = len(payloads)
+    # Each shape is parsed from the payloads on its own, so nothing is shared between them
+    record_bytes, parsed = _allocated(lambda: [parser(p) for p in payloads])
+    dict_bytes, dicts = _allocated(lambda: [parser(p)._asdict() for p in payloads])
+    record_json = len(json.dumps(parsed, separators=(",", ":")))
+    dict_json = len(json.dumps(dicts, separators=(",", ":")))
+    return {
+        "count": count,
+        "dict_bytes_per_item": round(dict_bytes / count),
+        "record_bytes_per_item": round(record_bytes / count),
+        "memory_saved_pct": round(100 * (1 - record_bytes / dict_bytes), 1),
+        "dict_json_bytes_per_item": round(dict_json / count),
+        "record_json_bytes_per_item": round(record_json / count),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=5000, help="items per record type")
+    parser.add_argument("--seed", type=int, default=7, help="random seed for the payloads")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SEASON_PRELOAD", "0")
+    sys.path.insert(0, BACKEND_DIR)
+    from api_functions.deal_catalog import deal_from_discountapi
+    from api_functions.event_catalog import event_from_ticketmaster
+    from api_functions.rental_index import listing_from_zillow
+
+    rng = random.Random(args.seed)
+    cases = {
+        "events": (event_from_ticketmaster, ticketmaster_payload),
+        "listings": (listing_from_zillow, zillow_payload),
+        "deals": (deal_from_discountapi, discountapi_payload),
+    }
+    report = {}
+    for name, (parse, make) in cases.items():
+        payloads = [make(i, rng) for i in range(args.count)]
+        report[name] = measure(parse, payloads)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
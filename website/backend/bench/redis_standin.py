@@ -0,0 +1,183 @@
+"""
+Local Redis-protocol stand-in.
+
+A small in-memory RESP2 server implementing the commands the backend uses
+(PING, AUTH, SELECT, GET, SET [EX|PX], DEL, PTTL, SCAN, INCRBY, PEXPIRE,
+FLUSHDB, DBSIZE). It lets RedisBackend and anything else that talks to
+Redis be exercised without installing a server.
+
+Usage (from website/backend):
+    python bench/redis_standin.py [--port 6380]
+    CACHE_BACKEND=redis REDIS_URL=redis://127.0.0.1:6380/0 python app.py
+
+It can also be started in-process with ``start_standin()``, which returns
+the running StandinServer (its ``url`` property gives the REDIS_URL).
+"""
+
+import argparse
+import fnmatch
+import socketserver
+import threading
+import time
+
+
+class _Store:
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return entry
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _write(self, reply):
+        if reply is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(reply, Exception):
+            self.wfile.write(b"-ERR %s\r\n" % str(reply).encode())
+        elif isinstance(reply, str):
+            self.wfile.write(b"+%s\r\n" % reply.encode())
+        elif isinstance(reply, int):
+            self.wfile.write(b":%d\r\n" % reply)
+        elif isinstance(reply, bytes):
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(reply), reply))
+        elif isinstance(reply, list):
+            self.wfile.write(b"*%d\r\n" % len(reply))
+            for item in reply:
+                self._write(item)
+
+    def handle(self):
+        while True:
+            try:
+                args = self._read_command()
+            except (OSError, ValueError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            try:
+                reply = self._dispatch(args[0].decode().upper(), args[1:])
+            except Exception as e:
+                reply = e
+            self._write(reply)
+            self.wfile.flush()
+
+    def _dispatch(self, command, args):
+        store = self.server.store
+        with store.lock:
+            if command == "PING":
+                return "PONG"
+            if command in ("AUTH", "SELECT"):
+                return "OK"
+            if command == "GET":
+                entry = store._live(args[0])
+                return None if entry is None else entry[0]
+            if command == "SET":
+                expires_at = None
+                options = [a.decode().upper() for a in args[2:]]
+                for i, option in enumerate(options):
+                    if option == "PX":
+                        expires_at = time.time() + int(options[i + 1]) / 1000
+                    elif option == "EX":
+                        expires_at = time.time() + int(options[i + 1])
+                if "NX" in options and store._live(args[0]) is not None:
+                    return None
+                store.data[args[0]] = (args[1], expires_at)
+                return "OK"
+            if command == "DEL":
+                return sum(1 for key in args if store.data.pop(key, None) is not None)
+            if command == "PTTL":
+                entry = store._live(args[0])
+                if entry is None:
+                    return -2
+                return -1 if entry[1] is None else int((entry[1] - time.time()) * 1000)
+            if command == "PEXPIRE":
+                entry = store._live(args[0])
+                if entry is None:
+                    return 0
+                store.data[args[0]] = (entry[0], time.time() + int(args[1]) / 1000)
+                return 1
+            if command == "INCRBY":
+                entry = store._live(args[0])
+                value = int(entry[0]) + int(args[1]) if entry else int(args[1])
+                store.data[args[0]] = (str(value).encode(), entry[1] if entry else None)
+                return value
+            if command == "SCAN":
+                pattern = "*"
+                options = [a.decode() for a in args[1:]]
+                for i, option in enumerate(options):
+                    if option.upper() == "MATCH":
+                        pattern = options[i + 1]
+                keys = [k for k in list(store.data) if store._live(k) and fnmatch.fnmatchcase(k.decode(), pattern)]
+                return [b"0", keys]
+            if command == "DBSIZE":
+                return len(store.data)
+            if command == "FLUSHDB":
+                store.data.clear()
+                return "OK"
+        raise ValueError(f"unknown command '{command}'")
+
+
+class StandinServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, _Handler)
+        self.store = _Store()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+
+def start_standin(host: str = "127.0.0.1", port: int = 0) -> StandinServer:
+    """
+    Run a stand-in server on a background thread.
+
+    Args:
+        host (str, optional): Interface to bind
+        port (int, optional): Port to bind (0 picks a free port)
+
+    Returns:
+        StandinServer: Running server; call shutdown() to stop it
+    """
+    server = StandinServer((host, port))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args()
+    server = StandinServer((args.host, args.port))
+    print(f"Redis stand-in listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
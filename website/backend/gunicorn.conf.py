@@ -0,0 +1,16 @@
+"""
+Gunicorn settings read automatically from the working directory.
+
+Background work (the season preload) starts in each worker after it forks:
+threads started in the master would not survive the fork, and importing app
+must stay free of side effects for --preload and the cold start benchmark.
+The worker count is passed on so background jobs know whether a poll can
+land on a process that does not hold the job.
+"""
+
+
+def post_fork(server, worker):
+    from api_functions.jobs import job_store
+    from app import start_background_work
+    job_store.processes = server.cfg.workers
+    start_background_work()
@@ -0,0 +1,222 @@
+"""
+WebSocket Chat Server
+
+One connection per open chat instead of one HTTP POST per message. Runs as
+its own process next to the gunicorn app (``python ws_server.py``, port
+from PORT or WS_PORT) on asyncio, so idle connections cost a coroutine and
+a socket rather than a worker. Each chat message runs the usual pipeline on
+a thread pool behind the same admission control as /api/chat, and progress
+is pushed while it works.
+
+Connect to ``ws://host:port/?session=<id>`` (omit the session to start a
+new one). Client messages:
+
+    {"type": "chat", "id": "m1", "message": "Will it rain tomorrow?"}
+    {"type": "ping"}
+
+Several chat messages may be in flight on one connection; every server
+event carries the id of the message it belongs to:
+
+    {"type": "session", "session": "..."}                   on connect
+    {"type": "status", "id", "state": "accepted"}
+    {"type": "tool", "id", "name", "args", "state": "running" | "done"}
+    {"type": "calendar_url", "id", "url"}
+    {"type": "token", "id", "text"}                          streamed answer text
+    {"type": "answer", "id", "response", "calendar_url", "trace_id"}
+    {"type": "error", "id", "error", "retry_after"}
+
+"answer" carries the full text and replaces any streamed tokens. A
+connection has at most WS_MAX_PENDING chat messages in flight; more are
+answered with an error right away. Events wait in a bounded queue: when a
+client stops reading, token events are dropped first (the answer repeats
+them) and the connection is closed once any other event no longer fits.
+GET /health answers plain HTTP for health checks and GET /stats returns
+connection and admission counters.
+"""
+
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import websockets
+
+from app import process_student_query_simple, start_background_work
+from api_functions import get_ai_response, get_default_tools, FUNCTION_MAP
+from api_functions.admission import admission, client_address
+from api_functions.config import config
+from api_functions.sessions import session_store
+from api_functions.tracing import start_trace
+
+# Admitted pipelines plus the ones waiting in the admission queue
+pipelines = ThreadPoolExecutor(max_workers=config.chat_max_inflight + config.chat_queue_size,
+                               thread_name_prefix="ws-chat")
+
+# Events queued per connection before it counts as not reading
+OUTGOING_FRAMES = 256
+
+counters = {"connections": 0, "connections_total": 0, "messages": 0, "errors": 0,
+            "rejected_messages": 0, "dropped_tokens": 0, "slow_closed": 0}
+
+
+def run_chat(session: str, message: str, client: str, emit) -> dict:
+    """
+    Answer one chat message (runs on the pipeline pool).
+
+    Args:
+        session (str): Session id for history
+        message (str): User's message
+        client (str): Client address for rate limiting
+        emit (callable): Progress callback from get_ai_response
+
+    Returns:
+        dict: {"response", "calendar_url", "trace_id"} or {"error", "retry_after"}
+    """
+    with start_trace("WS chat", client=client) as root:
+        rejection = admission.admit(client)
+        if rejection:
+            root.set(rejected=rejection.reason)
+            if rejection.reason == "overloaded" and config.chat_shed_mode == "simple":
+                return dict(process_student_query_simple(message), degraded=True)
+            return {"error": "Too many requests, please try again shortly", "retry_after": rejection.retry_after}
+
+        try:
+            result = get_ai_response(
+                user_message=message,
+                tools=get_default_tools(),
+                function_map=FUNCTION_MAP,
+                history=session_store.history(session),
+                on_event=emit
+            )
+        except Exception as e:
+            result = {"error": str(e)}
+        finally:
+            admission.release()
+
+        if "error" in result:
+            print(f"AI error: {result['error']}")
+            result = process_student_query_simple(message)
+        else:
+            session_store.append(session, message, result.get("response", ""))
+
+        return {
+            "response": result.get("response", "I couldn't process your request."),
+            "calendar_url": result.get("calendar_url"),
+            "trace_id": root.trace.trace_id,
+        }
+
+
+async def chat(send, session: str, message_id, message: str, client: str):
+    """Run one chat message and queue its events for the connection."""
+    loop = asyncio.get_running_loop()
+
+    def emit(event):
+        # Called from the pipeline thread
+        loop.call_soon_threadsafe(send, dict(event, id=message_id))
+
+    send({"type": "status", "id": message_id, "state": "accepted"})
+    result = await loop.run_in_executor(pipelines, run_chat, session, message, client, emit)
+
+    if "error" in result:
+        counters["errors"] += 1
+        send(dict(result, type="error", id=message_id))
+    else:
+        send(dict(result, type="answer", id=message_id))
+
+
+async def writer(websocket, outgoing: asyncio.Queue):
+    """Send queued events in order."""
+    try:
+        while True:
+            event = await outgoing.get()
+            await websocket.send(json.dumps(event, default=str))
+    except websockets.ConnectionClosed:
+        pass
+
+
+async def handle(websocket):
+    """One client connection."""
+    query = parse_qs(urlsplit(websocket.path).query)
+    session = (query.get("session") or [None])[0] or session_store.new_id()
+    client = client_address(websocket.request_headers.get("X-Forwarded-For", ""), websocket.remote_address[0])
+
+    outgoing = asyncio.Queue(maxsize=OUTGOING_FRAMES)
+    sender = asyncio.create_task(writer(websocket, outgoing))
+    tasks = set()
+    closing = []
+
+    def send(event):
+        """Queue an event; a client that stopped reading loses tokens, then the connection."""
+        try:
+            outgoing.put_nowait(event)
+        except asyncio.QueueFull:
+            if event.get("type") == "token":
+                counters["dropped_tokens"] += 1
+            elif not closing:
+                counters["slow_closed"] += 1
+                closing.append(asyncio.ensure_future(websocket.close(code=1008, reason="Client is not reading")))
+
+    counters["connections"] += 1
+    counters["connections_total"] += 1
+    send({"type": "session", "session": session})
+
+    try:
+        async for raw in websocket:
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                send({"type": "error", "id": None, "error": "Invalid JSON"})
+                continue
+
+            kind = data.get("type")
+            if kind == "ping":
+                send({"type": "pong", "id": data.get("id")})
+            elif kind == "chat" and str(data.get("message") or "").strip():
+                if len(tasks) >= config.ws_max_pending:
+                    counters["rejected_messages"] += 1
+                    send({"type": "error", "id": data.get("id"), "retry_after": 1,
+                          "error": "Too many messages in flight on this connection"})
+                    continue
+                counters["messages"] += 1
+                task = asyncio.create_task(chat(send, session, data.get("id"), str(data["message"]), client))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            else:
+                send({"type": "error", "id": data.get("id"), "error": "Expected a chat message or ping"})
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        counters["connections"] -= 1
+        # Pipelines already running finish in their threads; their events are dropped
+        for task in tasks:
+            task.cancel()
+        sender.cancel()
+
+
+async def process_request(path, request_headers):
+    """Plain HTTP for health checks and counters; everything else upgrades."""
+    if path == "/health":
+        return HTTPStatus.OK, [("Content-Type", "text/plain")], b"OK\n"
+    if path == "/stats":
+        body = json.dumps(dict(counters, admission=admission.stats())).encode()
+        return HTTPStatus.OK, [("Content-Type", "application/json")], body
+    return None
+
+
+async def main():
+    port = int(os.environ.get("PORT", config.ws_port))
+    start_background_work()
+    # No compression: permessage-deflate buffers cost far more per idle connection than they save
+    async with websockets.serve(handle, "0.0.0.0", port, process_request=process_request,
+                                ping_interval=20, ping_timeout=20, max_size=64 * 1024,
+                                max_queue=8, compression=None):
+        print(f"WebSocket chat server listening on port {port}")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())